@@ -6,7 +6,6 @@
 from queue import Queue, Empty
 import threading
 import keyboard
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -16,6 +15,7 @@ import time
 
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.audio.play_audio import quit_audio, stop_audio
 
 from utils.audio_face_workers import audio_face_queue_worker_realtime, conversion_worker
 from utils.audio.record_audio import record_audio_until_release
@@ -82,8 +82,7 @@ def main():
             if keyboard.is_pressed('q'):
                 break  
             flush_queue(audio_face_queue)
-            if pygame.mixer.get_init():
-                pygame.mixer.stop()
+            stop_audio()
             audio_input_queue.put(audio_input)
             print("Audio input sent to processing queue.")       
     finally:
@@ -96,7 +95,7 @@ def main():
         audio_worker_thread.join()
         stop_default_animation.set()
         default_animation_thread.join()
-        pygame.quit()
+        quit_audio()
         socket_connection.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+# bench_animation_startup.py
+# Startup cost of the animation library: parsing and blending every CSV with pandas
+# (what each entry point paid at import) against mapping the compiled float32 atlas.
+# Run from the repository root: python -m benchmarks.bench_animation_startup
+
+import subprocess
+import sys
+import time
+
+from livelink.animations.animation_cache import load_clip_library
+from livelink.animations.animation_loader import emotion_paths, load_emotion_animations, load_emotion_library
+from livelink.animations.default_animation import ground_truth_path, load_default_animation, blend_animation
+
+IMPORT_SNIPPET = (
+    "import sys, time; start = time.perf_counter(); "
+    "import livelink.animations.animation_loader, livelink.animations.default_animation; "
+    "print(time.perf_counter() - start, 'pandas' in sys.modules)"
+)
+
+
+def best_of(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_all():
+    for folder in emotion_paths.values():
+        load_emotion_animations(folder)
+    blend_animation(load_default_animation(ground_truth_path), blend_frames=30)
+
+
+def map_all():
+    load_emotion_library(emotion_paths)
+    load_clip_library("default", [ground_truth_path], load_default_animation)
+
+
+if __name__ == "__main__":
+    parse_seconds = best_of(parse_all)
+    map_seconds = best_of(map_all)
+    print(f"pandas parse + blend: {parse_seconds * 1000:8.2f} ms (pandas already imported)")
+    print(f"compiled cache:       {map_seconds * 1000:8.2f} ms | {parse_seconds / map_seconds:.0f}x")
+
+    result = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+    seconds, pandas_loaded = result.stdout.strip().splitlines()[-1].split()
+    print(f"fresh interpreter import of both modules: {float(seconds) * 1000:.1f} ms, pandas imported: {pandas_loaded}")
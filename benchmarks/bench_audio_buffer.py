@@ -0,0 +1,142 @@
+# bench_audio_buffer.py
+# Memory and time per utterance for the audio handling around one NeuroSync request: cache key,
+# upload body, float samples for the gapless stream, and saving to generated/ (with its cache
+# link), once with the audio passed along as bytes (the previous code, reproduced here) and once
+# as an AudioBuffer. Two sources: a local TTS WAV at 22.05 kHz and a push-to-talk recording at 88.2 kHz.
+# The network request is not made; the upload body is only produced, and the stream's resampling
+# (the same either way) is left out. Memory is the tracemalloc peak above the starting point, time
+# the median of several runs with tracing off.
+# Run from the repository root: python -m benchmarks.bench_audio_buffer [--seconds 5 --runs 7]
+
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+import wave
+from contextlib import redirect_stdout
+
+import numpy as np
+import soundfile as sf
+
+from utils.audio.audio_buffer import AudioBuffer, to_audio_bytes
+from utils.audio.save_audio import save_audio_file
+from utils.neurosync.blendshape_cache import audio_cache_key
+
+MODEL_VERSION = "bench"
+
+
+def old_record(pcm: bytes, sample_rate: int) -> bytes:
+    audio_file = io.BytesIO()
+    with sf.SoundFile(audio_file, mode="w", samplerate=sample_rate, channels=1, format="WAV", subtype="PCM_16") as f:
+        f.write(np.frombuffer(pcm, dtype=np.int16))
+    audio_file.seek(0)
+    return audio_file.read()
+
+
+def old_cache_key(audio_bytes) -> str:
+    import hashlib
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wav_file:
+        tag = f"pcm:{wav_file.getframerate()}:{wav_file.getnchannels()}:{wav_file.getsampwidth()}"
+        samples = wav_file.readframes(wav_file.getnframes())
+    digest = hashlib.sha256(f"{MODEL_VERSION}|{tag}|".encode("utf-8"))
+    digest.update(samples)
+    return digest.hexdigest()
+
+
+def old_decode(audio_bytes):
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wav_file:
+        samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
+        return samples.reshape(-1, wav_file.getnchannels()).astype(np.float32) / 32768.0, wav_file.getframerate()
+
+
+def old_save(audio_bytes, output_path, target_sr=88200) -> None:
+    data, sr = sf.read(io.BytesIO(audio_bytes))
+    if data.ndim > 1:
+        data = np.mean(data, axis=1)
+    if sr != target_sr:
+        import scipy.signal
+        data = scipy.signal.resample_poly(data, target_sr, sr)
+        sr = target_sr
+    with wave.open(output_path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        wf.writeframes((data * 32767).astype(np.int16).tobytes())
+    with wave.open(output_path, "rb") as wav_file:  # The re-validation save_generated_data did.
+        wav_file.readframes(1)
+
+
+def utterance_with_bytes(source, sample_rate: int, path: str) -> bytes:
+    audio = old_record(source, sample_rate) if sample_rate == 88200 else source
+    old_cache_key(audio)
+    body = audio  # Upload body.
+    old_decode(audio)
+    old_save(audio, path)
+    old_cache_key(audio)  # link_generated_blendshapes
+    return body
+
+
+def utterance_with_buffer(source, sample_rate: int, path: str) -> bytes:
+    audio = AudioBuffer.from_pcm(source, sample_rate) if sample_rate == 88200 else AudioBuffer.from_bytes(source)
+    audio_cache_key(audio, MODEL_VERSION)
+    body = to_audio_bytes(audio)
+    audio.as_float32()
+    save_audio_file(audio, path)
+    audio_cache_key(audio, MODEL_VERSION)
+    return body
+
+
+def tts_wav(seconds: float, sample_rate: int = 22050) -> bytes:
+    rng = np.random.default_rng(1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes((rng.standard_normal(int(seconds * sample_rate)) * 3000).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def measure(run, source, sample_rate: int, path: str, runs: int):
+    with redirect_stdout(io.StringIO()):
+        run(source, sample_rate, path)  # Warm up imports and caches.
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        run(source, sample_rate, path)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run(source, sample_rate, path)
+            times.append(time.perf_counter() - start)
+    return peak, statistics.median(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of the utterance.")
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(2)
+    recording = (rng.standard_normal(int(args.seconds * 88200)) * 3000).astype("<i2").tobytes()
+    sources = (("TTS WAV 22.05 kHz", tts_wav(args.seconds), 22050),
+               ("recording 88.2 kHz", recording, 88200))
+    path = os.path.join(tempfile.mkdtemp(), "audio.wav")
+
+    print(f"{args.seconds:g} s utterance")
+    print(f"{'source':>20} {'path':>12} {'peak alloc':>11} {'time':>9}")
+    for label, source, sample_rate in sources:
+        results = {}
+        for name, run in (("bytes", utterance_with_bytes), ("AudioBuffer", utterance_with_buffer)):
+            results[name] = measure(run, source, sample_rate, path, args.runs)
+            peak, seconds = results[name]
+            print(f"{label:>20} {name:>12} {peak / 1e6:8.2f} MB {seconds * 1000:7.2f}ms")
+        saved_mb = (results["bytes"][0] - results["AudioBuffer"][0]) / 1e6
+        saved_ms = (results["bytes"][1] - results["AudioBuffer"][1]) * 1000
+        print(f"{'':>20} {'saved':>12} {saved_mb:8.2f} MB {saved_ms:7.2f}ms")
@@ -0,0 +1,97 @@
+# bench_av_offset.py
+# A/V offset over a long clip: frame media time minus the audio actually being heard, sampled at
+# every frame sent. The audio plays on an AudioOutputStream whose simulated device starts late,
+# runs slightly fast against the system clock and reports an output latency; optional hiccups
+# stall the sender thread. Compared: frames free-running from when playback was requested (the
+# old behaviour), free-running from the clip's first output sample, and selected by the audio
+# clock (sync="audio"). The three run side by side, each on its own stream.
+# Run from the repository root: python -m benchmarks.bench_av_offset [--seconds 60 --skew-ppm 500]
+
+import argparse
+import random
+import time
+from threading import Thread
+
+import numpy as np
+
+from livelink.frame_pacer import FramePacer
+from utils.audio.audio_stream import AudioOutputStream, NullAudioSink
+
+FPS = 60
+SAMPLE_RATE = 44100
+
+
+class SimulatedDevice(NullAudioSink):
+    """
+    A NullAudioSink that starts startup_ms late and consumes audio skew_ppm faster than realtime.
+    """
+
+    def __init__(self, startup_ms: float, skew_ppm: float, latency_ms: float) -> None:
+        super().__init__(realtime=True)
+        self.startup = startup_ms / 1000.0
+        self.speed = 1.0 + skew_ppm / 1e6
+        self.latency = latency_ms / 1000.0
+
+    def _run(self) -> None:
+        time.sleep(self.startup)
+        self._sample_rate *= self.speed
+        super()._run()
+
+
+def run(mode: str, args, results: dict) -> None:
+    stream = AudioOutputStream(SimulatedDevice(args.startup_ms, args.skew_ppm, args.latency_ms), SAMPLE_RATE)
+    frames = [b""] * int(args.seconds * FPS)
+    rng = random.Random(1)
+
+    def send(packet):
+        if args.hiccup_ms and rng.random() < 0.01:
+            time.sleep(args.hiccup_ms / 1000.0)
+
+    requested_ns = time.perf_counter_ns()
+    stream.start()
+    chunk = stream.append(np.zeros(int(args.seconds * SAMPLE_RATE), dtype=np.float32), SAMPLE_RATE)
+    if mode == "audio clock":
+        pacer = FramePacer(FPS, audio_clock=chunk.position, sync="audio")
+        stats = pacer.run(frames, send)
+    else:
+        pacer = FramePacer(FPS, audio_clock=chunk.position)
+        if mode == "first sample":
+            chunk.wait_started()
+            time.sleep(max(0, chunk.start_time_ns() - time.perf_counter_ns()) / 1e9)
+            origin_ns = chunk.start_time_ns()
+        else:
+            origin_ns = requested_ns
+        stats = pacer.run(frames, send, origin_ns)
+    stream.close()
+    results[mode] = stats
+
+
+def describe(stats, segments: int = 6) -> str:
+    offsets = np.asarray(stats.drift_seconds) * 1000.0
+    means = " ".join(f"{part.mean():+6.1f}" for part in np.array_split(offsets, segments))
+    return (f"p50 {np.percentile(np.abs(offsets), 50):5.1f} ms, p99 {np.percentile(np.abs(offsets), 99):5.1f} ms, "
+            f"max {np.max(np.abs(offsets)):5.1f} ms | mean per sixth: {means}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length of the clip.")
+    parser.add_argument("--startup-ms", type=float, default=80.0, help="Delay before the device starts playing.")
+    parser.add_argument("--skew-ppm", type=float, default=500.0, help="How much faster the device clock runs.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Output latency the device reports.")
+    parser.add_argument("--hiccup-ms", type=float, default=30.0, help="Sender stall on 1%% of frames.")
+    args = parser.parse_args()
+
+    print(f"{args.seconds:g} s clip, device starts {args.startup_ms:g} ms late, runs {args.skew_ppm:g} ppm fast, "
+          f"{args.latency_ms:g} ms output latency, {args.hiccup_ms:g} ms sender hiccups")
+    print("A/V offset (frame time - audio heard; positive = face ahead of the voice)")
+    results = {}
+    modes = ("playback requested", "first sample", "audio clock")
+    threads = [Thread(target=run, args=(mode, args, results)) for mode in modes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for mode in modes:
+        stats = results[mode]
+        print(f"{mode:>18}: {describe(stats)} | sent {stats.frames_sent}, dropped {stats.frames_dropped}")
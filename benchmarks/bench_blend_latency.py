@@ -0,0 +1,38 @@
+# bench_blend_latency.py
+# Checks that pre-encoding a clip with blend in/out no longer waits on the wall clock:
+# the old path slept 1 / fps per blend frame, ~350 ms per clip regardless of fps.
+# Run from the repository root: python -m benchmarks.bench_blend_latency
+
+import sys
+import time
+import numpy as np
+
+from livelink.connect.livelink_init import initialize_py_face
+from livelink.send_to_unreal import pre_encode_facial_data
+
+ENCODE_BUDGET_SECONDS = 0.05
+
+
+def encode_seconds(facial_data, fps, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pre_encode_facial_data(facial_data, initialize_py_face(), fps=fps)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    facial_data = np.random.default_rng(0).random((600, 68))
+    failed = False
+    for fps in (30, 60, 120, 240):
+        blend_frames = int(0.05 * fps) + int(0.3 * fps)
+        old_sleep = blend_frames / fps
+        elapsed = encode_seconds(facial_data, fps)
+        failed |= elapsed > ENCODE_BUDGET_SECONDS
+        print(f"{fps:>3} fps: {blend_frames:>2} blend frames | old sleep {old_sleep * 1000:6.1f} ms | "
+              f"encode now {elapsed * 1000:6.2f} ms")
+    if failed:
+        print(f"FAIL: pre-encoding exceeded {ENCODE_BUDGET_SECONDS * 1000:.0f} ms")
+        sys.exit(1)
+    print("OK: pre-encode time does not scale with fps")
@@ -0,0 +1,66 @@
+# bench_blendshape_cache.py
+# Cost of resending the same audio to NeuroSync (stub server round trip) against answering it
+# from the blendshape cache's memory LRU and disk store. Uses a temporary cache directory.
+# Run from the repository root: python -m benchmarks.bench_blendshape_cache [--seconds 5]
+
+import argparse
+import io
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from utils.neurosync.blendshape_cache import BlendshapeCache
+from utils.neurosync.neurosync_api_connect import NeuroSyncClient
+from utils.neurosync.stub_server import start_stub_server
+
+
+def best_of(fn, repeats=20):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def wav_bytes(seconds: float) -> bytes:
+    samples = (np.sin(np.arange(int(88200 * seconds)) / 30.0) * 2000).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(88200)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of the repeated audio.")
+    args = parser.parse_args()
+
+    audio = wav_bytes(args.seconds)
+    server, url = start_stub_server()
+    client = NeuroSyncClient(local_url=url, use_cache=False)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = BlendshapeCache(directory)
+            key = client.cache_key(audio)
+            cache.put(key, client.send_audio(audio))
+
+            request = best_of(lambda: client.send_audio(audio))
+            hashing = best_of(lambda: client.cache_key(audio))
+            memory = best_of(lambda: cache.get(client.cache_key(audio)))
+            disk_cache = BlendshapeCache(directory, memory_entries=0)
+            disk = best_of(lambda: disk_cache.get(client.cache_key(audio)))
+            print(f"{args.seconds:g} s of audio, {len(audio) / 1024:.0f} KB")
+            print(f"stub round trip:       {request * 1000:8.3f} ms (the stub does no inference)")
+            print(f"cache hit (memory):    {memory * 1000:8.3f} ms (of which hashing {hashing * 1000:.3f} ms)")
+            print(f"cache hit (disk):      {disk * 1000:8.3f} ms")
+            print(cache.summary())
+            print(disk_cache.summary())
+    finally:
+        client.close()
+        server.shutdown()
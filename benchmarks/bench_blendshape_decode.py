@@ -0,0 +1,71 @@
+# bench_blendshape_decode.py
+# Decoding a 20 s NeuroSync response (1200 frames x 68 values): the old JSON path with a
+# float() per value, JSON straight into an array, and the binary float32 format. Also times
+# full requests against the local stub server in both formats.
+# Run from the repository root: python -m benchmarks.bench_blendshape_decode
+
+import json
+import time
+
+import numpy as np
+
+from utils.neurosync.blendshape_format import (
+    encode_blendshapes_binary,
+    decode_blendshapes_binary,
+    parse_blendshapes_from_json,
+)
+from utils.neurosync.neurosync_api_connect import NeuroSyncClient
+from utils.neurosync.stub_server import start_stub_server, stub_blendshapes
+
+CLIP_SECONDS = 20
+FPS = 60
+REQUESTS = 20
+
+
+def legacy_decode(body):
+    facial_data = []
+    for frame in json.loads(body).get("blendshapes", []):
+        facial_data.append([float(value) for value in frame])
+    return facial_data
+
+
+def best_of(fn, repeats=10):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def request_latency_ms(url, accept_binary, audio_bytes):
+    client = NeuroSyncClient(local_url=url, accept_binary=accept_binary)
+    client.send_audio(audio_bytes)  # Open the connection before timing.
+    for _ in range(REQUESTS):
+        client.send_audio(audio_bytes)
+    client.close()
+    return client.latency_percentile_ms(50)
+
+
+if __name__ == "__main__":
+    blendshapes = stub_blendshapes(CLIP_SECONDS * FPS)
+    json_body = json.dumps({"blendshapes": blendshapes.tolist()}).encode("utf-8")
+    binary_body = encode_blendshapes_binary(blendshapes)
+    assert np.array_equal(decode_blendshapes_binary(binary_body), blendshapes)
+
+    print(f"{CLIP_SECONDS} s clip, {blendshapes.shape[0]} x {blendshapes.shape[1]}: "
+          f"JSON {len(json_body) / 1024:.0f} KiB, binary {len(binary_body) / 1024:.0f} KiB")
+    legacy = best_of(lambda: legacy_decode(json_body))
+    json_array = best_of(lambda: parse_blendshapes_from_json(json.loads(json_body)))
+    binary = best_of(lambda: decode_blendshapes_binary(binary_body), repeats=1000)
+    print(f"JSON + float() loop:  {legacy * 1000:8.3f} ms")
+    print(f"JSON -> ndarray:      {json_array * 1000:8.3f} ms")
+    print(f"binary frombuffer:    {binary * 1000:8.3f} ms | {legacy / binary:.0f}x faster than the loop")
+
+    audio_bytes = bytes(2 * 88200 * CLIP_SECONDS)  # Raw PCM; the stub derives the frame count from its length.
+    server, url = start_stub_server()
+    try:
+        print(f"stub request p50 over {REQUESTS} calls: JSON {request_latency_ms(url, False, audio_bytes):.2f} ms, "
+              f"binary {request_latency_ms(url, True, audio_bytes):.2f} ms")
+    finally:
+        server.shutdown()
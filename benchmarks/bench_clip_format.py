@@ -0,0 +1,58 @@
+# bench_clip_format.py
+# Size on disk and replay load time of a generated/ clip stored as shapes.csv (parsed with
+# pandas, as play_generated_files did on every replay) and as a binary clip, float32
+# (memory-mapped) and float16 (read and widened). Load time is the best of several runs and
+# includes touching every value, so the memory map is not credited with work it defers.
+# Run from the repository root: python -m benchmarks.bench_clip_format [--seconds 10 60 600]
+
+import argparse
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from utils.csv.save_csv import save_generated_data_as_csv
+from utils.files.clip_format import load_clip, write_clip
+from utils.files.file_utils import load_facial_data_from_csv
+
+FPS = 60
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        float(np.asarray(fn()).sum())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[10, 60, 600], help="Clip lengths.")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+    print(f"{'clip':>8} {'format':>16} {'size':>10} {'load':>10}")
+    for seconds in args.seconds:
+        frames = rng.random((int(seconds * FPS), 68), dtype=np.float32)
+        paths = {"csv": os.path.join(directory, "shapes.csv"),
+                 "clip float32": os.path.join(directory, "shapes32.nsc"),
+                 "clip float16": os.path.join(directory, "shapes16.nsc")}
+        with redirect_stdout(io.StringIO()):
+            save_generated_data_as_csv(frames, paths["csv"])
+        write_clip(paths["clip float32"], frames)
+        write_clip(paths["clip float16"], frames, dtype="<f2")
+
+        loads = {"csv": lambda: load_facial_data_from_csv(paths["csv"]),
+                 "clip float32": lambda: load_clip(paths["clip float32"])[0],
+                 "clip float16": lambda: load_clip(paths["clip float16"])[0]}
+        for name, load in loads.items():
+            size = os.path.getsize(paths[name])
+            load_seconds = best_of(load, args.repeats)
+            print(f"{seconds:>7g}s {name:>16} {size / 1e6:7.2f} MB {load_seconds * 1000:8.2f}ms")
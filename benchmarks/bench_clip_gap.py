@@ -0,0 +1,81 @@
+# bench_clip_gap.py
+# Gap between consecutive chunks in audio_face_queue_worker, with the clip prepared (emotion
+# overlay, compose, encode) after the previous one ends and with it prepared while the previous
+# one plays, and the silence between chunks on the gapless audio stream. Playback is simulated
+# by sleeping for the clip's length (the stream uses a NullAudioSink), so no audio device or
+# Unreal connection is needed; the chunks are all queued up front, as when TTS runs ahead.
+# Run from the repository root: python -m benchmarks.bench_clip_gap [--chunks 6 --seconds 2]
+
+import argparse
+import io
+import time
+import wave
+from contextlib import redirect_stdout
+from queue import Queue
+
+import numpy as np
+
+from utils.audio.audio_stream import AudioOutputStream, NullAudioSink
+from utils.audio_face_workers import run_clip_queue, summarize_gaps
+from utils.generated_runners import GaplessClipPlayer, prepare_clip
+from utils.neurosync.stub_server import stub_blendshapes
+
+
+class NullSocket:
+    def sendall(self, packet) -> None:
+        pass
+
+
+def wav_bytes(seconds: float, sample_rate: int = 22050) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.zeros(int(seconds * sample_rate), dtype="<i2").tobytes())
+    return buffer.getvalue()
+
+
+def run(chunks: int, seconds: float, double_buffer: bool, gapless: bool = False):
+    audio_face_queue = Queue()
+    for index in range(chunks):
+        frames = int(seconds * 60)
+        audio_face_queue.put((wav_bytes(seconds), stub_blendshapes(frames, start_frame=index * frames)))
+    audio_face_queue.put(None)
+
+    prepare_times = []
+
+    def prepare(audio_bytes, facial_data, received_time=None):
+        with redirect_stdout(io.StringIO()):  # Quiet the per-chunk emotion messages.
+            clip = prepare_clip(audio_bytes, facial_data, received_time=received_time)
+        prepare_times.append(clip.prepare_seconds)
+        return clip
+
+    if not gapless:
+        gaps = run_clip_queue(audio_face_queue, lambda clip: time.sleep(clip.duration), prepare, double_buffer)
+        return gaps, prepare_times
+
+    stream = AudioOutputStream(NullAudioSink()).start()
+    player = GaplessClipPlayer(NullSocket(), stream)
+    with redirect_stdout(io.StringIO()):  # Quiet the per-clip pacing summaries.
+        run_clip_queue(audio_face_queue, player.play, prepare, double_buffer)
+        player.finish()
+    stream.close()
+    return player.gaps, prepare_times
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=6)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Length of each chunk.")
+    args = parser.parse_args()
+
+    with redirect_stdout(io.StringIO()):
+        prepare_clip(b"", stub_blendshapes(60))  # Load the emotion animations before timing.
+    print(f"{args.chunks} chunks of {args.seconds:g} s")
+    for label, double_buffer, gapless in (("prepare after previous", False, False),
+                                          ("prepare during previous", True, False),
+                                          ("gapless stream", True, True)):
+        gaps, prepare_times = run(args.chunks, args.seconds, double_buffer, gapless)
+        mean_prepare = sum(prepare_times) / len(prepare_times) * 1000
+        print(f"{label:>24}: {summarize_gaps(gaps)} (prepare {mean_prepare:.1f} ms per chunk)")
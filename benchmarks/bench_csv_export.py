@@ -0,0 +1,67 @@
+# bench_csv_export.py
+# Blendshape CSV export of long sessions, as exported for Unreal import: the old exporter
+# (per-frame divmod timecodes, np.hstack of strings and floats, pandas to_csv; reproduced here)
+# against write_blendshape_csv, to a file and to a BytesIO. Also counts the frames whose
+# timecode the old float arithmetic got wrong.
+# Run from the repository root: python -m benchmarks.bench_csv_export [--minutes 10]
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from utils.csv.save_csv import csv_columns, timecode_fields, write_blendshape_csv
+
+FPS = 60
+
+
+def legacy_timecodes(frame_count):
+    timecodes = []
+    for i in range(frame_count):
+        total_seconds = i * (1 / FPS)
+        hours, remainder = divmod(total_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        milliseconds = (seconds - int(seconds)) * 1000
+        frame_number = int(milliseconds / (1000 / FPS))
+        timecodes.append(f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}:{frame_number:02}.{int(milliseconds):03}")
+    return timecodes
+
+
+def legacy_export(generated, destination):
+    import pandas as pd
+    generated = np.array(generated)
+    timecodes = np.array(legacy_timecodes(len(generated))).reshape(-1, 1)
+    counts = np.full((len(generated), 1), generated.shape[1])
+    data = np.hstack((timecodes, counts, generated))
+    pd.DataFrame(data, columns=csv_columns(generated.shape[1])).to_csv(destination, index=False)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, default=10.0, help="Length of the session.")
+    args = parser.parse_args()
+
+    frames = int(args.minutes * 60 * FPS)
+    generated = np.random.default_rng(0).random((frames, 68), dtype=np.float32)
+    path = os.path.join(tempfile.mkdtemp(), "shapes.csv")
+
+    print(f"{args.minutes:g} min session, {frames} frames x 68 columns")
+    for name, export in (("old", legacy_export), ("vectorized", write_blendshape_csv)):
+        file_seconds = timed(lambda: export(generated, path))
+        size = os.path.getsize(path)
+        memory_seconds = timed(lambda: export(generated, io.BytesIO()))
+        print(f"{name:>11}: file {file_seconds:6.2f} s | BytesIO {memory_seconds:6.2f} s | {size / 1e6:6.1f} MB")
+
+    fields = timecode_fields(frames, FPS)
+    exact = [f"{h:02}:{m:02}:{s:02}:{f:02}.{ms:03}" for h, m, s, f, ms in fields.tolist()]
+    wrong = sum(a != b for a, b in zip(exact, legacy_timecodes(frames)))
+    print(f"old timecodes off from the frame index: {wrong} of {frames} frames")
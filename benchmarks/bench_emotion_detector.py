@@ -0,0 +1,35 @@
+# bench_emotion_detector.py
+# Streaming emotion detection cost per chunk as an utterance grows: recomputing
+# determine_highest_emotion over everything received so far is O(N) per chunk,
+# StreamingEmotionDetector.update is O(chunk).
+# Run from the repository root: python -m benchmarks.bench_emotion_detector
+
+import time
+import numpy as np
+
+from livelink.animations.animation_emotion import StreamingEmotionDetector, determine_highest_emotion
+
+FPS = 60
+CHUNK_FRAMES = 30
+UTTERANCE_SECONDS = 300
+
+
+if __name__ == "__main__":
+    facial_data = np.random.default_rng(0).random((UTTERANCE_SECONDS * FPS, 68))
+    checkpoints = {seconds * FPS for seconds in (10, 60, 300)}
+
+    detector = StreamingEmotionDetector()
+    for end in range(CHUNK_FRAMES, len(facial_data) + 1, CHUNK_FRAMES):
+        chunk = facial_data[end - CHUNK_FRAMES:end]
+
+        start = time.perf_counter()
+        determine_highest_emotion(facial_data[:end])
+        recompute = time.perf_counter() - start
+
+        start = time.perf_counter()
+        detector.update(chunk)
+        streaming = time.perf_counter() - start
+
+        if end in checkpoints:
+            print(f"after {end // FPS:>3} s: recompute {recompute * 1e6:8.1f} us/chunk | "
+                  f"streaming {streaming * 1e6:6.1f} us/chunk")
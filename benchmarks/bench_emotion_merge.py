@@ -0,0 +1,57 @@
+# bench_emotion_merge.py
+# Emotion overlay merge on long clips: the old per-frame, per-dimension Python loops
+# against the array engine in animation_emotion. Both scale with clip length; only one in Python.
+# Run from the repository root: python -m benchmarks.bench_emotion_merge
+
+import time
+import numpy as np
+
+from livelink.animations.animation_emotion import (
+    EMOTION_BLEND_DIMENSIONS,
+    merge_animation_data_into_facial_data,
+)
+
+FPS = 60
+CLIP_SECONDS = (5, 30, 120)
+EMOTION_LOOP_FRAMES = 427  # Emotion animations are a few seconds long and get looped.
+
+
+def legacy_merge(facial_data, animation_data, dimensions, alpha=0.7):
+    facial_length, animation_length = len(facial_data), len(animation_data)
+    if animation_length >= facial_length:
+        animation_data = animation_data[:facial_length]
+    else:
+        animation_data = list(animation_data)
+        for i in range(facial_length - animation_length):
+            animation_data.append(animation_data[i % animation_length])
+    blended = [frame.copy() for frame in facial_data]
+    for i in range(facial_length):
+        for dim in dimensions:
+            blended[i][dim] = min(max(blended[i][dim] + alpha * animation_data[i][dim], 0.0), 1.0)
+    return blended
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    animation = rng.random((EMOTION_LOOP_FRAMES, 61)) * 0.5 - 0.25
+    for seconds in CLIP_SECONDS:
+        facial_data = rng.random((seconds * FPS, 68))
+        facial_list = facial_data.tolist()
+
+        reference = np.array(legacy_merge(facial_list, animation.tolist(), EMOTION_BLEND_DIMENSIONS))
+        merged = merge_animation_data_into_facial_data(facial_data, animation, EMOTION_BLEND_DIMENSIONS)
+        max_error = float(np.max(np.abs(merged - reference)))
+
+        old = best_of(lambda: legacy_merge(facial_list, animation.tolist(), EMOTION_BLEND_DIMENSIONS), 3)
+        new = best_of(lambda: merge_animation_data_into_facial_data(facial_data, animation, EMOTION_BLEND_DIMENSIONS), 20)
+        print(f"{seconds:>4} s clip ({seconds * FPS:>5} frames): loops {old * 1000:8.2f} ms | "
+              f"arrays {new * 1000:6.3f} ms | {old / new:6.0f}x | max diff {max_error:.1e}")
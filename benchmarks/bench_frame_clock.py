@@ -0,0 +1,35 @@
+# bench_frame_clock.py
+# Per-packet cost of the old datetime + Timecode construction versus the arithmetic frame clock.
+# Run from the repository root: python -m benchmarks.bench_frame_clock
+
+import datetime
+import time
+from timecode import Timecode
+
+from livelink.connect.frame_clock import FrameClock
+from livelink.connect.livelink_init import initialize_py_face
+from livelink.connect.packet_encoder import encode_facial_frames
+
+
+def timecode_frames(fps=60):
+    now = datetime.datetime.now()
+    return Timecode(fps, f'{now.hour}:{now.minute}:{now.second}:{now.microsecond * 0.001}').frames
+
+
+def per_call_microseconds(func, calls=20000):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+if __name__ == "__main__":
+    clock = FrameClock(60)
+    old = per_call_microseconds(timecode_frames)
+    new = per_call_microseconds(clock.now)
+    print(f"Timecode per packet:    {old:7.2f} us")
+    print(f"FrameClock.now():       {new:7.2f} us  ({old / new:.0f}x faster)")
+
+    clip = encode_facial_frames([[0.0] * 61] * 1200, initialize_py_face())
+    stamp = per_call_microseconds(lambda: clock.stamp(clip), calls=2000)
+    print(f"FrameClock.stamp(1200): {stamp:7.2f} us per clip ({stamp / len(clip) * 1000:.1f} ns per packet)")
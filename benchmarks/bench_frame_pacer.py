@@ -0,0 +1,50 @@
+# bench_frame_pacer.py
+# Send jitter of the old time.time()/time.sleep loop versus FramePacer, with a CPU-bound
+# thread competing for the GIL the way pandas, JSON parsing and TTS do in production.
+# Run from the repository root: python -m benchmarks.bench_frame_pacer
+
+import time
+import threading
+import numpy as np
+
+from livelink.frame_pacer import FramePacer, PacerStats
+
+FPS = 60
+FRAMES = 300
+
+
+def legacy_pacing(frames, send, fps):
+    stats = PacerStats(fps)
+    frame_duration = 1 / fps
+    start_time = time.time()
+    for frame_index, frame in enumerate(frames):
+        elapsed_time = time.time() - start_time
+        expected_time = frame_index * frame_duration
+        if elapsed_time < expected_time:
+            time.sleep(expected_time - elapsed_time)
+        elif elapsed_time > expected_time + frame_duration:
+            stats.frames_dropped += 1
+            continue
+        send(frame)
+        stats.record_send(int((time.time() - start_time - expected_time) * 1e9))
+    return stats
+
+
+def background_load(stop):
+    while not stop.is_set():
+        np.linalg.svd(np.random.rand(120, 120))
+        sum(i * i for i in range(20000))
+
+
+if __name__ == "__main__":
+    stop = threading.Event()
+    load = threading.Thread(target=background_load, args=(stop,), daemon=True)
+    load.start()
+    try:
+        frames = range(FRAMES)
+        print(f"legacy sleep loop : {legacy_pacing(frames, lambda f: None, FPS).summary()}")
+        for policy in ("drop", "catch_up", "stretch"):
+            stats = FramePacer(FPS, late_policy=policy).run(frames, lambda f: None)
+            print(f"pacer {policy:<11}: {stats.summary()}")
+    finally:
+        stop.set()
@@ -0,0 +1,60 @@
+# bench_idle_cpu.py
+# CPU used by a 60 fps idle avatar: the old default_animation_loop (set_blendshape + encode
+# per frame, 5 ms sleep slices) versus the compositor replaying its cached idle packet ring.
+# Run from the repository root: python -m benchmarks.bench_idle_cpu
+
+import socket
+import threading
+import time
+
+from livelink.connect.livelink_init import initialize_py_face, FaceBlendShape
+from livelink.animations.default_animation import blended_animation_data
+from livelink.animations.compositor import AnimationCompositor
+
+SECONDS = 5
+
+
+def legacy_idle_loop(py_face, stop, address):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect(address)
+        while not stop.is_set():
+            for frame in blended_animation_data:
+                if stop.is_set():
+                    break
+                for i, value in enumerate(frame):
+                    py_face.set_blendshape(FaceBlendShape(i), float(value))
+                s.sendall(py_face.encode())
+                total_sleep = 1 / 60
+                while total_sleep > 0 and not stop.is_set():
+                    time.sleep(min(0.005, total_sleep))
+                    total_sleep -= 0.005
+
+
+def connected_socket(address):
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.connect(address)
+    return s
+
+
+def cpu_percent(target):
+    stop = threading.Event()
+    thread = threading.Thread(target=target, args=(stop,))
+    wall, cpu = time.perf_counter(), time.process_time()
+    thread.start()
+    time.sleep(SECONDS)
+    stop.set()
+    thread.join()
+    return 100.0 * (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+if __name__ == "__main__":
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sink:
+        sink.bind(("127.0.0.1", 0))
+        address = sink.getsockname()
+
+        legacy = cpu_percent(lambda stop: legacy_idle_loop(initialize_py_face(), stop, address))
+        compositor = AnimationCompositor(initialize_py_face())
+        with connected_socket(address) as s:
+            cached = cpu_percent(lambda stop: compositor.run(stop, s))
+        print(f"legacy idle loop:        {legacy:5.2f}% of one core")
+        print(f"compositor packet ring:  {cached:5.2f}% of one core ({compositor.ticks_dropped} ticks dropped)")
@@ -0,0 +1,37 @@
+# bench_packet_encoder.py
+# Frames/sec of the per-frame PyLiveLinkFace path versus the whole-clip encoder.
+# Run from the repository root: python -m benchmarks.bench_packet_encoder
+
+import time
+import numpy as np
+
+from livelink.connect.livelink_init import initialize_py_face, FaceBlendShape
+from livelink.connect.packet_encoder import encode_facial_frames
+
+
+def encode_per_frame(frames, py_face):
+    encoded = []
+    for frame in frames:
+        for i in range(51):
+            py_face.set_blendshape(FaceBlendShape(i), frame[i])
+        encoded.append(py_face.encode())
+    return encoded
+
+
+def frames_per_second(encode, frames, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encode(frames, initialize_py_face())
+        best = min(best, time.perf_counter() - start)
+    return len(frames) / best
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    for seconds in (10, 20):
+        frames = rng.random((seconds * 60, 61))
+        before = frames_per_second(encode_per_frame, frames)
+        after = frames_per_second(encode_facial_frames, frames)
+        print(f"{seconds:>2} s clip ({len(frames)} frames): per-frame {before:,.0f} fps | "
+              f"batch {after:,.0f} fps | {after / before:.0f}x")
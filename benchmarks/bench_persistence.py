@@ -0,0 +1,66 @@
+# bench_persistence.py
+# Time the interactive thread spends saving generated clips: save_generated_data inline (the
+# previous behaviour) against save_generated_data_async, which only queues the write. Clips are
+# 22.05 kHz TTS audio (resampled to 88.2 kHz on save) with 60 fps blendshapes. The async run
+# also reports how long the writer took to drain the queue, fsyncs included.
+# Runs in a temporary directory, so generated/ and cache/ are left alone.
+# Run from the repository root: python -m benchmarks.bench_persistence [--clips 10 --seconds 5]
+
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from utils.audio.audio_buffer import AudioBuffer
+from utils.files.file_utils import save_generated_data, save_generated_data_async
+from utils.files.persistence_queue import get_persistence_queue
+
+DIMENSIONS = 68
+
+
+def make_clips(count: int, seconds: float):
+    rng = np.random.default_rng(0)
+    clips = []
+    for _ in range(count):
+        audio = AudioBuffer((rng.standard_normal(int(seconds * 22050)) * 3000).astype("<i2"), 22050)
+        clips.append((audio, rng.random((int(seconds * 60), DIMENSIONS)).astype(np.float32)))
+    return clips
+
+
+def run(save, clips):
+    times = []
+    with redirect_stdout(io.StringIO()):
+        for audio, facial_data in clips:
+            start = time.perf_counter()
+            save(audio, facial_data)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clips", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of each clip.")
+    args = parser.parse_args()
+
+    clips = make_clips(args.clips, args.seconds)
+    os.chdir(tempfile.mkdtemp())
+
+    run(save_generated_data, clips[:1])  # Warm up imports and the blendshape cache.
+    inline = run(save_generated_data, clips)
+    queue = get_persistence_queue()
+    start = time.perf_counter()
+    queued = run(save_generated_data_async, clips)
+    with redirect_stdout(io.StringIO()):
+        queue.flush()
+    drained = time.perf_counter() - start
+
+    print(f"{args.clips} clips of {args.seconds:g} s; time on the calling thread per clip")
+    for name, times in (("inline", inline), ("queued", queued)):
+        print(f"{name:>8}: median {statistics.median(times) * 1000:8.2f} ms, max {max(times) * 1000:8.2f} ms")
+    print(f"queue drained in {drained * 1000:.0f} ms | {queue.summary()}")
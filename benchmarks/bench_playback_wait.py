@@ -0,0 +1,86 @@
+# bench_playback_wait.py
+# CPU use and tail latency of waiting for a chunk's audio to finish: the old sync and simple
+# playback loops against wait_for_playback_end(). pygame's music stream is simulated by a clock
+# whose get_pos() runs MIXER_AHEAD_MS ahead of real time (the mixer reports what it has buffered),
+# so no audio device is needed. Tail latency is how long after the audio ended the wait returned.
+# Run from the repository root: python -m benchmarks.bench_playback_wait [--clips 8]
+
+import argparse
+import random
+import time
+
+from utils.audio.play_audio import wait_for_playback_end
+
+MIXER_AHEAD_MS = 30
+
+
+class SimulatedMusic:
+    def __init__(self, duration: float) -> None:
+        self.start = time.perf_counter()
+        self.end = self.start + duration
+
+    def get_busy(self) -> bool:
+        return time.perf_counter() < self.end
+
+    def get_pos(self) -> int:
+        return int((time.perf_counter() - self.start) * 1000) + MIXER_AHEAD_MS
+
+
+def tick(last: float, fps: int = 10) -> float:
+    """
+    pygame.time.Clock().tick(fps): sleeps out the rest of the frame period.
+    """
+    remaining = 1.0 / fps - (time.perf_counter() - last)
+    if remaining > 0:
+        time.sleep(remaining)
+    return time.perf_counter()
+
+
+def old_sync_loop(music, duration):
+    start_time = time.perf_counter()
+    last_tick = start_time
+    while music.get_busy():
+        elapsed_time = time.perf_counter() - start_time
+        current_pos = music.get_pos() / 1000.0
+        if elapsed_time > current_pos:
+            time.sleep(0.01)
+        elif elapsed_time < current_pos:
+            continue
+        last_tick = tick(last_tick)
+
+
+def old_simple_loop(music, duration):
+    last_tick = time.perf_counter()
+    while music.get_busy():
+        last_tick = tick(last_tick)
+
+
+def event_wait(music, duration):
+    wait_for_playback_end(duration, music)
+
+
+def measure(wait, durations):
+    latencies = []
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for duration in durations:
+        music = SimulatedMusic(duration)
+        wait(music, duration)
+        latencies.append(time.perf_counter() - music.end)
+    cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+    return cpu, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clips", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    durations = [rng.uniform(0.5, 1.5) for _ in range(args.clips)]
+    print(f"{args.clips} clips, {sum(durations):.1f} s of audio each run")
+    print(f"{'wait':>22} {'CPU':>7} {'tail mean':>10} {'tail max':>9}")
+    for label, wait in (("old sync loop", old_sync_loop), ("old simple loop", old_simple_loop),
+                        ("wait_for_playback_end", event_wait)):
+        cpu, latencies = measure(wait, durations)
+        mean = sum(latencies) / len(latencies) * 1000
+        print(f"{label:>22} {cpu:6.1%} {mean:8.1f}ms {max(latencies) * 1000:7.1f}ms")
@@ -0,0 +1,66 @@
+# bench_resampler.py
+# Resampling throughput for the conversions the pipeline makes most: 24 kHz (Kokoro) and
+# 22.05 kHz (local TTS, realtime PCM) to 88.2 kHz (NeuroSync, generated/). Rows: scipy's
+# resample_poly designing its filter on every call (what save_audio_file did), the shared
+# resampler with its cached filter, and StreamingResampler fed in chunks the size TTS or a
+# microphone delivers. Throughput is seconds of audio converted per second of CPU; max diff is
+# against resample_poly on the whole clip. The cached filter matters most for sentence-length
+# clips (try --seconds 0.5), where designing the filter is a large share of the work.
+# Run from the repository root: python -m benchmarks.bench_resampler [--seconds 10]
+
+import argparse
+import time
+
+import numpy as np
+import scipy.signal
+
+from utils.audio.resampler import StreamingResampler, get_filter, resample
+
+PAIRS = ((24000, 88200), (22050, 88200))
+CHUNK_MS = (20, 100, 500)
+TARGET_RATE = 88200
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def stream(samples, source_rate, target_rate, chunk_frames):
+    resampler = StreamingResampler(source_rate, target_rate)
+    out = [resampler.process(samples[i:i + chunk_frames]) for i in range(0, len(samples), chunk_frames)]
+    out.append(resampler.flush())
+    return np.concatenate(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of the clip.")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{args.seconds:g} s clip, best of {args.repeats}")
+    print(f"{'conversion':>16} {'path':>24} {'time':>10} {'x realtime':>11} {'max diff':>9}")
+    for source_rate, target_rate in PAIRS:
+        samples = (rng.standard_normal((int(args.seconds * source_rate), 1)) * 0.2).astype(np.float32)
+        reference = scipy.signal.resample_poly(samples, target_rate, source_rate, axis=0)
+        get_filter(source_rate, target_rate)  # Design once, as the running pipeline would have.
+
+        rows = [("resample_poly, per call", lambda: scipy.signal.resample_poly(samples, target_rate, source_rate, axis=0), reference),
+                ("cached filter", lambda: resample(samples, source_rate, target_rate), resample(samples, source_rate, target_rate))]
+        for chunk_ms in CHUNK_MS:
+            chunk_frames = source_rate * chunk_ms // 1000
+            rows.append((f"streaming, {chunk_ms} ms chunks",
+                         lambda chunk_frames=chunk_frames: stream(samples, source_rate, target_rate, chunk_frames),
+                         stream(samples, source_rate, target_rate, chunk_frames)))
+
+        label = f"{source_rate / 1000:g}k->{target_rate / 1000:g}k"
+        for name, run, out in rows:
+            seconds = best_of(run, args.repeats)
+            max_diff = float(np.max(np.abs(out - reference)))
+            print(f"{label:>16} {name:>24} {seconds * 1000:8.2f}ms {args.seconds / seconds:10.0f}x {max_diff:9.1e}")
@@ -0,0 +1,88 @@
+# bench_streaming_first_frame.py
+# First-frame latency of batch vs streaming NeuroSync inference against the local stub server,
+# with TTS simulated as audio produced in 100 ms chunks at --tts-speed x realtime. Batch waits for
+# the whole utterance and uploads it in one request; streaming uploads each chunk as it is produced
+# and gets frames back a window at a time, so its latency should not grow with utterance length.
+# Run from the repository root: python -m benchmarks.bench_streaming_first_frame [--tts-speed 4]
+
+import argparse
+import time
+
+import numpy as np
+
+from livelink.connect.livelink_init import initialize_py_face
+from livelink.jitter_buffer import FrameJitterBuffer
+from livelink.send_to_unreal import StreamingClipComposer
+from utils.neurosync.neurosync_api_connect import NeuroSyncClient
+from utils.neurosync.neurosync_stream import WINDOW_FRAMES, stream_audio_chunks
+from utils.neurosync.stub_server import STREAM_PATH, start_stub_server, stub_url
+
+SAMPLE_RATE = 88200
+CHUNK_SECONDS = 0.1
+
+
+def tts_chunks(seconds: float, speed: float):
+    """
+    Yields 16-bit mono PCM in CHUNK_SECONDS pieces, each after the time a TTS engine running at
+    speed x realtime would take to produce it.
+    """
+    chunk = np.zeros(int(SAMPLE_RATE * CHUNK_SECONDS), dtype=np.int16).tobytes()
+    for _ in range(int(round(seconds / CHUNK_SECONDS))):
+        time.sleep(CHUNK_SECONDS / speed)
+        yield chunk
+
+
+def batch_first_frame(url, seconds: float, speed: float) -> float:
+    client = NeuroSyncClient(local_url=url)
+    start = time.perf_counter()
+    audio = b"".join(tts_chunks(seconds, speed))
+    client.send_audio(audio)
+    client.close()
+    return time.perf_counter() - start
+
+
+def streaming_first_frame(url, seconds: float, speed: float, prefill_frames: int):
+    """
+    Returns (first window, playback ready, windows): seconds until the first frames arrived and
+    until the jitter buffer held a window's worth of composed frames to start playback.
+    """
+    py_face = initialize_py_face()
+    composer = StreamingClipComposer(py_face)
+    jitter_buffer = FrameJitterBuffer(prefill_frames)
+    ready_time = []
+
+    def on_window(window):
+        jitter_buffer.put(composer.push(window))
+        if not ready_time and jitter_buffer.ready():
+            ready_time.append(time.perf_counter())
+
+    start = time.perf_counter()
+    stream = stream_audio_chunks(tts_chunks(seconds, speed), on_window, url=url)
+    stream.wait()
+    jitter_buffer.put(composer.finish())
+    jitter_buffer.close()
+
+    ready = ready_time[0] if ready_time else stream.finish_time
+    return stream.first_window_time - start, ready - start, stream.windows_received
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tts-speed", type=float, default=4.0, help="TTS generation speed as a multiple of realtime.")
+    parser.add_argument("--window-latency-ms", type=float, default=10.0, help="Simulated inference time per window.")
+    parser.add_argument("--seconds", type=float, nargs="*", default=[2.0, 5.0, 10.0])
+    args = parser.parse_args()
+
+    server, url = start_stub_server(window_latency=args.window_latency_ms / 1000.0)
+    stream_url = stub_url(server, STREAM_PATH)
+    window_ms = WINDOW_FRAMES / 60 * 1000 / args.tts_speed
+    print(f"TTS at {args.tts_speed:g}x realtime, window {WINDOW_FRAMES} frames "
+          f"({window_ms:.0f} ms to generate), {args.window_latency_ms:g} ms inference per window")
+    print(f"{'utterance':>10} {'batch':>10} {'stream 1st':>11} {'stream ready':>13} {'windows':>8}")
+    try:
+        for seconds in args.seconds:
+            batch = batch_first_frame(url, seconds, args.tts_speed)
+            first, ready, windows = streaming_first_frame(stream_url, seconds, args.tts_speed, WINDOW_FRAMES)
+            print(f"{seconds:9.1f}s {batch * 1000:8.0f}ms {first * 1000:9.0f}ms {ready * 1000:11.0f}ms {windows:8d}")
+    finally:
+        server.shutdown()
@@ -0,0 +1,80 @@
+# bench_tts_pool.py
+# The TTS + NeuroSync worker pool against stubbed backends with injected latency: a 6-sentence
+# answer is pushed through run_ordered_pool with 1 worker (the old one-at-a-time behaviour) and
+# with more, and each sentence's delivery time is compared with when playback would need it.
+# Stalls are the silences between sentences while the next one is still being generated.
+# Run from the repository root: python -m benchmarks.bench_tts_pool [--tts-ms 800 --neurosync-ms 400]
+
+import argparse
+import random
+import time
+from queue import Queue
+from threading import Thread
+
+from utils.tts.tts_bridge import run_ordered_pool
+
+SENTENCE_SECONDS = (1.2, 2.0, 0.8, 1.5, 1.0, 2.5)  # Audio length of each sentence; short replies stall most.
+
+
+def stub_synthesize(tts_seconds: float, neurosync_seconds: float, jitter: float, seed: int):
+    """
+    A synthesize() that sleeps for the TTS and NeuroSync calls and returns (index, audio seconds).
+    Latencies are drawn per sentence from seed, so every pool size sees the same ones.
+    """
+    rng = random.Random(seed)
+    scales = [1.0 + rng.uniform(-jitter, jitter) for _ in SENTENCE_SECONDS]
+
+    def synthesize(chunk):
+        index = int(chunk)
+        time.sleep(tts_seconds * scales[index])
+        time.sleep(neurosync_seconds * scales[index])
+        return index, SENTENCE_SECONDS[index]
+
+    return synthesize
+
+
+def run(max_workers: int, synthesize):
+    chunk_queue, audio_queue = Queue(), Queue()
+    deliveries = []
+
+    def consume():
+        for _ in SENTENCE_SECONDS:
+            deliveries.append((audio_queue.get(), time.perf_counter()))
+
+    consumer = Thread(target=consume)
+    consumer.start()
+    start = time.perf_counter()
+    for index in range(len(SENTENCE_SECONDS)):
+        chunk_queue.put(str(index))
+    chunk_queue.put(None)
+    reorder = run_ordered_pool(chunk_queue, audio_queue, synthesize, max_workers)
+    consumer.join()
+
+    in_order = [result[0] for result, _ in deliveries] == list(range(len(SENTENCE_SECONDS)))
+    # Playback starts with the first sentence and each one follows the previous, unless it is late.
+    playback_end, stalls = None, 0.0
+    for (_, seconds), ready in deliveries:
+        if playback_end is None:
+            playback_end = ready
+        stalls += max(0.0, ready - playback_end)
+        playback_end = max(playback_end, ready) + seconds
+    first = deliveries[0][1] - start
+    last = deliveries[-1][1] - start
+    return first, last, stalls, in_order, reorder.max_waiting
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tts-ms", type=float, default=800.0, help="Injected TTS latency per sentence.")
+    parser.add_argument("--neurosync-ms", type=float, default=400.0, help="Injected NeuroSync latency per sentence.")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency varies by up to this fraction per sentence.")
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f"{len(SENTENCE_SECONDS)} sentences, {sum(SENTENCE_SECONDS):.1f} s of audio, "
+          f"TTS {args.tts_ms:g} ms + NeuroSync {args.neurosync_ms:g} ms (+/-{args.jitter:.0%}) each")
+    print(f"{'workers':>7} {'first':>8} {'all':>8} {'stalls':>8} {'in order':>9} {'max buffered':>13}")
+    for workers in args.workers:
+        synthesize = stub_synthesize(args.tts_ms / 1000.0, args.neurosync_ms / 1000.0, args.jitter, seed=1)
+        first, last, stalls, in_order, buffered = run(workers, synthesize)
+        print(f"{workers:7d} {first * 1000:6.0f}ms {last * 1000:6.0f}ms {stalls * 1000:6.0f}ms {str(in_order):>9} {buffered:13d}")
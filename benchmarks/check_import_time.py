@@ -0,0 +1,69 @@
+# check_import_time.py
+# Import-time regression check for the entry points. Each one is imported in a fresh
+# interpreter under `python -X importtime`; the check fails if a heavy library is pulled in
+# at import (it should load on first use) or if the import exceeds the time budget.
+# Run from the repository root: python -m benchmarks.check_import_time [--budget-ms 400]
+
+import argparse
+import subprocess
+import sys
+
+ENTRY_POINTS = ("text_to_face", "llm_to_face", "wave_to_face")
+# Top-level packages that must only be imported on first use.
+HEAVY_MODULES = ("pandas", "pygame", "openai", "torch", "kokoro", "librosa", "scipy", "pydub", "livepeer_ai")
+DEFAULT_BUDGET_MS = 400.0
+
+
+def import_profile(module: str):
+    """
+    Imports module in a fresh interpreter and returns ({package: self_us}, total_us, error),
+    where each module's own import time is added to its top-level package.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    packages, total_us, error = {}, 0, None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2].strip()
+        if name == module:
+            total_us = cumulative_us
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit code {result.returncode}"
+    return packages, total_us, error
+
+
+def check(module: str, budget_ms: float) -> bool:
+    packages, total_us, error = import_profile(module)
+    if error:
+        print(f"{module}: import failed ({error})")
+        return False
+
+    heavy = sorted(name for name in packages if name in HEAVY_MODULES)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:5]
+    print(f"{module}: {total_us / 1000:.1f} ms | slowest: " +
+          ", ".join(f"{name} {us / 1000:.1f} ms" for name, us in slowest))
+
+    ok = True
+    if heavy:
+        print(f"  FAIL: imported at startup: {', '.join(heavy)}")
+        ok = False
+    if total_us / 1000 > budget_ms:
+        print(f"  FAIL: over the {budget_ms:.0f} ms budget")
+        ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("modules", nargs="*", default=list(ENTRY_POINTS))
+    args = parser.parse_args()
+
+    results = [check(module, args.budget_ms) for module in args.modules]
+    sys.exit(0 if all(results) else 1)
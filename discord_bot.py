@@ -46,7 +46,7 @@ async def upload_audio(ctx):
         return
 
     blendshape_data = send_audio_to_neurosync(converted_audio, use_local=USE_LOCAL_API)
-    if blendshape_data:
+    if blendshape_data is not None and len(blendshape_data) > 0:
         if not SEND_CSV_DIRECTLY:
             unique_id = str(uuid.uuid4())
             output_dir = os.path.join(DISCORD_GEN_DIR, unique_id)
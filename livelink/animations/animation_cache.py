@@ -0,0 +1,152 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# animation_cache.py
+# Compiled animation library: every clip of a library is stored back to back in one float32
+# .npy atlas with a JSON index of per-clip offsets, so startup is a single memory map instead
+# of one pandas parse per CSV. The atlas is rebuilt when any source CSV changes.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+CACHE_DIR = os.path.join("livelink", "animations", ".cache")
+CACHE_VERSION = 1
+
+
+def file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_entry(path: str) -> dict:
+    stat = os.stat(path)
+    return {"path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": file_sha1(path)}
+
+
+def _index_is_current(index: dict, paths, settings: dict) -> bool:
+    """
+    Checks the cached index against the sources. Unchanged mtime and size are trusted;
+    if either moved (a fresh checkout, a touch), the file is hashed before deciding.
+    Refreshed stat fields are written back into index so the next start skips the hash.
+    """
+    if index.get("version") != CACHE_VERSION or index.get("settings") != settings:
+        return False
+    clips = index.get("clips", [])
+    if [clip["path"] for clip in clips] != list(paths):
+        return False
+    for clip in clips:
+        try:
+            stat = os.stat(clip["path"])
+        except OSError:
+            return False
+        if stat.st_mtime_ns == clip["mtime_ns"] and stat.st_size == clip["size"]:
+            continue
+        if stat.st_size != clip["size"] or file_sha1(clip["path"]) != clip["sha1"]:
+            return False
+        clip["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def cache_paths(name: str):
+    return os.path.join(CACHE_DIR, f"{name}.npy"), os.path.join(CACHE_DIR, f"{name}.json")
+
+
+def _write_atomic(path: str, write) -> None:
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        write(f)
+    os.replace(temp_path, path)
+
+
+def _write_index(path: str, index: dict) -> None:
+    _write_atomic(path, lambda f: f.write(json.dumps(index, indent=1).encode("utf-8")))
+
+
+def _compile(name: str, paths, load_clip, settings: dict):
+    """
+    Loads every source with load_clip and writes the atlas and its index. Clips that fail to
+    load are recorded with no frames so the index still covers every source.
+    """
+    print(f"Compiling animation cache '{name}' from {len(paths)} files...")
+    clips, entries, offset, width = [], [], 0, None
+    for path in paths:
+        entry = _source_entry(path)
+        clip = load_clip(path)
+        if clip is not None:
+            clip = np.asarray(clip, dtype=np.float32)
+            width = clip.shape[1] if width is None else width
+            if clip.ndim != 2 or clip.shape[1] != width:
+                print(f"Skipping {path}: expected {width} columns, got shape {clip.shape}")
+                clip = None
+        if clip is None:
+            entry.update(offset=offset, frames=None)
+        else:
+            entry.update(offset=offset, frames=len(clip))
+            clips.append(clip)
+            offset += len(clip)
+        entries.append(entry)
+
+    width = width or 0
+    atlas = np.concatenate(clips) if clips else np.zeros((0, width), dtype=np.float32)
+    index = {"version": CACHE_VERSION, "settings": settings, "width": width, "frames": offset, "clips": entries}
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        atlas_path, index_path = cache_paths(name)
+        _write_atomic(atlas_path, lambda f: np.save(f, atlas))
+        _write_index(index_path, index)
+    except OSError as e:
+        print(f"Could not write animation cache '{name}': {e}")
+    return atlas, index
+
+
+def load_clip_library(name: str, paths, load_clip, settings: dict = None) -> list:
+    """
+    Returns the clips for paths, in order, as read-only float32 views into the memory-mapped
+    atlas for library name (None for sources that failed to load).
+
+    load_clip(path) parses and prepares one source; it only runs when the cache is missing
+    or stale. settings describes how clips were prepared (e.g. blend_frames) and is part of
+    the cache key, so changing it forces a rebuild.
+    """
+    paths = list(paths)
+    settings = settings or {}
+    atlas_path, index_path = cache_paths(name)
+
+    atlas = index = None
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        mtimes = [clip["mtime_ns"] for clip in index.get("clips", [])]
+        if _index_is_current(index, paths, settings):
+            atlas = np.asarray(np.load(atlas_path, mmap_mode="r"))
+            if atlas.dtype != np.float32 or atlas.shape != (index["frames"], index["width"]):
+                raise ValueError(f"atlas shape {atlas.shape} does not match its index")
+    except (OSError, ValueError, KeyError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"Animation cache '{name}' is unreadable, rebuilding: {e}")
+        atlas = None
+
+    if atlas is not None and mtimes != [clip["mtime_ns"] for clip in index["clips"]]:
+        try:
+            _write_index(index_path, index)
+        except OSError as e:
+            print(f"Could not update animation cache index '{name}': {e}")
+
+    if atlas is None:
+        atlas, index = _compile(name, paths, load_clip, settings)
+
+    clips = []
+    for clip in index["clips"]:
+        if clip["frames"] is None:
+            clips.append(None)
+        else:
+            clips.append(atlas[clip["offset"]:clip["offset"] + clip["frames"]])
+    return clips
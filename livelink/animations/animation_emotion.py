@@ -1,6 +1,61 @@
+import random
+
 from livelink.connect.faceblendshapes import FaceBlendShape
 import numpy as np
 
+EMOTION_LABELS = ["Angry", "Disgusted", "Fearful", "Happy", "Neutral", "Sad", "Surprised"]
+NEUTRAL_INDEX = EMOTION_LABELS.index("Neutral")
+NEUTRAL_WEIGHT = 0.00
+EMOTION_FRAME_WIDTH = 68  # 61 blendshapes followed by the 7 emotion columns.
+
+# Blendshape dimensions that emotion animations are additively blended into.
+EMOTION_BLEND_DIMENSIONS = [
+    # Eye-related blend shapes
+  
+    FaceBlendShape.EyeSquintLeft.value,
+    FaceBlendShape.EyeWideLeft.value,
+
+    FaceBlendShape.EyeSquintRight.value,
+    FaceBlendShape.EyeWideRight.value,
+
+    # Brow-related blend shapes
+    FaceBlendShape.BrowDownLeft.value,
+    FaceBlendShape.BrowDownRight.value,
+    FaceBlendShape.BrowInnerUp.value,
+    FaceBlendShape.BrowOuterUpLeft.value,
+    FaceBlendShape.BrowOuterUpRight.value,
+    
+    # Cheek-related blend shapes
+    FaceBlendShape.CheekPuff.value,
+    FaceBlendShape.CheekSquintLeft.value,
+    FaceBlendShape.CheekSquintRight.value,
+
+    # Nose-related blend shapes
+    FaceBlendShape.NoseSneerLeft.value,
+    FaceBlendShape.NoseSneerRight.value,
+    FaceBlendShape.MouthLeft.value,
+    FaceBlendShape.MouthRight.value,
+    FaceBlendShape.MouthSmileLeft.value,
+    FaceBlendShape.MouthSmileRight.value,
+    FaceBlendShape.MouthFrownLeft.value,
+    FaceBlendShape.MouthFrownRight.value,
+    FaceBlendShape.MouthDimpleLeft.value,
+    FaceBlendShape.MouthDimpleRight.value,
+    FaceBlendShape.MouthStretchLeft.value,
+    FaceBlendShape.MouthStretchRight.value,
+    FaceBlendShape.MouthRollLower.value,
+    FaceBlendShape.MouthRollUpper.value,
+    FaceBlendShape.MouthShrugLower.value,
+    FaceBlendShape.MouthShrugUpper.value,
+    FaceBlendShape.MouthPressLeft.value,
+    FaceBlendShape.MouthPressRight.value,
+    FaceBlendShape.MouthLowerDownLeft.value,
+    FaceBlendShape.MouthLowerDownRight.value,
+    FaceBlendShape.MouthUpperUpLeft.value,
+    FaceBlendShape.MouthUpperUpRight.value,
+
+]
+
 # -------------------- Emotion Detection --------------------
 def determine_highest_emotion(facial_data, perform_calculation=True):
     """
@@ -13,37 +68,145 @@ def determine_highest_emotion(facial_data, perform_calculation=True):
     Returns:
       str: Dominant emotion label.
     """
-    if not perform_calculation or facial_data.shape[1] != 68:
+    if not perform_calculation or facial_data.shape[1] != EMOTION_FRAME_WIDTH:
         return "Neutral"
     
     # Extract the last 7 columns (assumed to be emotion values)
     emotion_data = facial_data[:, -7:]
     # Compute average for each emotion dimension
     emotion_averages = np.sum(emotion_data, axis=0) / facial_data.shape[0]
-    # Apply a weight to "Neutral" (assumed index 4)
-    neutral_weight = 0.00
-    emotion_averages[4] *= neutral_weight
+    # Apply a weight to "Neutral"
+    emotion_averages[NEUTRAL_INDEX] *= NEUTRAL_WEIGHT
     
-    emotion_labels = ["Angry", "Disgusted", "Fearful", "Happy", "Neutral", "Sad", "Surprised"]
     highest_idx = int(np.argmax(emotion_averages))
-    return emotion_labels[highest_idx]
+    return EMOTION_LABELS[highest_idx]
+
+
+class StreamingEmotionDetector:
+    """
+    Incremental version of determine_highest_emotion over a sliding window of frames.
+
+    update() takes frames as they arrive and returns the (frame_index, emotion) changes they
+    cause, with frame_index counted from the first frame ever pushed (frames without emotion
+    columns count, but do not enter the window). The window sum is kept running: each frame
+    adds its row and subtracts the one leaving the window, kept in a ring buffer, so an update
+    costs O(n) for n frames no matter how long the window or the utterance is.
+    The first emotion is only decided once the window has filled, so it is not the label of a
+    single frame. After that, a different emotion must lead for min_hold_frames consecutive
+    frames before it replaces the current one.
+    """
+
+    def __init__(self, window_frames: int = 180, min_hold_frames: int = 60, neutral_weight: float = NEUTRAL_WEIGHT) -> None:
+        if window_frames < 1:
+            raise ValueError("window_frames must be at least 1.")
+        self.window_frames = window_frames
+        self.min_hold_frames = min_hold_frames
+        self._weights = np.ones(len(EMOTION_LABELS))
+        self._weights[NEUTRAL_INDEX] = neutral_weight
+        self.reset()
+
+    def reset(self) -> None:
+        self.frames_seen = 0
+        self.frames_consumed = 0  # Frames with emotion columns, which entered the window.
+        self._ring = np.zeros((self.window_frames, len(EMOTION_LABELS)))  # Row k is in slot k % window_frames.
+        self._sum = np.zeros(len(EMOTION_LABELS))  # Sum of the rows in the window.
+        self._current_index = None
+        self._candidate = None  # (label index, first frame) of a challenger that has not held long enough yet.
+
+    @property
+    def current(self):
+        return None if self._current_index is None else EMOTION_LABELS[self._current_index]
+
+    def update(self, facial_data, final: bool = False) -> list:
+        """
+        Adds the next frames and returns the changes they cause. The first emotion is decided
+        at the frame where the window fills, or at the last frame if final is set (the end of a
+        clip shorter than the window), and reported from the first frame of this update, so a
+        clip passed in one call gets it throughout. Later changes are reported from the frame
+        where the new emotion has led for min_hold_frames.
+        """
+        facial_data = np.asarray(facial_data)
+        frame_count = len(facial_data)
+        first_frame = self.frames_seen
+        self.frames_seen += frame_count
+        if frame_count == 0 or facial_data.ndim != 2 or facial_data.shape[1] != EMOTION_FRAME_WIDTH:
+            return []
+
+        labels = np.argmax(self._window_sums(facial_data[:, -len(EMOTION_LABELS):]) * self._weights, axis=1)
+        consumed = self.frames_consumed - frame_count  # Window frames before this update.
+
+        changes = []
+        offset = 0
+        if self._current_index is None:
+            decision = max(0, self.window_frames - 1 - consumed)
+            if final:
+                decision = min(decision, frame_count - 1)
+            if decision >= frame_count:
+                return []
+            self._current_index = int(labels[decision])
+            changes.append((first_frame, EMOTION_LABELS[self._current_index]))
+            offset = decision + 1
+
+        # Walk the runs of equal labels; only a run that differs from the current emotion matters.
+        labels = labels[offset:]
+        run_starts = np.concatenate([[0], np.flatnonzero(np.diff(labels)) + 1]).astype(int)
+        run_ends = np.append(run_starts[1:], len(labels))
+        hold = max(1, self.min_hold_frames)
+        for run_start, run_end in zip(run_starts, run_ends):
+            if run_start == run_end:
+                continue
+            label = int(labels[run_start])
+            if label == self._current_index:
+                self._candidate = None
+                continue
+            frame = first_frame + offset + run_start
+            # A run continues the candidate only if it carries on from the end of the previous update.
+            if run_start > 0 or self._candidate is None or self._candidate[0] != label:
+                self._candidate = (label, frame)
+            switch_frame = self._candidate[1] + hold - 1
+            if switch_frame < first_frame + offset + run_end:
+                self._current_index = label
+                self._candidate = None
+                changes.append((switch_frame, EMOTION_LABELS[label]))
+        return changes
+
+    def _window_sums(self, values) -> np.ndarray:
+        """
+        Pushes rows into the window and returns the window sum after each one. Row i leaves the
+        window when row i + window_frames enters: rows from earlier updates come from the ring.
+        """
+        count = len(values)
+        if count == 0:
+            return np.zeros((0, values.shape[1]))
+        window = self.window_frames
+        start = self.frames_consumed
+        positions = start + np.arange(count)
+        leaving = np.zeros((count, values.shape[1]))
+        from_ring = (positions >= window) & (positions < start + window)
+        leaving[from_ring] = self._ring[positions[from_ring] % window]
+        if count > window:
+            leaving[window:] = values[:count - window]
+        sums = self._sum + np.cumsum(values - leaving, axis=0)
+
+        kept = min(count, window)
+        self._ring[positions[count - kept:] % window] = values[count - kept:]
+        self.frames_consumed += count
+        if count >= window:
+            # The window is all new rows: re-sum them so rounding never builds up.
+            sums[-1] = self._ring.sum(axis=0)
+        self._sum = sums[-1]
+        return sums
 
 
 # -------------------- Helper Functions --------------------
 def adjust_animation_data_length(facial_data, animation_data):
     """
     Adjusts the length of animation_data to match facial_data.
-    If animation_data is too short, it is repeated cyclically.
+    If animation_data is too short, it is repeated cyclically; if too long, it is truncated.
     """
-    facial_length = len(facial_data)
-    animation_length = len(animation_data)
-    if animation_length >= facial_length:
-        return animation_data[:facial_length]
-    else:
-        extended = list(animation_data)
-        for i in range(facial_length - animation_length):
-            extended.append(animation_data[i % animation_length])
-        return extended
+    animation_data = np.asarray(animation_data)
+    frame_indices = np.arange(len(facial_data)) % len(animation_data)
+    return np.take(animation_data, frame_indices, axis=0)
 
 def blend_data_dimensions_to_loop(facial_data, dimensions, blend_frame_count):
     """
@@ -64,24 +227,23 @@ def merge_animation_data_into_facial_data(facial_data, animation_data, dimension
     The blending formula is:
         final_value = base_value + alpha * animation_delta
     The result is clamped between 0.0 and 1.0.
+
+    The whole clip is blended in one float32 array op; facial_data is not modified.
     """
-    # Ensure the animation data matches the length of facial_data.
-    animation_data = adjust_animation_data_length(facial_data, animation_data)
-    num_frames = len(facial_data)
-    
-    # Copy the original facial data to avoid modifying it in place.
-    blended_facial_data = [frame.copy() for frame in facial_data]
-    
-    # Apply additive blending for each frame and specified dimension.
-    for i in range(num_frames):
-        for dim in dimensions:
-            base_value = blended_facial_data[i][dim]
-            animation_delta = animation_data[i][dim]
-            blended_value = base_value + alpha * animation_delta
-            # Clamp the value to [0.0, 1.0]
-            blended_value = min(max(blended_value, 0.0), 1.0)
-            blended_facial_data[i][dim] = blended_value
-            
+    blended_facial_data = np.array(facial_data, dtype=np.float32)
+    if len(blended_facial_data) == 0 or len(animation_data) == 0:
+        return blended_facial_data
+
+    dimensions = np.asarray(dimensions, dtype=np.intp)
+    animation_data = np.asarray(animation_data, dtype=np.float32)
+    # Cyclic frame indices pick only the blended columns, without materialising a full-width copy.
+    frame_indices = np.arange(len(blended_facial_data)) % len(animation_data)
+    animation_delta = animation_data[frame_indices[:, None], dimensions]
+
+    blended = blended_facial_data[:, dimensions]
+    blended += np.float32(alpha) * animation_delta
+    np.clip(blended, 0.0, 1.0, out=blended)
+    blended_facial_data[:, dimensions] = blended
     return blended_facial_data
 
 
@@ -92,68 +254,98 @@ def merge_emotion_data_into_facial_data_wrapper(facial_data, emotion_animation_d
     It blends the specified dimensions additively and then smooths the loop.
     
     Parameters:
-      facial_data (list of lists): Generated facial data.
-      emotion_animation_data (list of lists): Preloaded emotion animation data.
+      facial_data (np.ndarray): Generated facial data, shape (num_frames, dims).
+      emotion_animation_data (np.ndarray): Preloaded emotion animation data; looped or truncated to fit.
       alpha (float): Blending weight.
-      blend_frame_count (int): Number of frames over which to smooth the loop.
     
     Returns:
-      list of lists: Blended facial data.
+      np.ndarray: Blended facial data as float32.
     """
-    dimensions = [
-        # Eye-related blend shapes
-      
-        FaceBlendShape.EyeSquintLeft.value,
-        FaceBlendShape.EyeWideLeft.value,
-
-        FaceBlendShape.EyeSquintRight.value,
-        FaceBlendShape.EyeWideRight.value,
-
-        # Brow-related blend shapes
-        FaceBlendShape.BrowDownLeft.value,
-        FaceBlendShape.BrowDownRight.value,
-        FaceBlendShape.BrowInnerUp.value,
-        FaceBlendShape.BrowOuterUpLeft.value,
-        FaceBlendShape.BrowOuterUpRight.value,
-        
-        # Cheek-related blend shapes
-        FaceBlendShape.CheekPuff.value,
-        FaceBlendShape.CheekSquintLeft.value,
-        FaceBlendShape.CheekSquintRight.value,
-
-        # Nose-related blend shapes
-        FaceBlendShape.NoseSneerLeft.value,
-        FaceBlendShape.NoseSneerRight.value,
-        FaceBlendShape.MouthLeft.value,
-        FaceBlendShape.MouthRight.value,
-        FaceBlendShape.MouthSmileLeft.value,
-        FaceBlendShape.MouthSmileRight.value,
-        FaceBlendShape.MouthFrownLeft.value,
-        FaceBlendShape.MouthFrownRight.value,
-        FaceBlendShape.MouthDimpleLeft.value,
-        FaceBlendShape.MouthDimpleRight.value,
-        FaceBlendShape.MouthStretchLeft.value,
-        FaceBlendShape.MouthStretchRight.value,
-        FaceBlendShape.MouthRollLower.value,
-        FaceBlendShape.MouthRollUpper.value,
-        FaceBlendShape.MouthShrugLower.value,
-        FaceBlendShape.MouthShrugUpper.value,
-        FaceBlendShape.MouthPressLeft.value,
-        FaceBlendShape.MouthPressRight.value,
-        FaceBlendShape.MouthLowerDownLeft.value,
-        FaceBlendShape.MouthLowerDownRight.value,
-        FaceBlendShape.MouthUpperUpLeft.value,
-        FaceBlendShape.MouthUpperUpRight.value,
-
-    ]
-    
-    # Ensure emotion_animation_data matches the length of facial_data.
-    emotion_animation_data = adjust_animation_data_length(facial_data, emotion_animation_data)
     
-    # Merge using additive blending.
-    facial_data = merge_animation_data_into_facial_data(facial_data, emotion_animation_data, dimensions, alpha)
+    # Merge using additive blending (the animation is looped to the clip length inside).
+    facial_data = merge_animation_data_into_facial_data(facial_data, emotion_animation_data, EMOTION_BLEND_DIMENSIONS, alpha)
     
     # -------------------- Added Print Statement --------------------
     print("Successfully merged emotion data!")  # This print indicates successful merging of emotion data.
        
     return facial_data
+
+
+class EmotionOverlayTrack:
+    """
+    Blends emotion animations into facial data as it arrives, switching to a random animation
+    of the new emotion wherever the detector reports a change, with a short crossfade.
+
+    Use one track per stream: consecutive apply() calls continue the same loop and detector window.
+    """
+
+    def __init__(self, animations, detector=None, alpha: float = 0.7, crossfade_frames: int = 15,
+                 dimensions=EMOTION_BLEND_DIMENSIONS) -> None:
+        self.animations = animations
+        self.detector = detector if detector is not None else StreamingEmotionDetector()
+        self.alpha = alpha
+        self.crossfade_frames = crossfade_frames
+        self.dimensions = np.asarray(dimensions, dtype=np.intp)
+        self.changes = []
+        self._active = None
+        self._previous = None
+        self._switch_frame = 0
+
+    def _select_layer(self, emotion: str, start_frame: int):
+        choices = self.animations.get(emotion)
+        if not choices:
+            return None
+        animation = np.asarray(random.choice(choices), dtype=np.float32)[:, self.dimensions]
+        return animation, start_frame
+
+    @staticmethod
+    def _layer_delta(layer, frames: np.ndarray, width: int) -> np.ndarray:
+        if layer is None:
+            return np.zeros((len(frames), width), dtype=np.float32)
+        animation, start_frame = layer
+        return animation[(frames - start_frame) % len(animation)]
+
+    def apply(self, facial_data, final: bool = False) -> np.ndarray:
+        """
+        Returns facial_data (as float32) with the emotion overlay added. The detected changes are
+        appended to self.changes. Set final on the last frames of the stream (or on a whole clip),
+        so a clip shorter than the detector's window still gets an emotion.
+        """
+        merged = np.array(facial_data, dtype=np.float32)
+        if merged.ndim != 2 or len(merged) == 0:
+            return merged
+
+        first_frame = self.detector.frames_seen
+        changes = self.detector.update(merged, final)
+        self.changes.extend(changes)
+
+        frames = first_frame + np.arange(len(merged))
+        width = len(self.dimensions)
+        delta = np.empty((len(merged), width), dtype=np.float32)
+        layered = False
+        boundaries = [first_frame] + [frame for frame, _ in changes] + [first_frame + len(merged)]
+        for segment, (start, stop) in enumerate(zip(boundaries[:-1], boundaries[1:])):
+            if segment > 0:
+                self._previous = self._active
+                self._active = self._select_layer(changes[segment - 1][1], start)
+                self._switch_frame = start
+            if stop == start:
+                continue
+            segment_frames = frames[start - first_frame:stop - first_frame]
+            layered |= self._active is not None or self._previous is not None
+            segment_delta = self._layer_delta(self._active, segment_frames, width)
+            if self._previous is not None and self.crossfade_frames > 0:
+                weight = np.clip((segment_frames - self._switch_frame + 1) / (self.crossfade_frames + 1), 0.0, 1.0)[:, None]
+                previous_delta = self._layer_delta(self._previous, segment_frames, width)
+                segment_delta = (1.0 - weight) * previous_delta + weight * segment_delta
+                if weight[-1, 0] >= 1.0:
+                    self._previous = None
+            delta[start - first_frame:stop - first_frame] = segment_delta
+
+        if not layered:
+            return merged
+        blended = merged[:, self.dimensions]
+        blended += np.float32(self.alpha) * delta
+        np.clip(blended, 0.0, 1.0, out=blended)
+        merged[:, self.dimensions] = blended
+        return merged
@@ -1,6 +1,8 @@
 import os
 import numpy as np
-import pandas as pd
+
+from livelink.animations.animation_cache import load_clip_library
+from utils.resources import register_resource, get_resource
 
 def load_animation_from_csv(csv_path):
     """
@@ -13,6 +15,7 @@ def load_animation_from_csv(csv_path):
         np.ndarray or None: The animation data as a NumPy array, or None if an error occurs.
     """
     try:
+        import pandas as pd
         data = pd.read_csv(csv_path)
         # Drop columns that are not needed for animation processing.
         data = data.drop(columns=['Timecode', 'BlendshapeCount'], errors='ignore')
@@ -42,6 +45,29 @@ def blend_animation(data, blend_frames=30):
     blended_data = np.vstack([data[:-blend_frames], blended_frames])
     return blended_data
 
+def load_blended_animation(csv_path, blend_frames=30):
+    """
+    Loads one animation CSV and blends its end into its start, or returns None on error.
+    """
+    animation = load_animation_from_csv(csv_path)
+    if animation is None:
+        return None
+    try:
+        return blend_animation(animation, blend_frames=blend_frames)
+    except Exception as e:
+        print(f"Error blending animation {csv_path}: {e}")
+        return None
+
+def list_animation_files(folder_path):
+    """
+    Returns the sorted CSV paths in folder_path, or an empty list if it does not exist.
+    """
+    if not os.path.isdir(folder_path):
+        print(f"Directory {folder_path} does not exist.")
+        return []
+    return [os.path.join(folder_path, file_name) for file_name in sorted(os.listdir(folder_path))
+            if file_name.endswith('.csv')]
+
 def load_emotion_animations(folder_path, blend_frames=30):
     """
     Loads all CSV animation files from a given folder, blends their start and end frames,
@@ -55,21 +81,32 @@ def load_emotion_animations(folder_path, blend_frames=30):
         list: A list of blended animations as NumPy arrays.
     """
     animations = []
-    if not os.path.isdir(folder_path):
-        print(f"Directory {folder_path} does not exist.")
-        return animations
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith('.csv'):
-            file_path = os.path.join(folder_path, file_name)
-            animation = load_animation_from_csv(file_path)
-            if animation is not None:
-                try:
-                    blended = blend_animation(animation, blend_frames=blend_frames)
-                    animations.append(blended)
-                except Exception as e:
-                    print(f"Error blending animation {file_path}: {e}")
+    for file_path in list_animation_files(folder_path):
+        blended = load_blended_animation(file_path, blend_frames)
+        if blended is not None:
+            animations.append(blended)
     return animations
 
+def load_emotion_library(emotion_paths, blend_frames=30):
+    """
+    Loads every emotion folder at once through the compiled animation cache: one memory-mapped
+    float32 atlas instead of a pandas parse per CSV. The cache is rebuilt if any CSV changes.
+    
+    Parameters:
+        emotion_paths (dict): Emotion label -> folder of animation CSV files.
+        blend_frames (int): Number of frames to blend for smooth looping.
+        
+    Returns:
+        dict: Emotion label -> list of blended animations (read-only float32 arrays).
+    """
+    files = {emotion: list_animation_files(folder) for emotion, folder in emotion_paths.items()}
+    paths = [path for emotion_files in files.values() for path in emotion_files]
+    clips = load_clip_library("emotions", paths, lambda path: load_blended_animation(path, blend_frames),
+                              settings={"blend_frames": blend_frames})
+    clips_by_path = dict(zip(paths, clips))
+    return {emotion: [clips_by_path[path] for path in emotion_files if clips_by_path[path] is not None]
+            for emotion, emotion_files in files.items()}
+
 # Define emotion folder paths.
 emotion_paths = {
     "Angry": os.path.join("livelink", "animations", "Angry"),
@@ -81,8 +118,19 @@ emotion_paths = {
     "Surprised": os.path.join("livelink", "animations", "Surprised")
 }
 
-# Preload emotion animations into a global dictionary.
-emotion_animations = {}
-for emotion, folder in emotion_paths.items():
-    emotion_animations[emotion] = load_emotion_animations(folder)
-    print(f"Loaded {len(emotion_animations[emotion])} animations for emotion '{emotion}'")
+def _load_emotion_animations():
+    animations = load_emotion_library(emotion_paths)
+    for emotion in emotion_paths:
+        print(f"Loaded {len(animations[emotion])} animations for emotion '{emotion}'")
+    return animations
+
+# Emotion animations are loaded on first use, not at import.
+register_resource("emotion_animations", _load_emotion_animations)
+
+def get_emotion_animations():
+    return get_resource("emotion_animations")
+
+def __getattr__(name):
+    if name == "emotion_animations":
+        return get_resource("emotion_animations")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
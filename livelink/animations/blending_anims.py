@@ -7,7 +7,9 @@
 import time
 import numpy as np
 
-from livelink.animations.default_animation import default_animation_data, FaceBlendShape
+from livelink.connect.livelink_init import FaceBlendShape
+from livelink.animations.default_animation import get_default_animation_data
+from livelink.connect.packet_encoder import encode_facial_frames
 
 
 def play_full_animation(facial_data, fps, py_face, socket_connection, blend_in_frames, blend_out_frames):
@@ -17,6 +19,7 @@ def play_full_animation(facial_data, fps, py_face, socket_connection, blend_in_f
         time.sleep(1 / fps)
 
 def apply_blendshapes(frame_data: np.ndarray, weight: float, py_face):
+    default_animation_data = get_default_animation_data()
     for i in range(51):  # Apply the first 51 blendshapes (no neck at the moment)
         default_value = default_animation_data[0][i]
         facial_value = frame_data[i]
@@ -33,18 +36,52 @@ def apply_blendshapes(frame_data: np.ndarray, weight: float, py_face):
     emotions = ["Angry", "Disgusted", "Fearful", "Happy", "Neutral", "Sad", "Surprised"]
     print(f"Highest emotion: {emotions[max_emotion_index]} with value: {additional_values[max_emotion_index]:.2f}")'''
 
-def blend_in(facial_data, fps, py_face, encoded_data, blend_in_frames):
-    for frame_index in range(blend_in_frames):
-        weight = frame_index / blend_in_frames
-        apply_blendshapes(facial_data[frame_index], weight, py_face)
-        encoded_data.append(py_face.encode())
-        time.sleep(1 / fps)
+# Easing curves for the offline blend stage, mapping progress t in [0, 1) to a weight.
+BLEND_CURVES = {
+    "linear": lambda t: t,
+    "smoothstep": lambda t: t * t * (3.0 - 2.0 * t),
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1.0 - (1.0 - t) ** 2,
+    "cosine": lambda t: 0.5 - 0.5 * np.cos(np.pi * t),
+}
 
-def blend_out(facial_data, fps, py_face, encoded_data, blend_out_frames):
-    for frame_index in range(blend_out_frames):
-        weight = frame_index / blend_out_frames
-        reverse_index = len(facial_data) - blend_out_frames + frame_index
-        apply_blendshapes(facial_data[reverse_index], 1.0 - weight, py_face)
-        encoded_data.append(py_face.encode())
-        time.sleep(1 / fps)
+def blend_weights(frame_count, curve="linear"):
+    """
+    Returns the blend-in weight of every frame (i / frame_count shaped by curve).
+    """
+    if curve not in BLEND_CURVES:
+        raise ValueError(f"Unknown blend curve '{curve}'. Expected one of {list(BLEND_CURVES)}.")
+    return BLEND_CURVES[curve](np.arange(frame_count) / frame_count)
+
+def blend_with_default(frames, weights, py_face):
+    """
+    Array version of apply_blendshapes: blends the first 51 blendshapes of every frame towards
+    the first default animation frame by its weight. Remaining columns keep py_face's values.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    blended = np.tile(np.asarray(py_face._blend_shapes, dtype=np.float64), (len(frames), 1))
+    if len(frames) == 0:
+        return blended
+    weights = np.asarray(weights, dtype=np.float64)[:, None]
+    blended[:, :51] = (1 - weights) * get_default_animation_data()[0][:51] + weights * frames[:, :51]
+    return blended
+
+def offline_blend_in(facial_data, blend_in_frames, py_face, curve="linear"):
+    """
+    Computes the blend-in frames of a clip as an (n, 61) array, without any wall-clock wait.
+    """
+    frames = np.asarray(facial_data, dtype=np.float64)[:blend_in_frames]
+    return blend_with_default(frames, blend_weights(blend_in_frames, curve), py_face)
+
+def offline_blend_out(facial_data, blend_out_frames, py_face, curve="linear"):
+    """
+    Computes the blend-out frames of a clip as an (n, 61) array, without any wall-clock wait.
+    """
+    frames = np.asarray(facial_data, dtype=np.float64)[len(facial_data) - blend_out_frames:]
+    return blend_with_default(frames, 1.0 - blend_weights(blend_out_frames, curve), py_face)
+
+def blend_in(facial_data, fps, py_face, encoded_data, blend_in_frames, curve="linear"):
+    encoded_data.extend(encode_facial_frames(offline_blend_in(facial_data, blend_in_frames, py_face, curve), py_face))
 
+def blend_out(facial_data, fps, py_face, encoded_data, blend_out_frames, curve="linear"):
+    encoded_data.extend(encode_facial_frames(offline_blend_out(facial_data, blend_out_frames, py_face, curve), py_face))
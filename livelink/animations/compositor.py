@@ -0,0 +1,409 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# compositor.py
+# One long-lived thread that owns the LiveLink socket and emits exactly one packet per tick,
+# mixing the idle loop, speech clips, an eye override and an emotion overlay.
+
+import time
+from collections import deque
+from threading import Event, Lock
+
+import numpy as np
+
+from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
+from livelink.connect.packet_encoder import encode_facial_frames, BLENDSHAPE_COUNT
+from livelink.connect.frame_clock import get_frame_clock
+from livelink.frame_pacer import sleep_until_ns, AudioClockFollower, NANOSECONDS, SPIN_THRESHOLD_NS, SYNC_MODES, OUTPUT_LATENCY_MS, CLOCK_STALL_SECONDS
+from livelink.animations.default_animation import idle_clips, get_idle_clip
+from livelink.animations.animation_emotion import EMOTION_BLEND_DIMENSIONS
+from livelink.send_to_unreal import EYE_REPLACEMENT_INDICES
+
+
+def pad_frames(frames, py_face) -> np.ndarray:
+    """
+    Widens frames to all 61 blendshapes, filling missing columns with py_face's current values.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    padded = np.tile(np.asarray(py_face._blend_shapes, dtype=np.float64), (len(frames), 1))
+    columns = min(frames.shape[1], BLENDSHAPE_COUNT)
+    padded[:, :columns] = frames[:, :columns]
+    return padded
+
+
+class TimedClip:
+    """
+    How a queued clip's frames line up with its audio. By default the clip starts on the first
+    tick after start_event is set and advances one frame per tick. origin_clock, if given,
+    returns the perf_counter_ns() time of frame 0 (e.g. when the clip's first audio sample is
+    heard) and the clip starts on that tick instead. With sync="audio" and an audio_clock the
+    frame for each tick is picked from the audio being heard (less output_latency_ms), as
+    FramePacer does: the clip waits on the idle loop until the audio starts, and if the clock
+    stops (the audio ended or was stopped) it carries on one frame per tick. stall_seconds is
+    passed to AudioClockFollower; None suits audio that is still arriving and may pause.
+    """
+
+    def __init__(self, start_event=None, audio_clock=None, origin_clock=None, sync: str = "clock",
+                 output_latency_ms: float = OUTPUT_LATENCY_MS, fps: int = 60, stall_seconds=CLOCK_STALL_SECONDS) -> None:
+        self.start_tick = None
+        self.done = Event()
+        self.set_timing(start_event, audio_clock, origin_clock, sync, output_latency_ms, fps, stall_seconds)
+
+    def set_timing(self, start_event=None, audio_clock=None, origin_clock=None, sync: str = "clock",
+                   output_latency_ms: float = OUTPUT_LATENCY_MS, fps: int = 60, stall_seconds=CLOCK_STALL_SECONDS) -> None:
+        if sync not in SYNC_MODES:
+            raise ValueError(f"Unknown sync mode '{sync}'. Expected one of {SYNC_MODES}.")
+        self.start_event = start_event
+        self.origin_clock = origin_clock
+        self.fps = fps
+        self.audio_clock = None
+        if sync == "audio" and audio_clock is not None:
+            self.audio_clock = AudioClockFollower(audio_clock, output_latency_ms, stall_seconds)
+        self._clock_index = 0
+        self._clock_tick = None
+
+    def ready(self) -> bool:
+        if self.start_event is not None and not self.start_event.is_set():
+            return False
+        return self.audio_clock is None or self.audio_clock.media_seconds() is not None or self.audio_clock.lost
+
+    def target_index(self, tick: int) -> int:
+        """
+        The frame index that belongs to tick, ignoring the clip's length.
+        """
+        if self.audio_clock is None:
+            return max(0, tick - self.start_tick)
+        media_seconds = self.audio_clock.media_seconds()
+        if media_seconds is not None:
+            index = max(int(media_seconds * self.fps), self._clock_index)
+        else:
+            last_tick = self.start_tick if self._clock_tick is None else self._clock_tick
+            index = self._clock_index + tick - last_tick
+        self._clock_index, self._clock_tick = index, tick
+        return index
+
+
+class SpeechClip(TimedClip):
+    """
+    A composed speech clip queued on the compositor. frames holds the (N, 61) values used
+    while crossfading or overlaying; packets holds the same frames pre-encoded for the
+    fast path. done is set once the last frame has been emitted (or the clip was dropped).
+    Timing arguments are those of TimedClip.
+    """
+
+    def __init__(self, frames, py_face, start_event=None, **timing) -> None:
+        super().__init__(start_event, **timing)
+        self.frames = pad_frames(frames, py_face)
+        self.packets = encode_facial_frames(self.frames, py_face)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def frame_index(self, tick: int):
+        """
+        Index of the frame to show at tick, or None once the clip has played out.
+        """
+        index = self.target_index(tick)
+        return index if index < len(self.frames) else None
+
+    def frame(self, index: int):
+        """
+        Returns (frame, packets, packet_index) for a frame index from frame_index().
+        """
+        return self.frames[index], self.packets, index
+
+
+class StreamedSpeechClip(TimedClip):
+    """
+    A speech clip whose frames arrive while it plays, drained from a FrameJitterBuffer of
+    composed windows. It starts once the clip is ready (see TimedClip) and the buffer is
+    prefilled. If the next window is late the last frame is held. On the tick clock the rest
+    of the clip then moves back a tick, so no streamed frame is skipped; following an audio
+    clock, the frames the audio passed meanwhile are skipped once the window arrives.
+    """
+
+    def __init__(self, jitter_buffer, py_face, start_event=None, **timing) -> None:
+        super().__init__(start_event, **timing)
+        self.jitter_buffer = jitter_buffer
+        self.py_face = py_face
+        self.held_ticks = 0
+        self.frames_skipped = 0
+        self._frames = None
+        self._packets = None
+        self._window_start = 0
+        self._window_end = 0
+        self._last_index = -1
+
+    def ready(self) -> bool:
+        return self.jitter_buffer.ready() and super().ready()
+
+    def frame_index(self, tick: int):
+        index = self.target_index(tick)
+        while index >= self._window_end:
+            window = self.jitter_buffer.get_window(block=False)
+            if window is None:
+                if self.jitter_buffer.finished or self._frames is None:
+                    return None
+                if self.audio_clock is None:
+                    self.start_tick += 1
+                self.held_ticks += 1
+                self._last_index = self._window_end - 1
+                return self._last_index
+            self._frames = pad_frames(window, self.py_face)
+            self._packets = encode_facial_frames(self._frames, self.py_face)
+            self._window_start, self._window_end = self._window_end, self._window_end + len(self._frames)
+        self.frames_skipped += max(0, index - self._last_index - 1)
+        self._last_index = index
+        return index
+
+    def frame(self, index: int):
+        local = index - self._window_start
+        return self._frames[local], self._packets, local
+
+
+class IdlePacketRing:
+    """
+    An idle loop encoded once up front. Replaying it only patches the timecode of the next
+    packet, so an idle avatar costs no blendshape or struct work per tick.
+    Rebuild the ring if the face's scaling factors change.
+    """
+
+    def __init__(self, frames, py_face) -> None:
+        self.frames = pad_frames(frames, py_face)
+        self.packets = encode_facial_frames(self.frames, py_face)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+
+class AnimationCompositor:
+    def __init__(self, py_face, fps: int = 60, crossfade_frames: int = None) -> None:
+        self.py_face = py_face
+        self.fps = fps
+        self.crossfade_frames = crossfade_frames if crossfade_frames is not None else int(0.1 * fps)
+        self.ticks_dropped = 0
+        self._idle_rings = {}
+        self._idle = self._idle_ring("default")
+
+        self._lock = Lock()
+        self._running = Event()
+        self._pending = deque()
+        self._speech = None
+        self._eye_override = None
+        self._emotion_overlay = None
+        self._fade_from = None
+        self._fade_position = 0
+        self._last_frame = self._idle.frames[0].copy()
+        self._origin_ns = time.perf_counter_ns()  # Time of tick 0, reset when run() starts.
+
+    # -------------------- Layer control --------------------
+    def is_running(self) -> bool:
+        return self._running.is_set()
+
+    def _idle_ring(self, name: str) -> IdlePacketRing:
+        if name not in self._idle_rings:
+            try:
+                frames = get_idle_clip(name)
+            except KeyError:
+                raise ValueError(f"Unknown idle clip '{name}'. Registered clips: {['default', *idle_clips]}.") from None
+            self._idle_rings[name] = IdlePacketRing(frames, self.py_face)
+        return self._idle_rings[name]
+
+    def set_idle_clip(self, name: str) -> None:
+        """
+        Switches the idle layer to a clip registered with register_idle_clip, crossfading into it.
+        """
+        ring = self._idle_ring(name)
+        with self._lock:
+            self._idle = ring
+            if self._speech is None:
+                self._start_fade()
+
+    def play_clip(self, frames, start_event=None, **timing) -> SpeechClip:
+        """
+        Queues a speech clip. It starts on the first tick after start_event is set
+        (immediately if None); wait on the returned clip's done event for completion.
+        timing takes the audio_clock, origin_clock, sync, output_latency_ms and stall_seconds of
+        TimedClip, mostly the same arguments send_pre_encoded_data_to_unreal is timed with.
+        """
+        timing.setdefault("fps", self.fps)
+        if isinstance(frames, SpeechClip):
+            clip = frames
+            clip.set_timing(start_event, **timing)
+        else:
+            clip = SpeechClip(frames, self.py_face, start_event, **timing)
+        if len(clip) == 0:
+            clip.done.set()
+            return clip
+        with self._lock:
+            self._pending.append(clip)
+        return clip
+
+    def play_stream(self, jitter_buffer, start_event=None, **timing) -> StreamedSpeechClip:
+        """
+        Queues a speech clip that is still arriving: composed (n, 61) windows are taken from
+        jitter_buffer as they are needed. timing is as for play_clip. Wait on the returned
+        clip's done event for completion.
+        """
+        timing.setdefault("fps", self.fps)
+        clip = StreamedSpeechClip(jitter_buffer, self.py_face, start_event, **timing)
+        with self._lock:
+            self._pending.append(clip)
+        return clip
+
+    def set_eye_override(self, frames=None) -> None:
+        """
+        Replaces blink, squint and eye-wide with a looping (k, 61) animation, or clears it with None.
+        """
+        with self._lock:
+            self._eye_override = None if frames is None else pad_frames(frames, self.py_face)
+
+    def set_emotion_overlay(self, animation=None, alpha: float = 0.7) -> None:
+        """
+        Additively blends a looping emotion animation into the output, or clears it with None.
+        """
+        with self._lock:
+            self._emotion_overlay = None if animation is None else (pad_frames(animation, self.py_face), alpha)
+
+    # -------------------- Mixing --------------------
+    def _start_fade(self) -> None:
+        self._fade_from = self._last_frame.copy()
+        self._fade_position = 0
+
+    def _advance_speech(self, tick: int):
+        """
+        Starts, advances or finishes the speech layer. Returns the current speech frame index or None.
+        """
+        if self._speech is None and self._pending:
+            clip = self._pending[0]
+            if clip.ready():
+                self._pending.popleft()
+                clip.start_tick = tick if clip.origin_clock is None else self._tick_at_ns(clip.origin_clock())
+                self._speech = clip
+                self._start_fade()
+
+        if self._speech is None:
+            return None
+
+        index = self._speech.frame_index(tick)
+        if index is not None:
+            return index
+
+        self._speech.done.set()
+        self._speech = None
+        self._start_fade()
+        return self._advance_speech(tick) if self._pending else None
+
+    def _tick_at_ns(self, time_ns: int) -> int:
+        """
+        The tick whose deadline is nearest to a perf_counter_ns() time.
+        """
+        return round((time_ns - self._origin_ns) * self.fps / NANOSECONDS)
+
+    def compose(self, tick: int):
+        """
+        Mixes all layers for a tick. Returns (frame, packets, index); packets is the speech clip's
+        or idle ring's EncodedFrames when packets[index] can be sent with only its timecode patched.
+        """
+        speech_index = self._advance_speech(tick)
+        if speech_index is None:
+            packets, index = self._idle.packets, tick % len(self._idle)
+            frame = self._idle.frames[index]
+        else:
+            frame, packets, index = self._speech.frame(speech_index)
+
+        fading = self._fade_from is not None and self._fade_position < self.crossfade_frames
+        if fading:
+            weight = (self._fade_position + 1) / (self.crossfade_frames + 1)
+            frame = (1.0 - weight) * self._fade_from + weight * frame
+            self._fade_position += 1
+
+        overlays = self._emotion_overlay is not None or self._eye_override is not None
+        if fading or overlays:
+            packets = None
+
+        if overlays:
+            frame = frame.copy()
+        if self._emotion_overlay is not None:
+            animation, alpha = self._emotion_overlay
+            overlay = animation[tick % len(animation)]
+            frame[EMOTION_BLEND_DIMENSIONS] = np.clip(frame[EMOTION_BLEND_DIMENSIONS] + alpha * overlay[EMOTION_BLEND_DIMENSIONS], 0.0, 1.0)
+        if self._eye_override is not None:
+            frame[EYE_REPLACEMENT_INDICES] = self._eye_override[tick % len(self._eye_override)][EYE_REPLACEMENT_INDICES]
+
+        self._last_frame = frame
+        return frame, packets, index
+
+    # -------------------- Output loop --------------------
+    def _emit(self, socket_connection, tick: int, frame_number: int) -> None:
+        with self._lock:
+            frame, packets, index = self.compose(tick)
+            if packets is not None:
+                packets.set_frame_number(index, frame_number, 0)
+                packet = packets[index]
+            else:
+                packet = encode_facial_frames(frame[None, :], self.py_face, frame_numbers=[frame_number])[0]
+        try:
+            socket_connection.sendall(packet)
+        except Exception as e:
+            print(f"Error in animation compositor sending: {e}")
+
+    def _release_clips(self) -> None:
+        with self._lock:
+            if self._speech is not None:
+                self._speech.done.set()
+                self._speech = None
+            while self._pending:
+                self._pending.popleft().done.set()
+
+    def run(self, stop_event, socket_connection=None) -> None:
+        """
+        Emits one packet per tick on absolute deadlines until stop_event is set.
+        Late ticks are skipped rather than bunched up, so speech stays on the audio timeline.
+        The compositor opens (and closes) its own socket unless one is given.
+        """
+        own_socket = socket_connection is None
+        if own_socket:
+            socket_connection = create_socket_connection()
+        self._running.set()
+        try:
+            clock = get_frame_clock(self.fps)
+            base_frame = clock.current_frame()
+            origin_ns = self._origin_ns = time.perf_counter_ns()
+            tick = 0
+            while not stop_event.is_set():
+                deadline = origin_ns + tick * NANOSECONDS // self.fps
+                lateness = time.perf_counter_ns() - deadline
+                if lateness > NANOSECONDS // self.fps:
+                    skipped = lateness * self.fps // NANOSECONDS
+                    self.ticks_dropped += skipped
+                    tick += skipped
+                    deadline = origin_ns + tick * NANOSECONDS // self.fps
+                # Only spin for sub-millisecond precision when speech needs it; idle ticks just sleep.
+                speaking = self._speech is not None or bool(self._pending)
+                sleep_until_ns(deadline, SPIN_THRESHOLD_NS if speaking else 0)
+                self._emit(socket_connection, tick, base_frame + tick)
+                tick += 1
+        finally:
+            self._running.clear()
+            self._release_clips()
+            if own_socket:
+                socket_connection.close()
+
+
+_compositor = None
+_compositor_lock = Lock()
+
+
+def get_compositor(py_face=None, fps: int = 60) -> AnimationCompositor:
+    """
+    Returns the process-wide compositor, creating it for py_face on first use.
+    """
+    global _compositor
+    with _compositor_lock:
+        if _compositor is None:
+            if py_face is None:
+                py_face = initialize_py_face()
+            _compositor = AnimationCompositor(py_face, fps)
+        return _compositor
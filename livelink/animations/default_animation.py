@@ -2,13 +2,11 @@
 # For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
 # Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
 
-import time
-import socket
 import numpy as np
-import pandas as pd
 from threading import Event
 
-from livelink.connect.livelink_init import FaceBlendShape, UDP_IP, UDP_PORT
+from livelink.animations.animation_cache import load_clip_library
+from utils.resources import register_resource, get_resource
 
 ground_truth_path = r"livelink/animations/default_anim/default.csv"
 columns_to_drop = [
@@ -18,12 +16,11 @@ columns_to_drop = [
 ]
 
 def load_default_animation(csv_path):
+    import pandas as pd
     data = pd.read_csv(csv_path)
     data = data.drop(columns=['Timecode', 'BlendshapeCount'] + columns_to_drop)
     return data.values
 
-default_animation_data = load_default_animation(ground_truth_path)
-
 def blend_animation(data, blend_frames=30):
 
     last_frames = data[-blend_frames:]
@@ -37,32 +34,49 @@ def blend_animation(data, blend_frames=30):
     blended_data = np.vstack([data[:-blend_frames], blended_frames])
     return blended_data
 
-blended_animation_data = blend_animation(default_animation_data, blend_frames=30)
+# Loaded on first use from the compiled animation cache; the CSV is only parsed when it has changed.
+register_resource("default_animation", lambda: load_clip_library("default", [ground_truth_path], load_default_animation)[0])
+register_resource("blended_default_animation", lambda: blend_animation(get_resource("default_animation"), blend_frames=30))
+
+def get_default_animation_data():
+    return get_resource("default_animation")
+
+def __getattr__(name):
+    # Keeps `from default_animation import default_animation_data` working without loading at import.
+    if name == "default_animation_data":
+        return get_resource("default_animation")
+    if name == "blended_animation_data":
+        return get_resource("blended_default_animation")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Idle loops registered in addition to "default", which the compositor plays unless another one is selected.
+idle_clips = {}
+
+def get_idle_clip(name):
+    if name in idle_clips:
+        return idle_clips[name]
+    if name == "default":
+        return get_resource("blended_default_animation")
+    raise KeyError(name)
+
+def register_idle_clip(name, frames, blend_frames=30):
+    """
+    Registers an idle loop under name. Its end is blended into its start so it loops
+    seamlessly; pass blend_frames=0 if the clip already loops.
+    """
+    frames = np.asarray(frames)
+    idle_clips[name] = blend_animation(frames, blend_frames) if blend_frames else frames
+
+def register_idle_clip_from_csv(name, csv_path, blend_frames=30):
+    register_idle_clip(name, load_default_animation(csv_path), blend_frames)
 
 stop_default_animation = Event()
 
 def default_animation_loop(py_face):
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-        s.connect((UDP_IP, UDP_PORT))
-        while not stop_default_animation.is_set():
-            for frame in blended_animation_data:
-                # Check before processing each frame
-                if stop_default_animation.is_set():
-                    break
-
-                # Apply the frame blendshapes
-                for i, value in enumerate(frame):
-                    py_face.set_blendshape(FaceBlendShape(i), float(value))
-                
-                # Send the frame
-                try:
-                    s.sendall(py_face.encode())
-                except Exception as e:
-                    print(f"Error in default animation sending: {e}")
-                
-                # Instead of one long sleep, break it into short chunks
-                total_sleep = 1 / 60
-                sleep_interval = 0.005  # check every 5ms
-                while total_sleep > 0 and not stop_default_animation.is_set():
-                    time.sleep(min(sleep_interval, total_sleep))
-                    total_sleep -= sleep_interval
+    """
+    Runs the shared animation compositor on this thread until stop_default_animation is set.
+    The compositor owns the socket and plays the idle loop; speech clips are mixed in with
+    get_compositor().play_clip() instead of stopping and restarting this thread.
+    """
+    from livelink.animations.compositor import get_compositor
+    get_compositor(py_face).run(stop_default_animation)
@@ -0,0 +1,79 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# frame_clock.py
+# Arithmetic LiveLink timecodes: anchored to the time of day once, then advanced from
+# a monotonic clock (live packets) or from the frame index (pre-encoded clips).
+
+import datetime
+import struct
+import time
+from threading import Lock
+
+import numpy as np
+
+NANOSECONDS = 1_000_000_000
+
+
+def sub_frame_bits(fraction: float) -> int:
+    """
+    LiveLink carries the sub-frame as a float32; returns its bit pattern for '!I' packing.
+    """
+    return struct.unpack('!I', struct.pack('!f', fraction))[0]
+
+
+class FrameClock:
+    def __init__(self, fps: int = 60) -> None:
+        self.fps = fps
+        self.anchor()
+
+    def anchor(self) -> None:
+        """
+        Pins frame numbers to the current time of day. Everything after this is arithmetic.
+        """
+        now = datetime.datetime.now()
+        self._anchor_ns = time.perf_counter_ns()
+        seconds_of_day = now.hour * 3600 + now.minute * 60 + now.second
+        self._anchor_frame_ns = seconds_of_day * NANOSECONDS * self.fps + now.microsecond * 1000 * self.fps
+
+    def now(self):
+        """
+        Returns (frame, sub_frame_bits) for this instant. Frames never go backwards or skip
+        while the process runs, including across midnight.
+        """
+        elapsed_ns = time.perf_counter_ns() - self._anchor_ns
+        frame, remainder = divmod(self._anchor_frame_ns + elapsed_ns * self.fps, NANOSECONDS)
+        return frame, sub_frame_bits(remainder / NANOSECONDS)
+
+    def current_frame(self) -> int:
+        return self.now()[0]
+
+    def clip_frames(self, frame_count: int, start_frame: int = None) -> np.ndarray:
+        """
+        Consecutive frame numbers for a pre-encoded clip that starts at start_frame
+        (or at the current frame).
+        """
+        if start_frame is None:
+            start_frame = self.current_frame()
+        return start_frame + np.arange(frame_count, dtype=np.int64)
+
+    def stamp(self, encoded_frames, start_frame: int = None) -> None:
+        """
+        Patches gap-free timecodes into an EncodedFrames clip, in place.
+        """
+        encoded_frames.set_frame_numbers(self.clip_frames(len(encoded_frames), start_frame), 0)
+
+
+_clocks = {}
+_clocks_lock = Lock()
+
+
+def get_frame_clock(fps: int = 60) -> FrameClock:
+    """
+    Returns the process-wide clock for fps, so idle and speech packets share one timeline.
+    """
+    with _clocks_lock:
+        if fps not in _clocks:
+            _clocks[fps] = FrameClock(fps)
+        return _clocks[fps]
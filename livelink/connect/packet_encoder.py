@@ -0,0 +1,130 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# packet_encoder.py
+# Whole-clip LiveLink packet encoding: builds the same bytes as PyLiveLinkFace.encode()
+# for every frame of an (N, 61) array in a handful of array operations.
+
+import struct
+import numpy as np
+
+from livelink.connect.faceblendshapes import FaceBlendShape
+from livelink.connect.pylivelinkface import MOUTH_BLENDSHAPES, EYE_BLENDSHAPES, EYEBROW_BLENDSHAPES
+
+BLENDSHAPE_COUNT = 61
+HEAD_BLENDSHAPES = [FaceBlendShape.HeadYaw, FaceBlendShape.HeadPitch, FaceBlendShape.HeadRoll]
+
+
+class EncodedFrames:
+    """
+    A clip of LiveLink packets stored back to back in one contiguous buffer.
+
+    Indexing returns a zero-copy memoryview of a single packet, so it can be handed
+    straight to socket.sendall() and used anywhere a list of encoded frames was used.
+    """
+
+    def __init__(self, frame_count: int, packet_size: int, frames_offset: int) -> None:
+        self.packet_size = packet_size
+        self.frames_offset = frames_offset
+        self.buffer = bytearray(frame_count * packet_size)
+        self.packets = np.frombuffer(self.buffer, dtype=np.uint8).reshape(frame_count, packet_size)
+        self._view = memoryview(self.buffer)
+
+    def __len__(self) -> int:
+        return self.packets.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("packet index out of range")
+        start = index * self.packet_size
+        return self._view[start:start + self.packet_size]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def set_frame_numbers(self, frame_numbers, sub_frames) -> None:
+        """
+        Writes the big-endian (frame, sub_frame) pair of every packet in one array op.
+        """
+        timecodes = np.empty((len(self), 2), dtype='>u4')
+        timecodes[:, 0] = frame_numbers
+        timecodes[:, 1] = sub_frames
+        self.packets[:, self.frames_offset:self.frames_offset + 8] = timecodes.view(np.uint8).reshape(len(self), 8)
+
+    def set_frame_number(self, index: int, frame_number: int, sub_frame: int) -> None:
+        """
+        Patches the timecode of a single packet in place, just before it is sent.
+        """
+        struct.pack_into("!II", self.buffer, index * self.packet_size + self.frames_offset, frame_number, sub_frame)
+
+
+def section_scale_vector(py_face) -> np.ndarray:
+    """
+    Per-blendshape multipliers matching scale_blendshapes_by_section for the face's current scaling factors.
+    """
+    scale = np.ones(BLENDSHAPE_COUNT, dtype=np.float64)
+    scale[[bs.value for bs in MOUTH_BLENDSHAPES]] = py_face._scaling_factor_mouth
+    scale[[bs.value for bs in EYE_BLENDSHAPES]] = py_face._scaling_factor_eyes
+    scale[[bs.value for bs in EYEBROW_BLENDSHAPES]] = py_face._scaling_factor_eyebrows
+    return scale
+
+
+def scale_blendshapes_array(blendshapes: np.ndarray, py_face) -> np.ndarray:
+    """
+    Vectorised scale_blendshapes_by_section: scales each section and clamps to [0.0, 1.0].
+    Head rotation is zeroed the same way PyLiveLinkFace.set_blendshape does.
+    """
+    scaled = np.clip(blendshapes * section_scale_vector(py_face), 0.0, 1.0)
+    scaled[:, [bs.value for bs in HEAD_BLENDSHAPES]] = 0.0
+    return scaled
+
+
+def packet_header(py_face):
+    """
+    Returns the static parts of a packet: everything before the timecode and
+    the frame rate block that follows it.
+    """
+    prefix = (struct.pack('<I', py_face._version) + py_face.uuid.encode('utf-8') +
+              struct.pack('!i', len(py_face.name)) + py_face.name.encode('utf-8'))
+    frame_rate = struct.pack("!II", py_face.fps, py_face._denominator) + struct.pack('!B', BLENDSHAPE_COUNT)
+    return prefix, frame_rate
+
+
+def encode_facial_frames(blendshapes: np.ndarray, py_face, frame_numbers=None) -> EncodedFrames:
+    """
+    Encodes an (N, 61) array of blendshape values into N LiveLink packets.
+
+    The header is packed once, the float payload is scaled and byte-swapped to big-endian
+    float32 in one array op, and all packets are written into a single buffer.
+    If frame_numbers is None the packets get consecutive frame numbers starting now; the
+    sender re-stamps them from the frame clock when playback actually starts.
+    """
+    blendshapes = np.asarray(blendshapes, dtype=np.float64).reshape(-1, BLENDSHAPE_COUNT)
+    frame_count = blendshapes.shape[0]
+
+    prefix, frame_rate = packet_header(py_face)
+    frames_offset = len(prefix)
+    payload_offset = frames_offset + 8 + len(frame_rate)
+    packet_size = payload_offset + BLENDSHAPE_COUNT * 4
+
+    encoded = EncodedFrames(frame_count, packet_size, frames_offset)
+    if frame_count == 0:
+        return encoded
+
+    packets = encoded.packets
+    packets[:, :frames_offset] = np.frombuffer(prefix, dtype=np.uint8)
+    packets[:, frames_offset + 8:payload_offset] = np.frombuffer(frame_rate, dtype=np.uint8)
+
+    if frame_numbers is None:
+        frame_numbers = py_face._frame_clock.clip_frames(frame_count)
+    encoded.set_frame_numbers(frame_numbers, 0)
+
+    payload = scale_blendshapes_array(blendshapes, py_face).astype('>f4')
+    packets[:, payload_offset:] = payload.view(np.uint8).reshape(frame_count, BLENDSHAPE_COUNT * 4)
+    return encoded
@@ -7,16 +7,15 @@
 from __future__ import annotations
 
 from collections import deque
-from timecode import Timecode
 from statistics import mean
 from typing import List
 
-import datetime
 import struct
 import random
 import uuid
 
 from livelink.connect.faceblendshapes import FaceBlendShape
+from livelink.connect.frame_clock import get_frame_clock
 
 # Grouping the FaceBlendShape indices into sections
 MOUTH_BLENDSHAPES = [
@@ -80,10 +79,8 @@ class PyLiveLinkFace:
         self._scaling_factor_eyes = 1.0
         self._scaling_factor_eyebrows = 0.4
 
-        now = datetime.datetime.now()
-        timcode = Timecode(self.fps, f'{now.hour}:{now.minute}:{now.second}:{now.microsecond * 0.001}')
-        self._frames = timcode.frames
-        self._sub_frame = 1056060032
+        self._frame_clock = get_frame_clock(self.fps)
+        self._frames, self._sub_frame = self._frame_clock.now()
         self._denominator = int(self.fps / 60)
         self._blend_shapes = [0.0] * 61
         self._old_blend_shapes = [deque([0.0], maxlen=filter_size) for _ in range(61)]
@@ -93,9 +90,8 @@ class PyLiveLinkFace:
         uuid_packed = self.uuid.encode('utf-8')
         name_packed = self.name.encode('utf-8')
         name_length_packed = struct.pack('!i', len(self.name))
-        now = datetime.datetime.now()
-        timcode = Timecode(self.fps, f'{now.hour}:{now.minute}:{now.second}:{now.microsecond * 0.001}')
-        frames_packed = struct.pack("!II", timcode.frames, self._sub_frame)
+        self._frames, self._sub_frame = self._frame_clock.now()
+        frames_packed = struct.pack("!II", self._frames, self._sub_frame)
         frame_rate_packed = struct.pack("!II", self.fps, self._denominator)
     
         # Apply different scaling factors for sections
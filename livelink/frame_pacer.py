@@ -0,0 +1,245 @@
+# frame_pacer.py
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+import time
+import numpy as np
+
+NANOSECONDS = 1_000_000_000
+SPIN_THRESHOLD_NS = 1_000_000  # Busy-wait only for the final millisecond before a deadline.
+LATE_FRAME_POLICIES = ("drop", "catch_up", "stretch")
+SYNC_MODES = ("clock", "audio")
+# Extra time between the audio clock reporting a sample and it being heard, on top of what the
+# device reports (Bluetooth, external DACs). Negative values send frames later instead, e.g. to
+# cover Unreal's render latency.
+OUTPUT_LATENCY_MS = 0.0
+AUDIO_START_TIMEOUT = 1.0  # Seconds to wait for the audio clock before falling back to the wall clock.
+CLOCK_STALL_SECONDS = 0.25  # An audio clock that stops this long is treated as finished.
+MAX_EXTRAPOLATION_SECONDS = 0.05  # Longest gap between updates of a clock that may pause.
+
+
+def sleep_until_ns(deadline_ns: int, spin_threshold_ns: int = SPIN_THRESHOLD_NS) -> None:
+    """
+    Hybrid wait on perf_counter_ns: sleep while the deadline is far away, then spin
+    (yielding the GIL) through the last sub-millisecond where time.sleep overshoots.
+    """
+    while True:
+        remaining = deadline_ns - time.perf_counter_ns()
+        if remaining <= 0:
+            return
+        if remaining > spin_threshold_ns:
+            time.sleep((remaining - spin_threshold_ns) / NANOSECONDS)
+        else:
+            time.sleep(0)
+
+
+class PacerStats:
+    """
+    Per-clip pacing statistics. Jitter is how late each packet left relative to its deadline;
+    drift is frame media time minus the audio clock (positive means frames are ahead).
+    """
+
+    def __init__(self, fps: int) -> None:
+        self.fps = fps
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.jitter_ns = []
+        self.drift_seconds = []
+        self.schedule_shift_ns = 0
+
+    def record_send(self, jitter_ns: int, drift_seconds=None) -> None:
+        self.frames_sent += 1
+        self.jitter_ns.append(jitter_ns)
+        if drift_seconds is not None:
+            self.drift_seconds.append(drift_seconds)
+
+    def jitter_percentile_ms(self, percentile: float) -> float:
+        if not self.jitter_ns:
+            return 0.0
+        return float(np.percentile(self.jitter_ns, percentile)) / 1e6
+
+    @property
+    def cumulative_drift_ms(self) -> float:
+        """
+        Drift against the audio clock at the last frame, or the total schedule stretch when
+        no audio clock was available.
+        """
+        if self.drift_seconds:
+            return self.drift_seconds[-1] * 1000.0
+        return self.schedule_shift_ns / 1e6
+
+    def as_dict(self) -> dict:
+        return {
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "jitter_p50_ms": self.jitter_percentile_ms(50),
+            "jitter_p99_ms": self.jitter_percentile_ms(99),
+            "cumulative_drift_ms": self.cumulative_drift_ms,
+        }
+
+    def summary(self) -> str:
+        return (f"Frames sent: {self.frames_sent}, dropped: {self.frames_dropped}, "
+                f"jitter p50: {self.jitter_percentile_ms(50):.3f} ms, p99: {self.jitter_percentile_ms(99):.3f} ms, "
+                f"drift: {self.cumulative_drift_ms:.1f} ms")
+
+
+class AudioClockFollower:
+    """
+    Follows an audio clock (a callable returning seconds of audio heard, or None) for choosing
+    frames. Between clock updates (pygame reports in whole milliseconds, sound cards per buffer)
+    the position is extrapolated from when the last update was seen. The clock counts as lost if
+    it has not started AUDIO_START_TIMEOUT after the first poll, returns None after starting, or
+    stops for stall_seconds (the audio ended, or was stopped); whatever follows it then falls back
+    to the wall clock. Pass stall_seconds=None for a clock that legitimately pauses (audio that
+    is still arriving) and returns None when it ends.
+    """
+
+    def __init__(self, audio_clock, output_latency_ms: float = OUTPUT_LATENCY_MS, stall_seconds=CLOCK_STALL_SECONDS) -> None:
+        self.audio_clock = audio_clock
+        self.output_latency = output_latency_ms / 1000.0
+        self.stall_seconds = stall_seconds
+        self.lost = False
+        self._first_poll_ns = None
+        self._reported = None  # Last clock reading and when it was first seen.
+        self._reported_ns = None
+
+    def media_seconds(self, now_ns: int = None):
+        """
+        Seconds of media being heard at now_ns (less the output latency), or None before the
+        clock starts and once it is lost.
+        """
+        if self.lost:
+            return None
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        if self._first_poll_ns is None:
+            self._first_poll_ns = now_ns
+        audio_seconds = self.audio_clock()
+        if audio_seconds is not None and audio_seconds != self._reported:
+            self._reported, self._reported_ns = audio_seconds, now_ns
+        if self._reported is None:
+            self.lost = now_ns - self._first_poll_ns > AUDIO_START_TIMEOUT * NANOSECONDS
+            return None
+        stalled_ns = now_ns - self._reported_ns
+        if audio_seconds is None or self.stall_seconds is not None and stalled_ns > self.stall_seconds * NANOSECONDS:
+            self.lost = True
+            return None
+        if self.stall_seconds is None:
+            # A clock that may pause is extrapolated no further than its update interval, so a
+            # pause holds the frame instead of running ahead of the audio.
+            stalled_ns = min(stalled_ns, int(MAX_EXTRAPOLATION_SECONDS * NANOSECONDS))
+        return self._reported + stalled_ns / NANOSECONDS - self.output_latency
+
+
+class FramePacer:
+    """
+    Sends frames against absolute deadlines (start + index / fps) so sleep error never accumulates.
+
+    late_policy decides what happens to a frame that is more than one frame period late:
+      - "drop":     skip it and stay on the original schedule.
+      - "catch_up": send it immediately; following frames go out back to back until on time.
+      - "stretch":  send it now and push the whole remaining schedule back by the lateness.
+
+    With sync="audio" and an audio_clock, frames are instead selected by the audio playback
+    position (less output_latency_ms): the frame for the audio being heard is sent, frames
+    the audio has already passed are dropped, and nothing is sent ahead of it.
+    """
+
+    def __init__(self, fps: int = 60, late_policy: str = "drop", spin_threshold_ns: int = SPIN_THRESHOLD_NS, audio_clock=None,
+                 sync: str = "clock", output_latency_ms: float = OUTPUT_LATENCY_MS) -> None:
+        if late_policy not in LATE_FRAME_POLICIES:
+            raise ValueError(f"Unknown late frame policy '{late_policy}'. Expected one of {LATE_FRAME_POLICIES}.")
+        if sync not in SYNC_MODES:
+            raise ValueError(f"Unknown sync mode '{sync}'. Expected one of {SYNC_MODES}.")
+        self.fps = fps
+        self.late_policy = late_policy
+        self.spin_threshold_ns = spin_threshold_ns
+        self.audio_clock = audio_clock
+        self.sync = sync if audio_clock is not None else "clock"
+        self.output_latency = output_latency_ms / 1000.0
+        self.frame_ns = NANOSECONDS // fps
+
+    def deadline_ns(self, origin_ns: int, frame_index: int) -> int:
+        return origin_ns + frame_index * NANOSECONDS // self.fps
+
+    def run(self, frames, send, origin_ns: int = None, stop_event=None) -> PacerStats:
+        """
+        Paces every item of frames through send(). origin_ns defaults to now.
+        """
+        if self.sync == "audio":
+            return self._run_audio_synced(frames, send, stop_event)
+        stats = PacerStats(self.fps)
+        if origin_ns is None:
+            origin_ns = time.perf_counter_ns()
+
+        for frame_index, frame in enumerate(frames):
+            if stop_event is not None and stop_event.is_set():
+                break
+
+            deadline = self.deadline_ns(origin_ns, frame_index) + stats.schedule_shift_ns
+            lateness = time.perf_counter_ns() - deadline
+
+            if lateness > self.frame_ns:
+                if self.late_policy == "drop":
+                    stats.frames_dropped += 1
+                    continue
+                if self.late_policy == "stretch":
+                    stats.schedule_shift_ns += lateness
+                    deadline += lateness
+            else:
+                sleep_until_ns(deadline, self.spin_threshold_ns)
+
+            send(frame)
+            stats.record_send(time.perf_counter_ns() - deadline, self._drift_seconds(frame_index))
+
+        return stats
+
+    def _drift_seconds(self, frame_index: int):
+        if self.audio_clock is None:
+            return None
+        audio_seconds = self.audio_clock()
+        if audio_seconds is None:
+            return None
+        return frame_index / self.fps - (audio_seconds - self.output_latency)
+
+    def _run_audio_synced(self, frames, send, stop_event=None) -> PacerStats:
+        """
+        Sends frames[i] when the audio clock (followed by an AudioClockFollower) reaches i / fps.
+        If the clock never starts, or stops before the last frame (the audio ended, or was
+        stopped), the rest is paced on the wall clock from there.
+        """
+        stats = PacerStats(self.fps)
+        frames = frames if hasattr(frames, "__getitem__") else list(frames)
+        clock = AudioClockFollower(self.audio_clock, self.output_latency * 1000.0)
+        last_index = -1
+
+        while last_index < len(frames) - 1:
+            if stop_event is not None and stop_event.is_set():
+                break
+            now_ns = time.perf_counter_ns()
+            media_seconds = clock.media_seconds(now_ns)
+            if media_seconds is None:
+                if clock.lost:
+                    break
+                time.sleep(0.001)
+                continue
+
+            index = min(int(media_seconds * self.fps), len(frames) - 1)
+            if index > last_index:
+                stats.frames_dropped += index - last_index - 1
+                send(frames[index])
+                lateness = media_seconds - index / self.fps
+                stats.record_send(int(lateness * NANOSECONDS), index / self.fps - media_seconds)
+                last_index = index
+            next_due_ns = now_ns + int(((last_index + 1) / self.fps - media_seconds) * NANOSECONDS)
+            sleep_until_ns(min(next_due_ns, now_ns + self.frame_ns), self.spin_threshold_ns)
+
+        remaining = frames[last_index + 1:]
+        if len(remaining) and not (stop_event is not None and stop_event.is_set()):
+            # Wall-clock pacing for whatever the audio clock did not cover.
+            rest = FramePacer(self.fps, self.late_policy, self.spin_threshold_ns).run(remaining, send, stop_event=stop_event)
+            stats.frames_sent += rest.frames_sent
+            stats.frames_dropped += rest.frames_dropped
+            stats.jitter_ns.extend(rest.jitter_ns)
+        return stats
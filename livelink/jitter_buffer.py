@@ -0,0 +1,125 @@
+# jitter_buffer.py
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+import time
+from collections import deque
+from threading import Condition
+
+
+class FrameJitterBuffer:
+    """
+    Thread-safe FIFO between a producer that receives frames in bursts (a window at a time from
+    streaming inference) and the frame sender, which drains it at a steady rate.
+
+    Playback should start once ready(): prefill_frames are buffered or the stream has ended.
+    A larger prefill absorbs more network jitter at the cost of first-frame latency. When the
+    sender finds the buffer empty before the stream has ended it is counted as an underrun.
+    """
+
+    def __init__(self, prefill_frames: int = 0) -> None:
+        self.prefill_frames = prefill_frames
+        self._windows = deque()
+        self._condition = Condition()
+        self._closed = False
+        self._starved = False
+
+        self.error = None
+        self.depth_frames = 0
+        self.max_depth_frames = 0
+        self.frames_in = 0
+        self.frames_out = 0
+        self.underruns = 0
+        self.first_put_time = None
+
+    def put(self, frames) -> None:
+        """
+        Appends a window of frames (anything with a length, normally an (n, d) array).
+        """
+        if frames is None or len(frames) == 0:
+            return
+        with self._condition:
+            if self._closed:
+                return
+            if self.first_put_time is None:
+                self.first_put_time = time.perf_counter()
+            self._windows.append(frames)
+            self.depth_frames += len(frames)
+            self.frames_in += len(frames)
+            self.max_depth_frames = max(self.max_depth_frames, self.depth_frames)
+            self._condition.notify_all()
+
+    def close(self, error=None) -> None:
+        """
+        Marks the end of the stream. Frames already buffered are still delivered.
+        """
+        with self._condition:
+            self._closed = True
+            self.error = self.error or error
+            self._condition.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def finished(self) -> bool:
+        """
+        True once the stream has ended and every frame has been taken.
+        """
+        with self._condition:
+            return self._closed and not self._windows
+
+    def ready(self) -> bool:
+        with self._condition:
+            return self._ready()
+
+    def _ready(self) -> bool:
+        return self._closed or (self.depth_frames > 0 and self.depth_frames >= self.prefill_frames)
+
+    def wait_ready(self, timeout=None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(self._ready, timeout)
+
+    def get_window(self, block: bool = True, timeout=None):
+        """
+        Takes the oldest window. Returns None when nothing is buffered: at the end of the
+        stream, or when block is False (or timeout expires) and the next window is late.
+        """
+        with self._condition:
+            if not self._windows and not self._closed:
+                if not self._starved:
+                    self.underruns += 1
+                    self._starved = True
+                if block:
+                    self._condition.wait_for(lambda: self._windows or self._closed, timeout)
+            if not self._windows:
+                return None
+            self._starved = False
+            window = self._windows.popleft()
+            self.depth_frames -= len(window)
+            self.frames_out += len(window)
+            return window
+
+    def windows(self):
+        """
+        Yields windows until the stream has ended, blocking while the next one is late.
+        """
+        while True:
+            window = self.get_window()
+            if window is None:
+                return
+            yield window
+
+    def as_dict(self) -> dict:
+        return {
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "underruns": self.underruns,
+            "max_depth_frames": self.max_depth_frames,
+        }
+
+    def summary(self) -> str:
+        return (f"Jitter buffer: {self.frames_out}/{self.frames_in} frames played, "
+                f"underruns: {self.underruns}, max depth: {self.max_depth_frames} frames")
@@ -3,189 +3,181 @@
 # For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
 # Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
 
-import time
 import numpy as np
 from typing import List
 
-from livelink.connect.livelink_init import create_socket_connection, FaceBlendShape
-from livelink.animations.default_animation import default_animation_data
-from livelink.animations.blending_anims import blend_in, blend_out  
+from livelink.connect.livelink_init import create_socket_connection, initialize_py_face, FaceBlendShape
+from livelink.connect.packet_encoder import encode_facial_frames, EncodedFrames
+from livelink.connect.frame_clock import get_frame_clock
+from livelink.frame_pacer import FramePacer, OUTPUT_LATENCY_MS
+from livelink.animations.default_animation import get_default_animation_data
+from livelink.animations.blending_anims import offline_blend_in, offline_blend_out
 
 
-def pre_encode_facial_data_without_blend(facial_data: List[np.ndarray], py_face, fps: int = 60) -> List[bytes]:
+# Print each clip's PacerStats as it finishes. The senders return them either way.
+LOG_PLAYBACK_STATS = False
+
+EYE_REPLACEMENT_INDICES = [
+    FaceBlendShape.EyeBlinkLeft.value, FaceBlendShape.EyeBlinkRight.value, 
+    FaceBlendShape.EyeWideLeft.value, FaceBlendShape.EyeWideRight.value, 
+    FaceBlendShape.EyeSquintLeft.value, FaceBlendShape.EyeSquintRight.value
+]
+
+
+def compose_speech_frames(facial_data, py_face, blend_in_frames: int, blend_out_frames: int) -> np.ndarray:
     """
-    Pre-encodes facial animation data while ensuring blinks, squints, and eye-wide blendshapes
-    use the default animation data - without blend in or out
+    Builds the (N, 61) frame array for the main part of a clip in one pass: the first 51
+    blendshapes come from facial_data, blinks, squints and eye-wide come from the looping
+    default animation, and the remaining columns keep py_face's current values.
+    """
+    section = np.asarray(facial_data, dtype=np.float64)[blend_in_frames:-blend_out_frames]
+    return compose_main_frames(section, py_face)
+
+
+def compose_main_frames(section, py_face, loop_start: int = 0) -> np.ndarray:
+    """
+    compose_speech_frames for an already trimmed section. loop_start is the section's offset
+    into the main part, so sections composed one after another keep the default eye loop going.
     """
-    encoded_data = []
+    section = np.asarray(section, dtype=np.float64)
+    frames = np.tile(np.asarray(py_face._blend_shapes, dtype=np.float64), (len(section), 1))
+    if len(section) == 0:
+        return frames
+
+    columns = min(section.shape[1], 51)
+    frames[:, :columns] = section[:, :columns]
+
+    # Ensure looping default animation data
+    default_animation_data = get_default_animation_data()
+    default_loop_index = np.arange(loop_start, loop_start + len(section)) % len(default_animation_data)
+    frames[:, EYE_REPLACEMENT_INDICES] = default_animation_data[default_loop_index][:, EYE_REPLACEMENT_INDICES]
+    return frames
+
 
+def compose_clip(facial_data, py_face, fps: int = 60, blend_in: bool = True, blend_out: bool = True, blend_curve: str = "linear") -> np.ndarray:
+    """
+    Composes the whole clip (optional blend in, main section, optional blend out) as one
+    (N, 61) frame array. No wall-clock time is spent on blending.
+    """
     blend_in_frames = int(0.05 * fps)
     blend_out_frames = int(0.3 * fps)
 
-    # Indices of blendshapes to replace with default animation values
-    eye_replacement_indices = [
-        FaceBlendShape.EyeBlinkLeft.value, FaceBlendShape.EyeBlinkRight.value, 
-        FaceBlendShape.EyeWideLeft.value, FaceBlendShape.EyeWideRight.value, 
-        FaceBlendShape.EyeSquintLeft.value, FaceBlendShape.EyeSquintRight.value
-    ]
-    # Main animation loop: Replace blink with default animation
-    for frame_index, frame_data in enumerate(facial_data[blend_in_frames:-blend_out_frames]):
-        # Ensure looping default animation data
-        default_loop_index = frame_index % len(default_animation_data)
+    sections = []
+    if blend_in:
+        sections.append(offline_blend_in(facial_data, blend_in_frames, py_face, blend_curve))
+    sections.append(compose_speech_frames(facial_data, py_face, blend_in_frames, blend_out_frames))
+    if blend_out:
+        sections.append(offline_blend_out(facial_data, blend_out_frames, py_face, blend_curve))
+
+    return np.vstack(sections)
 
-        for i in range(min(len(frame_data), 51)):  
-            # Override blink, squint, and eye-wide with default animation
-            if i in eye_replacement_indices:
-                py_face.set_blendshape(FaceBlendShape(i), default_animation_data[default_loop_index][i])
-            else:
-                py_face.set_blendshape(FaceBlendShape(i), frame_data[i])
-        
-        encoded_data.append(py_face.encode())
 
-    return encoded_data
+def pre_encode_clip(facial_data, py_face, fps: int = 60, blend_in: bool = True, blend_out: bool = True, blend_curve: str = "linear") -> EncodedFrames:
+    """
+    Composes the clip with compose_clip and encodes it in a single call.
+    """
+    return encode_facial_frames(compose_clip(facial_data, py_face, fps, blend_in, blend_out, blend_curve), py_face)
+
+
+class StreamingClipComposer:
+    """
+    Composes a clip that arrives in windows (streaming inference). The concatenated output of
+    push() and finish() equals compose_clip() of the whole clip; the last blend-out's worth of
+    frames is held back until finish(), since only then is it known that they end the clip.
+    """
+
+    def __init__(self, py_face, fps: int = 60, blend_curve: str = "linear") -> None:
+        self.py_face = py_face
+        self.fps = fps
+        self.blend_curve = blend_curve
+        self.blend_in_frames = int(0.05 * fps)
+        self.blend_out_frames = int(0.3 * fps)
+        self._held = None
+        self._main_frames = 0
+        self._started = False
+
+    def push(self, window) -> np.ndarray:
+        """
+        Adds a window of facial data and returns the (n, 61) frames that are now final.
+        """
+        window = np.asarray(window, dtype=np.float64)
+        data = window if self._held is None else np.vstack([self._held, window])
+        sections = []
+        if not self._started:
+            if len(data) < self.blend_in_frames + self.blend_out_frames:
+                self._held = data
+                return np.empty((0, len(self.py_face._blend_shapes)), dtype=np.float64)
+            sections.append(offline_blend_in(data, self.blend_in_frames, self.py_face, self.blend_curve))
+            data = data[self.blend_in_frames:]
+            self._started = True
+
+        ready = len(data) - self.blend_out_frames
+        if ready > 0:
+            sections.append(compose_main_frames(data[:ready], self.py_face, self._main_frames))
+            self._main_frames += ready
+            data = data[ready:]
+        self._held = data
+        if not sections:
+            return np.empty((0, len(self.py_face._blend_shapes)), dtype=np.float64)
+        return np.vstack(sections)
+
+    def finish(self) -> np.ndarray:
+        """
+        Returns the remaining frames, ending with the blend out.
+        """
+        held = self._held if self._held is not None else np.empty((0, 0), dtype=np.float64)
+        self._held = None
+        if not self._started:
+            if len(held) < self.blend_out_frames:
+                # Too short to blend; compose_clip cannot handle these either.
+                return compose_main_frames(held, self.py_face)
+            return compose_clip(held, self.py_face, self.fps, blend_curve=self.blend_curve)
+        return offline_blend_out(held, self.blend_out_frames, self.py_face, self.blend_curve)
+
+
+def pre_encode_facial_data_without_blend(facial_data: List[np.ndarray], py_face, fps: int = 60) -> EncodedFrames:
+    """
+    Pre-encodes facial animation data while ensuring blinks, squints, and eye-wide blendshapes
+    use the default animation data - without blend in or out
+    """
+    return pre_encode_clip(facial_data, py_face, fps, blend_in=False, blend_out=False)
 
 
-def pre_encode_facial_data_blend_in(facial_data: List[np.ndarray], py_face, fps: int = 60) -> List[bytes]:
+def pre_encode_facial_data_blend_in(facial_data: List[np.ndarray], py_face, fps: int = 60, blend_curve: str = "linear") -> EncodedFrames:
     """
     Pre-encodes facial animation data while ensuring blinks, squints, and eye-wide blendshapes
     use the default animation data.
     """
-    encoded_data = []
+    return pre_encode_clip(facial_data, py_face, fps, blend_in=True, blend_out=False, blend_curve=blend_curve)
 
-    blend_in_frames = int(0.05 * fps)
-    blend_out_frames = int(0.3 * fps)
 
-    # Indices of blendshapes to replace with default animation values
-    eye_replacement_indices = [
-        FaceBlendShape.EyeBlinkLeft.value, FaceBlendShape.EyeBlinkRight.value, 
-        FaceBlendShape.EyeWideLeft.value, FaceBlendShape.EyeWideRight.value, 
-        FaceBlendShape.EyeSquintLeft.value, FaceBlendShape.EyeSquintRight.value
-    ]
-
-    # --- Added: Capture start time for blend in ---
-    #blend_in_start = time.time()
-    
-    blend_in(facial_data, fps, py_face, encoded_data, blend_in_frames)
-    
-    # --- Added: Calculate and print total blend in duration ---
- #   blend_in_duration = time.time() - blend_in_start
-  #  print(f"Blend in completed in {blend_in_duration:.3f} seconds.")
-
-    # Main animation loop: Replace blink with default animation
-    for frame_index, frame_data in enumerate(facial_data[blend_in_frames:-blend_out_frames]):
-        # Ensure looping default animation data
-        default_loop_index = frame_index % len(default_animation_data)
-
-        for i in range(min(len(frame_data), 51)):
-            # Override blink, squint, and eye-wide with default animation
-            if i in eye_replacement_indices:
-                py_face.set_blendshape(FaceBlendShape(i), default_animation_data[default_loop_index][i])
-            else:
-                py_face.set_blendshape(FaceBlendShape(i), frame_data[i])
-        
-        encoded_data.append(py_face.encode())
-
-    return encoded_data
-
-
-def pre_encode_facial_data_blend_out(facial_data: List[np.ndarray], py_face, fps: int = 60) -> List[bytes]:
+def pre_encode_facial_data_blend_out(facial_data: List[np.ndarray], py_face, fps: int = 60, blend_curve: str = "linear") -> EncodedFrames:
     """
     Pre-encodes facial animation data while ensuring blinks, squints, and eye-wide blendshapes
     use the default animation data.
     """
-    encoded_data = []
+    return pre_encode_clip(facial_data, py_face, fps, blend_in=False, blend_out=True, blend_curve=blend_curve)
 
-    blend_in_frames = int(0.05 * fps)
-    blend_out_frames = int(0.3 * fps)
 
-    # Indices of blendshapes to replace with default animation values
-    eye_replacement_indices = [
-        FaceBlendShape.EyeBlinkLeft.value, FaceBlendShape.EyeBlinkRight.value, 
-        FaceBlendShape.EyeWideLeft.value, FaceBlendShape.EyeWideRight.value, 
-        FaceBlendShape.EyeSquintLeft.value, FaceBlendShape.EyeSquintRight.value
-    ]
-
-    # Main animation loop: Replace blink with default animation
-    for frame_index, frame_data in enumerate(facial_data[blend_in_frames:-blend_out_frames]):
-        # Ensure looping default animation data
-        default_loop_index = frame_index % len(default_animation_data)
-
-        for i in range(min(len(frame_data), 51)):
-            # Override blink, squint, and eye-wide with default animation
-            if i in eye_replacement_indices:
-                py_face.set_blendshape(FaceBlendShape(i), default_animation_data[default_loop_index][i])
-            else:
-                py_face.set_blendshape(FaceBlendShape(i), frame_data[i])
-        
-        encoded_data.append(py_face.encode())
-
-    # --- Added: Capture start time for blend out ---
-  #  blend_out_start = time.time()
-    
-    # Blend out phase
-    blend_out(facial_data, fps, py_face, encoded_data, blend_out_frames)
-    
-    # --- Added: Calculate and print total blend out duration ---
-  #  blend_out_duration = time.time() - blend_out_start
-  #  print(f"Blend out completed in {blend_out_duration:.3f} seconds.")
-
-    return encoded_data
-
-
-def pre_encode_facial_data(facial_data: List[np.ndarray], py_face, fps: int = 60) -> List[bytes]:
+def pre_encode_facial_data(facial_data: List[np.ndarray], py_face, fps: int = 60, blend_curve: str = "linear") -> EncodedFrames:
     """
     Pre-encodes facial animation data while ensuring blinks, squints, and eye-wide blendshapes
     use the default animation data.
     """
-    encoded_data = []
+    return pre_encode_clip(facial_data, py_face, fps, blend_in=True, blend_out=True, blend_curve=blend_curve)
 
-    blend_in_frames = int(0.05 * fps)
-    blend_out_frames = int(0.3 * fps)
 
-    # Indices of blendshapes to replace with default animation values
-    eye_replacement_indices = [
-        FaceBlendShape.EyeBlinkLeft.value, FaceBlendShape.EyeBlinkRight.value, 
-        FaceBlendShape.EyeWideLeft.value, FaceBlendShape.EyeWideRight.value, 
-        FaceBlendShape.EyeSquintLeft.value, FaceBlendShape.EyeSquintRight.value
-    ]
-    # Blend in phase
-    # --- Added: Capture start time for blend in ---
- #   blend_in_start = time.time()
-    
-    blend_in(facial_data, fps, py_face, encoded_data, blend_in_frames)
-    
-    # --- Added: Calculate and print total blend in duration ---
-   # blend_in_duration = time.time() - blend_in_start
-  #  print(f"Blend in completed in {blend_in_duration:.3f} seconds.")
-
-    # Main animation loop: Replace blink with default animation
-    for frame_index, frame_data in enumerate(facial_data[blend_in_frames:-blend_out_frames]):
-        # Ensure looping default animation data
-        default_loop_index = frame_index % len(default_animation_data)
-
-        for i in range(min(len(frame_data), 51)):
-            # Override blink, squint, and eye-wide with default animation
-            if i in eye_replacement_indices:
-                py_face.set_blendshape(FaceBlendShape(i), default_animation_data[default_loop_index][i])
-            else:
-                py_face.set_blendshape(FaceBlendShape(i), frame_data[i])
-        
-        encoded_data.append(py_face.encode())
-
-    # Blend out phase
-    # --- Added: Capture start time for blend out ---
-   # blend_out_start = time.time()
-    
-    blend_out(facial_data, fps, py_face, encoded_data, blend_out_frames)
-    
-    # --- Added: Calculate and print total blend out duration ---
-   # blend_out_duration = time.time() - blend_out_start
-  #  print(f"Blend out completed in {blend_out_duration:.3f} seconds.")
-
-    return encoded_data
-
-
-def send_pre_encoded_data_to_unreal(encoded_facial_data: List[bytes], start_event, fps: int, socket_connection=None):
+def send_pre_encoded_data_to_unreal(encoded_facial_data: List[bytes], start_event, fps: int, socket_connection=None, late_policy: str = "drop", audio_clock=None, origin_clock=None,
+                                    sync: str = "clock", output_latency_ms: float = OUTPUT_LATENCY_MS):
+    """
+    Sends pre-encoded frames on an absolute-deadline schedule once start_event is set.
+    audio_clock, if given, returns seconds of audio played and is used to report drift.
+    origin_clock, if given, returns the perf_counter_ns() time of frame 0 (e.g. when the
+    clip's first audio sample was output); otherwise the schedule starts when start_event is set.
+    With sync="audio" each frame is chosen from audio_clock instead (see FramePacer).
+    Returns the clip's PacerStats.
+    """
+    stats = None
     try:
         own_socket = False
         if socket_connection is None:
@@ -194,23 +186,60 @@ def send_pre_encoded_data_to_unreal(encoded_facial_data: List[bytes], start_even
 
         start_event.wait()  # Wait until the event signals to start
 
-        frame_duration = 1 / fps  # Time per frame in seconds
-        start_time = time.time()  # Get the initial start time
+        # Stamp gap-free timecodes from the shared frame clock now that playback starts.
+        if isinstance(encoded_facial_data, EncodedFrames):
+            get_frame_clock(fps).stamp(encoded_facial_data)
 
-        for frame_index, frame_data in enumerate(encoded_facial_data):
-            current_time = time.time()
-            elapsed_time = current_time - start_time
+        pacer = FramePacer(fps, late_policy=late_policy, audio_clock=audio_clock, sync=sync, output_latency_ms=output_latency_ms)
+        origin_ns = origin_clock() if origin_clock is not None else None
+        stats = pacer.run(encoded_facial_data, socket_connection.sendall, origin_ns)
+        if LOG_PLAYBACK_STATS:
+            print(f"Clip playback: {stats.summary()}")
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if own_socket:
+            socket_connection.close()
+    return stats
 
-            expected_time = frame_index * frame_duration 
-            if elapsed_time < expected_time:
-                time.sleep(expected_time - elapsed_time)
-            elif elapsed_time > expected_time + frame_duration:
-                continue
 
-            socket_connection.sendall(frame_data)  # Send the frame
+def send_streamed_frames_to_unreal(jitter_buffer, start_event, fps: int, socket_connection=None, py_face=None, late_policy: str = "stretch", audio_clock=None):
+    """
+    Drains a FrameJitterBuffer of composed (n, 61) windows on an absolute-deadline schedule once
+    start_event is set and the buffer is prefilled. Each window is encoded and stamped with
+    timecodes that continue from the previous one. A late window stretches the schedule by
+    default rather than dropping frames that have not been played yet. Returns the PacerStats.
+    """
+    stats = None
+    own_socket = False
+    try:
+        if socket_connection is None:
+            socket_connection = create_socket_connection()
+            own_socket = True
+        if py_face is None:
+            py_face = initialize_py_face()
+
+        start_event.wait()
+        jitter_buffer.wait_ready()
+        clock = get_frame_clock(fps)
+        next_frame = [clock.current_frame()]
+
+        def packets():
+            for window in jitter_buffer.windows():
+                encoded = encode_facial_frames(window, py_face)
+                clock.stamp(encoded, next_frame[0])
+                next_frame[0] += len(encoded)
+                yield from encoded
+
+        pacer = FramePacer(fps, late_policy=late_policy, audio_clock=audio_clock)
+        stats = pacer.run(packets(), socket_connection.sendall)
+        if LOG_PLAYBACK_STATS:
+            print(f"Streamed playback: {stats.summary()} | {jitter_buffer.summary()}")
 
     except KeyboardInterrupt:
         pass
     finally:
         if own_socket:
             socket_connection.close()
+    return stats
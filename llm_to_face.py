@@ -4,7 +4,6 @@
 import os
 from threading import Thread
 from queue import Queue, Empty
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -16,8 +15,9 @@ import time
 
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.audio.play_audio import quit_audio, stop_audio
 
-from utils.tts.tts_bridge import tts_worker
+from utils.tts.tts_bridge import tts_worker, warm_tts_cache
 from utils.files.file_utils import initialize_directories
 from utils.llm.chat_utils import load_chat_history, save_chat_log
 from utils.audio_face_workers import audio_face_queue_worker
@@ -32,6 +32,7 @@ LLM_STREAM_URL = "http://127.0.0.1:5050/generate_stream"
 VOICE_NAME = 'Lily'
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  
 USE_LOCAL_AUDIO = True 
+STREAM_BLENDSHAPES = False  # Stream each TTS chunk to the local NeuroSync streaming endpoint as it plays.
 
 llm_config = {
     "USE_LOCAL_LLM": USE_LOCAL_LLM,
@@ -64,9 +65,10 @@ def main():
     # Create queues for TTS and audio
     chunk_queue = Queue()
     audio_queue = Queue()
-    tts_worker_thread = Thread(target=tts_worker, args=(chunk_queue, audio_queue, USE_LOCAL_AUDIO, VOICE_NAME))
+    tts_worker_thread = Thread(target=tts_worker, args=(chunk_queue, audio_queue, USE_LOCAL_AUDIO, VOICE_NAME), kwargs={"stream_blendshapes": STREAM_BLENDSHAPES})
     tts_worker_thread.start()
-    audio_worker_thread = Thread(target=audio_face_queue_worker, args=(audio_queue, py_face, socket_connection, default_animation_thread))
+    Thread(target=warm_tts_cache, args=(USE_LOCAL_AUDIO, VOICE_NAME), daemon=True).start()
+    audio_worker_thread = Thread(target=audio_face_queue_worker, args=(audio_queue, py_face, socket_connection, default_animation_thread), kwargs={"stream_blendshapes": STREAM_BLENDSHAPES})
     audio_worker_thread.start()
     
     # Ask for input mode once: 't' for text, 'r' for push-to-talk recording, 'q' to quit
@@ -104,8 +106,7 @@ def main():
 
             flush_queue(chunk_queue)
             flush_queue(audio_queue)
-            if pygame.mixer.get_init():
-                pygame.mixer.stop()
+            stop_audio()
             # Prepare the message list for LLM
             messages = []
             # Optionally, incorporate chat_history or just send a single user message
@@ -128,7 +129,7 @@ def main():
         audio_worker_thread.join()
         stop_default_animation.set()
         default_animation_thread.join()
-        pygame.quit()
+        quit_audio()
         socket_connection.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# migrate_generated.py
+# Converts the generated/ library from shapes.csv to binary clips (shapes.nsc), or exports CSV
+# copies of the clips on demand for Unreal import.
+# Usage: python migrate_generated.py [--float16] [--remove-csv] | --export-csv
+
+import argparse
+import os
+
+from utils.files.file_utils import (
+    GENERATED_DIR, SHAPES_CLIP, SHAPES_CSV,
+    load_facial_data_from_csv, write_generated_clip, export_generated_csv,
+)
+from utils.neurosync.neurosync_api_connect import link_generated_blendshapes
+
+
+def generated_directories():
+    if not os.path.isdir(GENERATED_DIR):
+        return []
+    return [os.path.join(GENERATED_DIR, d) for d in sorted(os.listdir(GENERATED_DIR))
+            if os.path.isdir(os.path.join(GENERATED_DIR, d))]
+
+
+def convert_library(dtype="<f4", remove_csv=False):
+    """
+    Writes shapes.nsc for every entry that only has shapes.csv and points the blendshape cache
+    at it. Returns (converted, failed).
+    """
+    converted = failed = 0
+    for directory in generated_directories():
+        csv_path = os.path.join(directory, SHAPES_CSV)
+        clip_path = os.path.join(directory, SHAPES_CLIP)
+        audio_path = os.path.join(directory, 'audio.wav')
+        if not os.path.exists(csv_path) or os.path.exists(clip_path):
+            continue
+        try:
+            data = load_facial_data_from_csv(csv_path)
+            audio_bytes = None
+            if os.path.exists(audio_path):
+                with open(audio_path, 'rb') as f:
+                    audio_bytes = f.read()
+            write_generated_clip(data, clip_path, audio_bytes, dtype=dtype)
+            if audio_bytes is not None:
+                link_generated_blendshapes(audio_bytes, clip_path)
+        except Exception as e:
+            print(f"❌ Could not convert {csv_path}: {e}")
+            failed += 1
+            continue
+        if remove_csv:
+            os.remove(csv_path)
+        converted += 1
+    return converted, failed
+
+
+def export_library():
+    exported = 0
+    for directory in generated_directories():
+        clip_path = os.path.join(directory, SHAPES_CLIP)
+        if os.path.exists(clip_path):
+            export_generated_csv(clip_path)
+            exported += 1
+    return exported
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert generated/ shapes.csv files to binary clips, or export clips as CSV.")
+    parser.add_argument("--float16", action="store_true", help="Store frames as float16 (half the size, about 3 decimal digits).")
+    parser.add_argument("--remove-csv", action="store_true", help="Delete each shapes.csv once it has been converted.")
+    parser.add_argument("--export-csv", action="store_true", help="Write shapes.csv next to every clip instead of converting.")
+    args = parser.parse_args()
+
+    if args.export_csv:
+        print(f"Exported {export_library()} clips to CSV.")
+    else:
+        converted, failed = convert_library("<f2" if args.float16 else "<f4", args.remove_csv)
+        print(f"Converted {converted} clips, {failed} failed.")
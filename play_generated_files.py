@@ -2,7 +2,6 @@
 # For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
 # Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
 
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -11,6 +10,7 @@ warnings.filterwarnings(
 
 from threading import Thread
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.audio.play_audio import quit_audio
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from utils.files.file_utils import list_generated_files, load_facial_data_from_csv
 from utils.generated_runners import run_audio_animation
@@ -64,5 +64,5 @@ if __name__ == '__main__':
         stop_default_animation.set()
         if default_animation_thread:
             default_animation_thread.join()
-        pygame.quit()
+        quit_audio()
         socket_connection.close()
@@ -1,4 +1,3 @@
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -10,11 +9,14 @@ from threading import Thread
 
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.audio.play_audio import quit_audio
 
 from utils.tts.eleven_labs import get_speech_to_speech_audio
-from utils.audio.record_audio import record_audio_until_release
+from utils.audio.audio_buffer import AudioBuffer
+from utils.audio.record_audio import record_audio_buffer_until_release
 from utils.generated_runners import run_audio_animation_from_bytes
-from utils.files.file_utils import save_generated_data, initialize_directories
+from utils.files.file_utils import save_generated_data_async, initialize_directories
+from utils.files.persistence_queue import close_persistence_queue
 from utils.neurosync.neurosync_api_connect import send_audio_to_neurosync
 
 
@@ -41,7 +43,7 @@ if __name__ == "__main__":
                     break
                 elif keyboard.is_pressed('right ctrl'):
                     # Record audio when Right Ctrl is pressed
-                    audio_bytes = record_audio_until_release()
+                    audio_bytes = record_audio_buffer_until_release()
 
                     # Convert the recorded audio to speech using Speech-to-Speech API
                     processed_audio_bytes = get_speech_to_speech_audio(audio_bytes, voice_name)
@@ -49,6 +51,7 @@ if __name__ == "__main__":
                     if processed_audio_bytes is None:
                         print("Failed to get processed audio from Speech-to-Speech API.")
                         continue
+                    processed_audio_bytes = AudioBuffer.from_bytes(processed_audio_bytes)
                     
                     # Send the processed audio bytes to the API to get the facial blendshapes
                     generated_facial_data = send_audio_to_neurosync(processed_audio_bytes)
@@ -60,8 +63,8 @@ if __name__ == "__main__":
                     # Run the animation with the generated blendshapes
                     run_audio_animation_from_bytes(processed_audio_bytes, generated_facial_data, py_face, socket_connection, default_animation_thread)
 
-                    # Save the generated blendshapes and audio
-                    save_generated_data(processed_audio_bytes, generated_facial_data)
+                    # Save the generated blendshapes and audio in the background
+                    save_generated_data_async(processed_audio_bytes, generated_facial_data)
                     break
 
             if keyboard.is_pressed('q'):
@@ -72,5 +75,6 @@ if __name__ == "__main__":
         stop_default_animation.set()
         if default_animation_thread:
             default_animation_thread.join()
-        pygame.quit()
+        close_persistence_queue()
+        quit_audio()
         socket_connection.close()
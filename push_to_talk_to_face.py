@@ -2,7 +2,6 @@
 # For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
 # Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
 
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -13,10 +12,12 @@ from threading import Thread
 
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.audio.play_audio import quit_audio
 
-from utils.audio.record_audio import record_audio_until_release
+from utils.audio.record_audio import record_audio_buffer_until_release
 from utils.generated_runners import run_audio_animation_from_bytes
-from utils.files.file_utils import save_generated_data, initialize_directories
+from utils.files.file_utils import save_generated_data_async, initialize_directories
+from utils.files.persistence_queue import close_persistence_queue
 from utils.neurosync.neurosync_api_connect import send_audio_to_neurosync
 
 
@@ -41,7 +42,7 @@ if __name__ == "__main__":
                     break
                 elif keyboard.is_pressed('right ctrl'):
                     # Record the audio until the 'Right Ctrl' key is released
-                    audio_bytes = record_audio_until_release()
+                    audio_bytes = record_audio_buffer_until_release()
                     
                     # Send the recorded audio to the API and get the blendshapes
                     generated_facial_data = send_audio_to_neurosync(audio_bytes)
@@ -53,8 +54,8 @@ if __name__ == "__main__":
                     # Run the animation with the generated blendshapes
                     run_audio_animation_from_bytes(audio_bytes, generated_facial_data, py_face, socket_connection, default_animation_thread)
                     
-                    # Save the generated data for later use
-                    save_generated_data(audio_bytes, generated_facial_data)
+                    # Save the generated data for later use, in the background
+                    save_generated_data_async(audio_bytes, generated_facial_data)
                     
                     break
 
@@ -66,5 +67,6 @@ if __name__ == "__main__":
         stop_default_animation.set()
         if default_animation_thread:
             default_animation_thread.join()
-        pygame.quit()
+        close_persistence_queue()
+        quit_audio()
         socket_connection.close()
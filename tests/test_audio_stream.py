@@ -0,0 +1,92 @@
+# test_audio_stream.py
+# Gapless scheduling on the continuous output stream, driven headless by a NullAudioSink:
+# chunks start on the sample the previous one ends, a pause starts the next chunk on the
+# next block, and crossfaded chunks overlap with a linear fade.
+
+import numpy as np
+import pytest
+
+from utils.audio.audio_stream import AudioOutputStream, NullAudioSink
+
+SAMPLE_RATE = 44100
+BLOCK = 512
+
+
+def make_stream(**options):
+    sink = NullAudioSink(realtime=False, block_frames=BLOCK, keep_output=True)
+    return AudioOutputStream(sink, sample_rate=SAMPLE_RATE, **options).start(), sink
+
+
+def tone(frames, value):
+    return np.full((frames, 1), value, dtype=np.float32)
+
+
+def test_chunks_are_scheduled_back_to_back():
+    stream, sink = make_stream()
+    first = stream.append(tone(1000, 0.25), SAMPLE_RATE)
+    second = stream.append(tone(700, -0.5), SAMPLE_RATE)
+    assert (first.start_frame, first.end_frame) == (0, 1000)
+    assert (second.start_frame, second.end_frame) == (1000, 1700)
+
+    sink.pump(2048)
+    output = sink.output()[:, 0]
+    np.testing.assert_array_equal(output[:1000], 0.25)
+    np.testing.assert_array_equal(output[1000:1700], -0.5)
+    np.testing.assert_array_equal(output[1700:], 0.0)
+    assert first.finished and second.finished
+    assert stream.silent_frames == 2048 - 1700
+
+
+def test_chunk_after_a_pause_starts_on_the_next_block():
+    stream, sink = make_stream()
+    first = stream.append(tone(600, 0.25), SAMPLE_RATE)
+    sink.pump(3 * BLOCK)  # Plays the chunk, then silence.
+    second = stream.append(tone(100, 0.5), SAMPLE_RATE)
+    assert first.end_frame == 600
+    assert second.start_frame == 3 * BLOCK
+    sink.pump(BLOCK)
+    np.testing.assert_array_equal(sink.output()[3 * BLOCK:3 * BLOCK + 100, 0], 0.5)
+
+
+def test_chunk_position_follows_the_output():
+    stream, sink = make_stream()
+    stream.append(tone(BLOCK, 0.2), SAMPLE_RATE)
+    chunk = stream.append(tone(2 * BLOCK, 0.1), SAMPLE_RATE)
+    assert chunk.position() is None and not chunk.started
+    sink.pump(2 * BLOCK)
+    assert chunk.started and not chunk.finished
+    assert 0 <= chunk.position() <= 2 * BLOCK / SAMPLE_RATE
+    sink.pump(4 * BLOCK)
+    assert chunk.position() == pytest.approx(2 * BLOCK / SAMPLE_RATE)
+
+
+def test_crossfade_overlaps_the_previous_chunk():
+    stream, sink = make_stream(crossfade_ms=10.0)
+    overlap = stream.crossfade_frames
+    first = stream.append(tone(2000, 1.0), SAMPLE_RATE)
+    second = stream.append(tone(2000, 0.0), SAMPLE_RATE)
+    assert second.start_frame == first.end_frame - overlap
+
+    sink.pump(4096)
+    faded = sink.output()[second.start_frame:first.end_frame, 0]
+    expected = 1.0 - np.linspace(0.0, 1.0, overlap + 2)[1:-1]
+    np.testing.assert_allclose(faded, expected, atol=1e-6)
+    np.testing.assert_array_equal(sink.output()[:second.start_frame, 0], 1.0)
+
+
+def test_continuation_is_not_crossfaded():
+    stream, sink = make_stream(crossfade_ms=10.0)
+    first = stream.append(tone(2000, 1.0), SAMPLE_RATE)
+    second = stream.append(tone(2000, 0.5), SAMPLE_RATE, crossfade=False)
+    assert second.start_frame == first.end_frame
+
+
+def test_clear_cancels_unplayed_chunks():
+    stream, sink = make_stream()
+    chunk = stream.append(tone(5000, 0.25), SAMPLE_RATE)
+    sink.pump(BLOCK)
+    stream.clear()
+    assert chunk.cancelled and chunk.finished
+    assert chunk.position() is None
+    sink.pump(BLOCK)
+    np.testing.assert_array_equal(sink.output()[BLOCK:, 0], 0.0)
@@ -0,0 +1,30 @@
+# test_blend_latency.py
+# Pre-encoding a clip with blend in/out must not wait on the wall clock: the old path slept
+# 1 / fps per blend frame, ~350 ms per clip at any fps.
+
+import time
+
+import numpy as np
+import pytest
+
+from livelink.connect.livelink_init import initialize_py_face
+from livelink.send_to_unreal import pre_encode_facial_data
+
+ENCODE_BUDGET_SECONDS = 0.05
+
+
+def best_encode_seconds(facial_data, fps, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encoded = pre_encode_facial_data(facial_data, initialize_py_face(), fps=fps)
+        best = min(best, time.perf_counter() - start)
+    return best, encoded
+
+
+@pytest.mark.parametrize("fps", [30, 60, 120])
+def test_pre_encode_does_not_sleep(fps):
+    facial_data = np.random.default_rng(0).random((600, 68))
+    seconds, encoded = best_encode_seconds(facial_data, fps)
+    assert len(encoded) == len(facial_data)
+    assert seconds < ENCODE_BUDGET_SECONDS
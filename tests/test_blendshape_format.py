@@ -0,0 +1,54 @@
+# test_blendshape_format.py
+# The binary blendshape payload and the client's content negotiation, against the stub
+# NeuroSync server: binary when the server offers it, JSON otherwise, with the same values.
+
+import numpy as np
+import pytest
+
+from utils.audio.audio_buffer import AudioBuffer
+from utils.neurosync.blendshape_format import decode_blendshapes_binary, encode_blendshapes_binary
+from utils.neurosync.neurosync_api_connect import NeuroSyncClient
+from utils.neurosync.stub_server import FPS, start_stub_server, stub_blendshapes
+
+AUDIO_SECONDS = 1.5
+
+
+@pytest.fixture(scope="module")
+def wav_audio():
+    samples = (np.sin(np.arange(int(AUDIO_SECONDS * 16000)) * 0.05) * 8000).astype("<i2")
+    return AudioBuffer(samples, 16000).to_wav_bytes()
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["binary-server", "json-only-server"])
+def server_url(request):
+    server, url = start_stub_server(json_only=request.param)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def test_binary_payload_round_trip():
+    blendshapes = np.random.default_rng(0).random((90, 68), dtype=np.float32)
+    decoded = decode_blendshapes_binary(encode_blendshapes_binary(blendshapes))
+    assert decoded.dtype == np.float32
+    assert not decoded.flags.writeable  # A view of the payload, not a copy.
+    np.testing.assert_array_equal(decoded, blendshapes)
+
+
+def test_truncated_payload_is_rejected():
+    payload = encode_blendshapes_binary(np.zeros((10, 68), dtype=np.float32))
+    with pytest.raises(ValueError):
+        decode_blendshapes_binary(payload[:-4])
+
+
+@pytest.mark.parametrize("accept_binary", [True, False], ids=["accept-binary", "accept-json"])
+def test_client_round_trip(server_url, wav_audio, accept_binary):
+    client = NeuroSyncClient(local_url=server_url, accept_binary=accept_binary, use_cache=False, max_retries=0)
+    try:
+        blendshapes = client.send_audio(wav_audio)
+    finally:
+        client.close()
+    expected = stub_blendshapes(int(round(AUDIO_SECONDS * FPS)))
+    assert blendshapes.shape == expected.shape
+    assert blendshapes.dtype == np.float32
+    np.testing.assert_array_equal(blendshapes, expected)
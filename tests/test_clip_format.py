@@ -0,0 +1,63 @@
+# test_clip_format.py
+# Binary clip files round-trip the blendshape matrix and header, float32 clips load as a
+# memory map, and malformed files are rejected rather than misread.
+
+import numpy as np
+import pytest
+
+from utils.files.clip_format import HEADER, load_clip, read_clip_header, write_clip
+
+
+@pytest.mark.parametrize("dimensions", [61, 68])
+def test_float32_round_trip(tmp_path, dimensions):
+    frames = np.random.default_rng(0).random((321, dimensions), dtype=np.float32)
+    path = write_clip(str(tmp_path / "shapes.nsc"), frames, fps=60, audio_hash=b"\x01" * 32)
+
+    loaded, header = load_clip(path)
+    assert isinstance(loaded, np.memmap)
+    np.testing.assert_array_equal(loaded, frames)
+    assert (header.frames, header.dimensions, header.fps) == (321, dimensions, 60)
+    assert header.has_emotions == (dimensions == 68)
+    assert header.audio_hash == b"\x01" * 32
+    assert header.duration == pytest.approx(321 / 60)
+
+
+def test_float16_round_trip(tmp_path):
+    frames = np.random.default_rng(1).random((100, 68)).astype(np.float32)
+    path = write_clip(str(tmp_path / "shapes.nsc"), frames, dtype="<f2")
+
+    loaded, header = load_clip(path)
+    assert loaded.dtype == np.float32
+    assert header.dtype == np.dtype("<f2")
+    np.testing.assert_array_equal(loaded, frames.astype(np.float16).astype(np.float32))
+    assert (tmp_path / "shapes.nsc").stat().st_size == HEADER.size + frames.size * 2
+
+
+def test_memory_map_writes_stay_in_memory(tmp_path):
+    frames = np.zeros((10, 61), dtype=np.float32)
+    path = write_clip(str(tmp_path / "shapes.nsc"), frames)
+    loaded, _ = load_clip(path)
+    loaded[0, 0] = 1.0
+    np.testing.assert_array_equal(load_clip(path)[0], frames)
+
+
+def test_empty_clip(tmp_path):
+    path = write_clip(str(tmp_path / "empty.nsc"), np.zeros((0, 61), dtype=np.float32))
+    loaded, header = load_clip(path)
+    assert loaded.shape == (0, 61) and header.frames == 0
+
+
+def test_rejects_bad_shapes_and_files(tmp_path):
+    with pytest.raises(ValueError):
+        write_clip(str(tmp_path / "bad.nsc"), np.zeros((10, 50), dtype=np.float32))
+
+    path = write_clip(str(tmp_path / "shapes.nsc"), np.zeros((10, 61), dtype=np.float32))
+    with open(path, "r+b") as f:
+        f.truncate(HEADER.size + 4)
+    with pytest.raises(ValueError):
+        load_clip(path)
+
+    not_a_clip = tmp_path / "shapes.csv"
+    not_a_clip.write_bytes(b"Timecode,BlendshapeCount".ljust(HEADER.size, b" "))
+    with pytest.raises(ValueError):
+        read_clip_header(str(not_a_clip))
@@ -0,0 +1,71 @@
+# test_csv_export.py
+# write_blendshape_csv against the pandas exporter it replaced: same header, counts and values
+# (to the LiveLink Face precision), with timecodes taken from the frame index. Files, text
+# streams and byte buffers get identical output.
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.csv.save_csv import FLOAT_PRECISION, csv_columns, generate_csv_in_memory, timecode_fields, write_blendshape_csv
+
+FPS = 60
+
+
+def reference_timecodes(frame_count, fps=FPS):
+    timecodes = []
+    for frame in range(frame_count):
+        seconds, frame_in_second = divmod(frame, fps)
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        timecodes.append(f"{hours:02}:{minutes:02}:{seconds:02}:{frame_in_second:02}.{frame_in_second * 1000 // fps:03}")
+    return timecodes
+
+
+def reference_export(generated):
+    """
+    The previous exporter: a string table through np.hstack, written by pandas.
+    """
+    timecodes = np.array(reference_timecodes(len(generated))).reshape(-1, 1)
+    counts = np.full((len(generated), 1), generated.shape[1])
+    data = np.hstack((timecodes, counts, generated))
+    buffer = io.StringIO()
+    pd.DataFrame(data, columns=csv_columns(generated.shape[1])).to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("dimensions", [61, 68])
+def test_matches_the_pandas_exporter(dimensions):
+    generated = np.random.default_rng(0).random((2 * 60 * FPS + 7, dimensions))  # Past two minute marks.
+    buffer = io.StringIO()
+    write_blendshape_csv(generated, buffer)
+
+    ours = pd.read_csv(io.StringIO(buffer.getvalue()), dtype={"Timecode": str})
+    theirs = pd.read_csv(io.StringIO(reference_export(generated)), dtype={"Timecode": str})
+    assert list(ours.columns) == list(theirs.columns)
+    assert list(ours["Timecode"]) == list(theirs["Timecode"])
+    assert (ours["BlendshapeCount"] == dimensions).all()
+    np.testing.assert_allclose(ours.values[:, 2:].astype(float), theirs.values[:, 2:].astype(float), rtol=0, atol=10.0 ** -FLOAT_PRECISION)
+
+
+def test_timecodes_cross_the_hour():
+    fields = timecode_fields(4, FPS, start_frame=3600 * FPS - 2)
+    assert fields.tolist() == [[0, 59, 59, 58, 966], [0, 59, 59, 59, 983], [1, 0, 0, 0, 0], [1, 0, 0, 1, 16]]
+
+
+def test_all_destinations_get_identical_output(tmp_path):
+    generated = np.random.default_rng(1).random((2500, 68), dtype=np.float32)
+    path = tmp_path / "shapes.csv"
+    write_blendshape_csv(generated, str(path))
+    text = io.StringIO()
+    write_blendshape_csv(generated, text)
+    binary = generate_csv_in_memory(generated)
+
+    assert path.read_bytes() == text.getvalue().encode("ascii") == binary.getvalue()
+
+
+def test_rejects_unexpected_dimensions():
+    with pytest.raises(ValueError):
+        write_blendshape_csv(np.zeros((10, 50)), io.StringIO())
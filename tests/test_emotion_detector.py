@@ -0,0 +1,77 @@
+# test_emotion_detector.py
+# StreamingEmotionDetector: the running window sum matches summing the window directly, the
+# changes do not depend on how the frames are chunked, and frames without emotion columns
+# advance the frame count without entering the window.
+
+import numpy as np
+import pytest
+
+from livelink.animations.animation_emotion import EMOTION_LABELS, StreamingEmotionDetector
+
+
+def emotion_frames(frame_count, seed=0, segment_frames=90):
+    rng = np.random.default_rng(seed)
+    segments = np.repeat(rng.random((frame_count // segment_frames + 1, 7)), segment_frames, axis=0)[:frame_count]
+    emotions = segments + 0.3 * rng.random((frame_count, 7))
+    return np.concatenate([rng.random((frame_count, 61)), emotions], axis=1)
+
+
+def feed(detector, facial_data, sizes, final=True):
+    changes, position = [], 0
+    for index, size in enumerate(sizes):
+        last = index == len(sizes) - 1
+        changes += detector.update(facial_data[position:position + size], final and last)
+        position += size
+    return changes
+
+
+@pytest.mark.parametrize("window_frames", [1, 7, 180])
+def test_running_window_sum_matches_direct_sum(window_frames):
+    facial_data = emotion_frames(1000)
+    detector = StreamingEmotionDetector(window_frames)
+    emotions = facial_data[:, -7:]
+    position = 0
+    for size in np.random.default_rng(1).integers(1, 100, size=10):
+        sums = detector._window_sums(emotions[position:position + size])
+        for i, window_sum in enumerate(sums):
+            end = position + i + 1
+            np.testing.assert_allclose(window_sum, emotions[max(0, end - window_frames):end].sum(axis=0), atol=1e-9)
+        position += len(sums)
+
+
+def test_changes_do_not_depend_on_chunking():
+    facial_data = emotion_frames(1500)
+    whole = feed(StreamingEmotionDetector(), facial_data, [len(facial_data)])
+    single_frames = feed(StreamingEmotionDetector(), facial_data, [1] * len(facial_data))
+    rng = np.random.default_rng(2)
+    sizes = list(rng.integers(1, 120, size=40))
+    sizes.append(len(facial_data) - sum(sizes))
+    chunked = feed(StreamingEmotionDetector(), facial_data, sizes)
+
+    assert whole and whole[0][0] == 0  # A whole clip gets its first emotion from frame 0.
+    # Streamed, the first emotion is reported where the window fills; later changes match.
+    assert single_frames[0][0] == 179 and single_frames[1:] == whole[1:]
+    assert chunked[1:] == whole[1:]
+    assert {emotion for _, emotion in whole} <= set(EMOTION_LABELS)
+
+
+def test_frames_without_emotions_do_not_enter_the_window():
+    detector = StreamingEmotionDetector(window_frames=180)
+    assert detector.update(np.zeros((400, 61))) == []
+    assert detector.update(np.zeros((10, 68))) == []
+    happy = np.zeros((200, 68))
+    happy[:, 61 + EMOTION_LABELS.index("Happy")] = 1.0
+    changes = detector.update(happy)
+
+    assert detector.frames_seen == 610 and detector.frames_consumed == 210
+    assert changes == [(410, "Happy")]
+    assert detector.update(np.zeros((5, 61))) == []
+    assert detector.frames_seen == 615
+
+
+def test_short_final_clip_after_frames_without_emotions():
+    detector = StreamingEmotionDetector(window_frames=180)
+    detector.update(np.zeros((300, 61)))
+    sad = np.zeros((20, 68))
+    sad[:, 61 + EMOTION_LABELS.index("Sad")] = 1.0
+    assert detector.update(sad, final=True) == [(300, "Sad")]
@@ -0,0 +1,79 @@
+# test_resampler.py
+# StreamingResampler fed chunk by chunk produces what resample() gives for the whole clip,
+# whatever the chunk sizes, and resample() matches scipy.signal.resample_poly. The realtime
+# conversion worker starts each response from fresh filter state.
+
+from queue import Queue
+
+import numpy as np
+import pytest
+import scipy.signal
+
+from utils.audio.resampler import StreamingResampler, get_filter, resample, resample_pcm_chunks
+
+RATE_PAIRS = [(22050, 88200), (24000, 88200), (88200, 48000), (44100, 16000), (16000, 16000)]
+
+
+def noise(frames, channels=1, seed=0):
+    return np.random.default_rng(seed).uniform(-0.5, 0.5, (frames, channels)).astype(np.float32)
+
+
+def stream_in_chunks(resampler, samples, sizes):
+    out, position = [], 0
+    for size in sizes:
+        out.append(resampler.process(samples[position:position + size]))
+        position += size
+    out.append(resampler.process(samples[position:]))
+    out.append(resampler.flush())
+    return np.concatenate(out)
+
+
+@pytest.mark.parametrize("source_rate, target_rate", RATE_PAIRS)
+def test_streaming_matches_whole_clip(source_rate, target_rate):
+    samples = noise(source_rate // 2)
+    sizes = np.random.default_rng(1).integers(1, 700, size=40)
+    streamed = stream_in_chunks(StreamingResampler(source_rate, target_rate), samples, sizes)
+    whole = resample(samples, source_rate, target_rate)
+    assert streamed.shape == whole.shape
+    np.testing.assert_allclose(streamed, whole, atol=1e-5)
+
+
+def test_streaming_is_reusable_after_flush():
+    resampler = StreamingResampler(22050, 88200, channels=2)
+    samples = noise(5000, channels=2)
+    first = stream_in_chunks(resampler, samples, [1000, 1000])
+    second = stream_in_chunks(resampler, samples, [333, 777, 2000])
+    np.testing.assert_array_equal(first, second)
+
+
+def test_pcm_chunks_match_whole_clip():
+    samples = (noise(24000)[:, 0] * 32767).astype("<i2")
+    chunks = [samples[i:i + 2400].tobytes() for i in range(0, len(samples), 2400)]
+    streamed = np.frombuffer(b"".join(resample_pcm_chunks(chunks, 24000, 88200)), dtype="<i2")
+    whole = (np.clip(resample(samples, 24000, 88200), -1.0, 1.0) * 32767).astype("<i2")
+    assert len(streamed) == len(whole)
+    assert np.abs(streamed.astype(np.int32) - whole).max() <= 1
+
+
+@pytest.mark.parametrize("source_rate, target_rate", RATE_PAIRS)
+def test_resample_matches_scipy(source_rate, target_rate):
+    samples = noise(4000)
+    f = get_filter(source_rate, target_rate)
+    expected = scipy.signal.resample_poly(samples.astype(np.float64), f.up, f.down, axis=0)
+    np.testing.assert_allclose(resample(samples, source_rate, target_rate), expected, atol=1e-5)
+
+
+def test_conversion_worker_starts_each_response_fresh(monkeypatch):
+    import utils.audio_face_workers as workers
+
+    sent = []
+    monkeypatch.setattr(workers, "send_audio_to_neurosync", lambda wav: sent.append(wav) or np.zeros((1, 68)))
+    pcm = (noise(12000)[:, 0] * 32767).astype("<i2").tobytes()
+    conversion_queue, audio_queue = Queue(), Queue()
+    for item in (pcm, workers.RESPONSE_END, pcm, None):
+        conversion_queue.put(item)
+    workers.conversion_worker(conversion_queue, audio_queue, 24000, 1, 2)
+
+    assert sent[0] == sent[1]
+    assert audio_queue.qsize() == 2
+    assert conversion_queue.unfinished_tasks == 0
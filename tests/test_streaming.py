@@ -0,0 +1,78 @@
+# test_streaming.py
+# Streaming inference against the stub server: windows reach the jitter buffer in order and
+# join up into the batch response. Streamed audio plays on a headless output stream as one
+# seamless signal, with the ChunkSequence clock following what has been heard.
+
+import time
+
+import numpy as np
+import pytest
+
+from livelink.jitter_buffer import FrameJitterBuffer
+from utils.audio.audio_stream import AudioOutputStream, NullAudioSink
+from utils.audio.resampler import StreamingResampler
+from utils.generated_runners import StreamedAudioPlayback
+from utils.neurosync.neurosync_stream import STREAM_SAMPLE_RATE, WINDOW_FRAMES, stream_audio_chunks
+from utils.neurosync.stub_server import FPS, STREAM_PATH, start_stub_server, stub_blendshapes, stub_url
+
+
+@pytest.fixture(scope="module")
+def stream_url():
+    server, _ = start_stub_server()
+    yield stub_url(server, STREAM_PATH)
+    server.shutdown()
+    server.server_close()
+
+
+def pcm_chunks(seconds, sample_rate, chunk_seconds=0.05):
+    samples = (np.sin(np.arange(int(seconds * sample_rate)) * 2 * np.pi * 220 / sample_rate) * 8000).astype("<i2")
+    step = int(chunk_seconds * sample_rate)
+    return samples, [samples[i:i + step].tobytes() for i in range(0, len(samples), step)]
+
+
+@pytest.mark.parametrize("source_rate", [STREAM_SAMPLE_RATE, 24000])
+def test_stream_windows_reach_jitter_buffer_in_order(stream_url, source_rate):
+    seconds = 2.0
+    _, chunks = pcm_chunks(seconds, source_rate)
+    jitter_buffer = FrameJitterBuffer(WINDOW_FRAMES)
+    stream = stream_audio_chunks(chunks, jitter_buffer.put, jitter_buffer.close, stream_url, source_rate=source_rate)
+    assert stream.wait(10)
+    assert stream.error is None
+
+    windows = list(jitter_buffer.windows())
+    assert [len(window) for window in windows[:-1]] == [WINDOW_FRAMES] * (len(windows) - 1)
+    frames = np.concatenate(windows)
+    np.testing.assert_array_equal(frames, stub_blendshapes(int(round(seconds * FPS))))
+    assert jitter_buffer.finished and jitter_buffer.error is None
+
+
+def test_streamed_audio_plays_seamlessly():
+    source_rate = 24000
+    samples, chunks = pcm_chunks(0.5, source_rate, chunk_seconds=0.03)
+    sink = NullAudioSink(realtime=False, keep_output=True)
+    output = AudioOutputStream(sink, sample_rate=44100).start()
+    playback = StreamedAudioPlayback(source_rate, stream=output)
+    assert playback.sequence.position() is None
+
+    for _ in playback.tee(chunks):
+        pass
+    deadline = time.perf_counter() + 5
+    while not playback.sequence.closed and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert playback.sequence.closed and playback.started.is_set()
+
+    heard = []
+    total = sum(chunk.end_frame - chunk.start_frame for chunk in playback.sequence.chunks)
+    while playback.sequence.position() is not None or not heard:
+        sink.pump(1024)
+        heard.append(playback.sequence.position())
+    positions = [p for p in heard if p is not None]
+    assert positions == sorted(positions)
+    assert positions[-1] == pytest.approx(total / output.sample_rate, abs=1024 / output.sample_rate)
+    playback.finish()
+
+    resampler = StreamingResampler(source_rate, output.sample_rate)
+    expected = np.concatenate((resampler.process(samples), resampler.flush()))[:, 0]
+    played = sink.output()[:total, 0]
+    assert total == len(expected)
+    np.testing.assert_allclose(played, expected, atol=1e-6)
@@ -0,0 +1,63 @@
+# test_tts_pool.py
+# Concurrent TTS results are delivered in the order their chunks were queued, however the
+# synthesis calls finish.
+
+import random
+import time
+from queue import Queue
+
+from utils.tts.tts_bridge import ReorderBuffer, run_ordered_pool
+
+
+def test_reorder_buffer_delivers_in_sequence():
+    delivered = []
+    reorder = ReorderBuffer(delivered.append)
+    for sequence in (2, 0, 3, 1, 5, 4):
+        reorder.put(sequence, f"result {sequence}")
+        assert delivered == [f"result {i}" for i in range(len(delivered))]
+    assert delivered == [f"result {i}" for i in range(6)]
+    assert reorder.next_sequence == 6
+    assert reorder.max_waiting == 3  # 1 arrived while 2 and 3 were waiting for it.
+
+
+def test_reorder_buffer_holds_results_until_the_gap_fills():
+    delivered = []
+    reorder = ReorderBuffer(delivered.append)
+    reorder.put(1, "b")
+    reorder.put(2, "c")
+    assert delivered == []
+    reorder.put(0, "a")
+    assert delivered == ["a", "b", "c"]
+
+
+def test_ordered_pool_keeps_queue_order():
+    rng = random.Random(0)
+    delays = {f"chunk {i}": rng.uniform(0.0, 0.02) for i in range(20)}
+
+    def synthesize(chunk):
+        time.sleep(delays[chunk])
+        return chunk
+
+    chunk_queue, audio_queue = Queue(), Queue()
+    for chunk in delays:
+        chunk_queue.put(chunk)
+    chunk_queue.put(None)
+    run_ordered_pool(chunk_queue, audio_queue, synthesize, max_workers=4)
+
+    assert [audio_queue.get_nowait() for _ in range(audio_queue.qsize())] == list(delays)
+
+
+def test_ordered_pool_skips_failed_and_empty_chunks():
+    def synthesize(chunk):
+        if chunk == "fails":
+            raise RuntimeError("TTS down")
+        return None if chunk == "no audio" else chunk
+
+    chunk_queue, audio_queue = Queue(), Queue()
+    for chunk in ("one", "fails", "  ", "no audio", "...", "two"):
+        chunk_queue.put(chunk)
+    chunk_queue.put(None)
+    run_ordered_pool(chunk_queue, audio_queue, synthesize, max_workers=2)
+
+    assert [audio_queue.get_nowait() for _ in range(audio_queue.qsize())] == ["one", "two"]
+    assert chunk_queue.unfinished_tasks == 1  # Only the None sentinel, which the caller acknowledges.
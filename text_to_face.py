@@ -4,7 +4,6 @@
 
 
 from threading import Thread
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -12,8 +11,11 @@ warnings.filterwarnings(
 )
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.audio.audio_buffer import AudioBuffer
+from utils.audio.play_audio import quit_audio
 
-from utils.files.file_utils import save_generated_data, initialize_directories
+from utils.files.file_utils import save_generated_data_async, initialize_directories
+from utils.files.persistence_queue import close_persistence_queue
 from utils.generated_runners import run_audio_animation_from_bytes
 from utils.neurosync.neurosync_api_connect import send_audio_to_neurosync
 
@@ -51,6 +53,8 @@ if __name__ == "__main__":
                     audio_bytes = call_local_tts(text_input)
 
                 if audio_bytes:
+                    audio_bytes = AudioBuffer.from_bytes(audio_bytes)
+
                     # Send the audio bytes to the API and get the blendshapes
                     generated_facial_data = send_audio_to_neurosync(audio_bytes)
 
@@ -60,8 +64,8 @@ if __name__ == "__main__":
                             audio_bytes, generated_facial_data, py_face, socket_connection, default_animation_thread
                         )
 
-                        # Save the generated blendshape data
-                        save_generated_data(audio_bytes, generated_facial_data)
+                        # Save the generated blendshape data in the background
+                        save_generated_data_async(audio_bytes, generated_facial_data)
                     else:
                         print("❌ Failed to get blendshapes from the API.")
                 else:
@@ -74,5 +78,6 @@ if __name__ == "__main__":
         stop_default_animation.set()
         if default_animation_thread:
             default_animation_thread.join()
-        pygame.quit()
+        close_persistence_queue()
+        quit_audio()
         socket_connection.close()
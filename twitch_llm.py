@@ -3,7 +3,6 @@ import os
 import time
 from threading import Thread, Lock
 from queue import Queue, Empty
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -12,7 +11,8 @@ warnings.filterwarnings(
 
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
-from utils.tts.tts_bridge import tts_worker
+from utils.audio.play_audio import quit_audio, stop_audio
+from utils.tts.tts_bridge import tts_worker, warm_tts_cache
 from utils.files.file_utils import initialize_directories
 from utils.llm.chat_utils import load_chat_history, save_chat_log
 from utils.llm.llm_utils import stream_llm_chunks 
@@ -30,6 +30,7 @@ LLM_STREAM_URL = "http://127.0.0.1:5050/generate_stream"
 VOICE_NAME = 'Lily'
 
 USE_LOCAL_AUDIO = True 
+STREAM_BLENDSHAPES = False  # Stream each TTS chunk to the local NeuroSync streaming endpoint as it plays.
 
 llm_config = {
     "USE_LOCAL_LLM": USE_LOCAL_LLM,
@@ -68,9 +69,10 @@ def main():
     # Create queues for TTS and audio
     chunk_queue = Queue()
     audio_queue = Queue()
-    tts_worker_thread = Thread(target=tts_worker, args=(chunk_queue, audio_queue, USE_LOCAL_AUDIO, VOICE_NAME))
+    tts_worker_thread = Thread(target=tts_worker, args=(chunk_queue, audio_queue, USE_LOCAL_AUDIO, VOICE_NAME), kwargs={"stream_blendshapes": STREAM_BLENDSHAPES})
     tts_worker_thread.start()
-    audio_worker_thread = Thread(target=audio_face_queue_worker, args=(audio_queue, py_face, socket_connection, default_animation_thread))
+    Thread(target=warm_tts_cache, args=(USE_LOCAL_AUDIO, VOICE_NAME), daemon=True).start()
+    audio_worker_thread = Thread(target=audio_face_queue_worker, args=(audio_queue, py_face, socket_connection, default_animation_thread), kwargs={"stream_blendshapes": STREAM_BLENDSHAPES})
     audio_worker_thread.start()
     
     # --- Start Twitch Chat Worker Threads ---
@@ -100,8 +102,7 @@ def main():
             with llm_lock:
                 flush_queue(chunk_queue)
                 flush_queue(audio_queue)
-                if pygame.mixer.get_init():
-                    pygame.mixer.stop()
+                stop_audio()
 
                 messages = []
                 
@@ -123,7 +124,7 @@ def main():
         audio_worker_thread.join()
         stop_default_animation.set()
         default_animation_thread.join()
-        pygame.quit()
+        quit_audio()
         socket_connection.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,250 @@
+"""
+audio_buffer.py
+-----------------
+AudioBuffer: one utterance's audio as samples plus format, handed from TTS or recording to
+NeuroSync, playback and persistence instead of bytes that every stage unwraps and rewraps.
+
+A buffer made from WAV bytes views the samples inside those bytes without copying them, and
+keeps the bytes, so stages that need a file (the NeuroSync upload, pygame, speech APIs) get the
+original back without re-encoding. Compressed audio (MP3 from ElevenLabs) is only decoded if
+a stage actually needs the samples. Use to_audio_bytes() at the edges that need bytes.
+"""
+
+import io
+import struct
+
+import numpy as np
+
+RAW_PCM_SAMPLE_RATE = 22050  # Assumed for headerless 16-bit PCM.
+WAV_FORMAT_PCM = 1
+WAV_FORMAT_FLOAT = 3
+WAV_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def parse_wav_header(data):
+    """
+    Returns (format_tag, channels, sample_rate, bits_per_sample, data_offset, data_size) for
+    RIFF/WAVE bytes, or None if they are not a WAV file. data_size is clamped to the bytes
+    present, so streamed WAVs with a placeholder size still parse.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    position = 12
+    fmt = None
+    while position + 8 <= len(data):
+        chunk_id = bytes(data[position:position + 4])
+        size = struct.unpack_from("<I", data, position + 4)[0]
+        body = position + 8
+        if chunk_id == b"fmt " and size >= 16:
+            format_tag, channels, sample_rate = struct.unpack_from("<HHI", data, body)
+            bits = struct.unpack_from("<H", data, body + 14)[0]
+            if format_tag == WAV_FORMAT_EXTENSIBLE and size >= 26:
+                format_tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (format_tag, channels, sample_rate, bits)
+        elif chunk_id == b"data" and fmt is not None:
+            return fmt + (body, min(size, len(data) - body))
+        position = body + size + (size & 1)
+    return None
+
+
+# MPEG audio frame header tables, indexed [version][layer] and [version] (version 0 is MPEG-1,
+# 1 is MPEG-2 and MPEG-2.5; layer 0 is Layer I).
+_MPEG_BITRATES_KBPS = (
+    ((0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+     (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+     (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)),
+    ((0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+     (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+     (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)),
+)
+_MPEG_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mpeg_frame_length(data, offset: int = 0):
+    """
+    Length in bytes of the MPEG audio frame whose header starts at offset, or None if there is
+    no valid header there (11-bit frame sync, a defined version and layer, a bitrate other than
+    free or bad, a defined sample rate).
+    """
+    if len(data) < offset + 4:
+        return None
+    b0, b1, b2 = data[offset], data[offset + 1], data[offset + 2]
+    if b0 != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+    version_bits, layer_bits = (b1 >> 3) & 3, (b1 >> 1) & 3
+    bitrate_index, rate_index, padding = b2 >> 4, (b2 >> 2) & 3, (b2 >> 1) & 1
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    layer = 3 - layer_bits  # 0 is Layer I.
+    mpeg1 = version_bits == 3
+    bitrate = _MPEG_BITRATES_KBPS[0 if mpeg1 else 1][layer][bitrate_index] * 1000
+    sample_rate = _MPEG_SAMPLE_RATES[version_bits][rate_index]
+    if layer == 0:
+        return (12 * bitrate // sample_rate + padding) * 4
+    samples_per_slot = 144 if mpeg1 or layer == 1 else 72
+    return samples_per_slot * bitrate // sample_rate + padding
+
+
+def _looks_compressed(data) -> bool:
+    """
+    True for containers soundfile decodes: ID3-tagged or bare MPEG audio, FLAC, Ogg and WAV.
+    Bare MPEG needs a valid frame header, followed by a second one when the data is long enough
+    to hold it, so headerless PCM that merely starts with 0xFF bytes (a sample of -1) is not
+    mistaken for it. Build buffers of known PCM with AudioBuffer.from_pcm instead.
+    """
+    if data[:3] == b"ID3" or data[:4] in (b"fLaC", b"OggS", b"RIFF"):
+        return True
+    length = _mpeg_frame_length(data)
+    if length is None:
+        return False
+    return len(data) < length + 4 or _mpeg_frame_length(data, length) is not None
+
+
+class AudioBuffer:
+    """
+    samples is a (frames, channels) int16 or float32 array; encoded holds the bytes the
+    buffer was made from, if any. Buffers are treated as immutable: operations that change the
+    audio (mono, resample) return a new buffer.
+    """
+
+    def __init__(self, samples=None, sample_rate: int = None, encoded=None) -> None:
+        if samples is not None:
+            samples = np.asarray(samples)
+            if samples.ndim == 1:
+                samples = samples[:, None]
+        self._samples = samples
+        self._sample_rate = sample_rate
+        self.encoded = encoded
+        self._wav_bytes = None
+
+    # -------------------- Construction --------------------
+    @classmethod
+    def from_bytes(cls, audio_bytes, default_sample_rate: int = RAW_PCM_SAMPLE_RATE) -> "AudioBuffer":
+        """
+        Wraps audio bytes: 16-bit or float WAV is viewed in place, other containers are decoded
+        with soundfile when the samples are first needed, and bytes without a header are taken
+        as 16-bit mono PCM at default_sample_rate.
+        """
+        if isinstance(audio_bytes, AudioBuffer):
+            return audio_bytes
+        audio_bytes = bytes(audio_bytes)
+        header = parse_wav_header(audio_bytes)
+        if header is not None:
+            format_tag, channels, sample_rate, bits, offset, size = header
+            dtype = {(WAV_FORMAT_PCM, 16): "<i2", (WAV_FORMAT_FLOAT, 32): "<f4"}.get((format_tag, bits))
+            if dtype is not None and channels > 0:
+                frame_bytes = channels * bits // 8
+                samples = np.frombuffer(audio_bytes, dtype=dtype, count=size // frame_bytes * channels, offset=offset)
+                return cls(samples.reshape(-1, channels), sample_rate, audio_bytes)
+        if _looks_compressed(audio_bytes):
+            return cls(None, None, audio_bytes)
+        return cls.from_pcm(audio_bytes, default_sample_rate)
+
+    @classmethod
+    def from_pcm(cls, pcm, sample_rate: int, channels: int = 1) -> "AudioBuffer":
+        """
+        Views 16-bit little-endian PCM bytes (e.g. straight from a microphone) without copying.
+        """
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // (2 * channels) * channels)
+        return cls(samples.reshape(-1, channels), sample_rate)
+
+    # -------------------- Format --------------------
+    @property
+    def samples(self) -> np.ndarray:
+        if self._samples is None:
+            import soundfile as sf
+            samples, self._sample_rate = sf.read(io.BytesIO(self.encoded), dtype="float32", always_2d=True)
+            self._samples = samples
+        return self._samples
+
+    @property
+    def sample_rate(self) -> int:
+        if self._sample_rate is None:
+            self.samples  # Decoding sets it.
+        return self._sample_rate
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    @property
+    def frames(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    @property
+    def decoded(self) -> bool:
+        """
+        False while compressed audio has not been decoded yet.
+        """
+        return self._samples is not None
+
+    @property
+    def is_pcm16(self) -> bool:
+        return self.samples.dtype == np.int16
+
+    def as_float32(self) -> np.ndarray:
+        samples = self.samples
+        if samples.dtype == np.float32:
+            return samples
+        return samples.astype(np.float32) / 32768.0
+
+    def as_int16(self) -> np.ndarray:
+        samples = self.samples
+        if samples.dtype == np.int16:
+            return samples
+        return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+
+    def mono(self) -> "AudioBuffer":
+        if self.channels == 1:
+            return self
+        return AudioBuffer(self.as_float32().mean(axis=1, dtype=np.float32), self.sample_rate)
+
+    def resample(self, sample_rate: int) -> "AudioBuffer":
+        if sample_rate == self.sample_rate:
+            return self
+        from utils.audio.resampler import resample
+        return AudioBuffer(resample(self.as_float32(), self.sample_rate, sample_rate), sample_rate)
+
+    # -------------------- Edges --------------------
+    def to_bytes(self) -> bytes:
+        """
+        The encoded bytes this buffer came from, or a 16-bit WAV encoding of it.
+        """
+        return self.encoded if self.encoded is not None else self.to_wav_bytes()
+
+    def to_wav_bytes(self) -> bytes:
+        if self._wav_bytes is None:
+            if self.encoded is not None and self.encoded[:4] == b"RIFF" and self.is_pcm16:
+                self._wav_bytes = self.encoded
+            else:
+                pcm = self.as_int16()
+                self._wav_bytes = wav_header(len(pcm), self.sample_rate, pcm.shape[1]) + pcm.tobytes()
+        return self._wav_bytes
+
+    def write_wav(self, path: str) -> None:
+        """
+        Writes the buffer as a 16-bit PCM WAV file, straight from the samples.
+        """
+        pcm = np.ascontiguousarray(self.as_int16())
+        with open(path, "wb") as f:
+            f.write(wav_header(len(pcm), self.sample_rate, pcm.shape[1]))
+            f.write(memoryview(pcm).cast("B"))
+
+
+def wav_header(frames: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    data_size = frames * channels * sample_width
+    return struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + data_size, b"WAVE", b"fmt ", 16, WAV_FORMAT_PCM,
+                       channels, sample_rate, sample_rate * channels * sample_width, channels * sample_width,
+                       sample_width * 8, b"data", data_size)
+
+
+def to_audio_bytes(audio):
+    """
+    Bytes for an edge that needs a file: an AudioBuffer's encoded bytes (or WAV), or audio
+    that already is bytes, unchanged.
+    """
+    return audio.to_bytes() if isinstance(audio, AudioBuffer) else audio
@@ -0,0 +1,492 @@
+"""
+audio_stream.py
+-----------------
+Continuous audio output. Chunks of speech are decoded, converted to the stream's sample rate
+and appended to a ring buffer of float32 PCM that a single output stream drains block by
+block, so each chunk starts on the exact sample the previous one ends (optionally with a
+short crossfade) instead of after a reload of the decoder.
+
+Every sample has a position on one timeline: the number of frames handed to the sink since
+the stream started, silence included. append() returns a ScheduledChunk holding its start
+and end on that timeline, which is what the frame sender uses to know when, and at which
+frame, the chunk's animation should be.
+"""
+
+import time
+from collections import deque
+from threading import Condition, Event, Lock, Thread
+
+import numpy as np
+
+from utils.audio.audio_buffer import AudioBuffer, RAW_PCM_SAMPLE_RATE
+from utils.audio.resampler import resample
+from utils.resources import register_resource, get_resource, is_loaded, release_resource
+
+OUTPUT_SAMPLE_RATE = 44100
+BLOCK_FRAMES = 512  # About 12 ms at 44.1 kHz.
+BUFFER_SECONDS = 30.0
+
+
+# --- Decoding ---
+
+def decode_audio(audio_bytes, default_sample_rate=RAW_PCM_SAMPLE_RATE):
+    """
+    Decodes audio bytes to (float32 samples shaped (frames, channels), sample_rate); see
+    AudioBuffer.from_bytes for the formats understood.
+    """
+    buffer = AudioBuffer.from_bytes(audio_bytes, default_sample_rate)
+    return buffer.as_float32(), buffer.sample_rate
+
+
+def convert_samples(samples, sample_rate: int, target_rate: int, target_channels: int) -> np.ndarray:
+    """
+    Converts (frames, channels) float32 samples to target_channels (downmix by averaging, or
+    duplicating mono) and to target_rate with the shared polyphase resampler.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if samples.shape[1] != target_channels:
+        mono = samples.mean(axis=1, keepdims=True)
+        samples = np.repeat(mono, target_channels, axis=1)
+    if sample_rate != target_rate and len(samples) > 0:
+        samples = resample(samples, sample_rate, target_rate)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+# --- Ring buffer ---
+
+class PCMRingBuffer:
+    """
+    Fixed-capacity ring of float32 (frames, channels) samples. Positions are absolute frame
+    counts since creation, so they never wrap. Not locked itself; AudioOutputStream holds
+    its condition around every call.
+    """
+
+    def __init__(self, capacity_frames: int, channels: int = 1) -> None:
+        self.capacity = capacity_frames
+        self._data = np.zeros((capacity_frames, channels), dtype=np.float32)
+        self.read_position = 0
+        self.write_position = 0
+
+    @property
+    def available(self) -> int:
+        return self.write_position - self.read_position
+
+    @property
+    def space(self) -> int:
+        return self.capacity - self.available
+
+    def write(self, samples) -> int:
+        """
+        Appends as many frames as fit and returns how many were written.
+        """
+        count = min(len(samples), self.space)
+        self._copy_in(self.write_position, samples[:count])
+        self.write_position += count
+        return count
+
+    def read_into(self, out) -> int:
+        """
+        Moves up to len(out) frames into out and returns how many were there.
+        """
+        count = min(len(out), self.available)
+        start = self.read_position % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        out[first:count] = self._data[:count - first]
+        self.read_position += count
+        return count
+
+    def peek(self, position: int, count: int) -> np.ndarray:
+        indices = np.arange(position, position + count) % self.capacity
+        return self._data[indices]
+
+    def overwrite(self, position: int, samples) -> None:
+        """
+        Replaces unread frames from absolute position onwards (used for crossfades).
+        """
+        self._copy_in(position, samples)
+
+    def clear(self) -> None:
+        self.read_position = self.write_position
+
+    def _copy_in(self, position: int, samples) -> None:
+        start = position % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+
+
+# --- Timeline ---
+
+class ScheduledChunk:
+    """
+    A chunk's place on the stream timeline: [start_frame, end_frame) in output frames.
+    """
+
+    def __init__(self, stream, start_frame: int, end_frame: int) -> None:
+        self.stream = stream
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.cancelled = False
+
+    @property
+    def duration(self) -> float:
+        return (self.end_frame - self.start_frame) / self.stream.sample_rate
+
+    @property
+    def started(self) -> bool:
+        """
+        True once the block holding the first sample has gone to the sink.
+        """
+        return self.stream.output_frames > self.start_frame
+
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or self.stream.output_frames >= self.end_frame
+
+    def position(self):
+        """
+        Seconds of this chunk heard so far (see AudioOutputStream.played_frames), or None
+        before it is heard. Usable as the audio_clock of a FramePacer.
+        """
+        played = self.stream.played_frames() - self.start_frame
+        if played < 0 or self.cancelled:
+            return None
+        return min(played, self.end_frame - self.start_frame) / self.stream.sample_rate
+
+    def frame_index(self, fps: int = 60) -> int:
+        """
+        The animation frame that goes with the audio being heard now (-1 before the start).
+        """
+        position = self.position()
+        return -1 if position is None else int(position * fps)
+
+    def start_time_ns(self) -> int:
+        """
+        perf_counter_ns() at which the first sample is heard; valid once started.
+        """
+        return self.stream.time_of_frame_ns(self.start_frame) + int(self.stream.output_latency * 1_000_000_000)
+
+    def wait_started(self, timeout=None) -> bool:
+        return self.stream.wait_for(lambda: self.started or self.cancelled, timeout) and not self.cancelled
+
+    def wait_finished(self, timeout=None) -> bool:
+        return self.stream.wait_for(lambda: self.finished, timeout)
+
+
+class ChunkSequence:
+    """
+    The ScheduledChunks of one utterance appended piece by piece as it arrives (e.g. while it
+    is still being synthesized). position() counts only this utterance's audio heard, so it
+    holds still while the next piece is late instead of counting the silence. It returns None
+    before the first piece is heard, once a piece was cancelled, and once close() was called
+    and the last piece has been heard, which ends a clock that follows it.
+    """
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.chunks = []
+        self.closed = False
+        self._heard_chunks = 0  # Leading chunks heard in full, and their frames.
+        self._heard_frames = 0
+
+    def add(self, chunk: ScheduledChunk) -> None:
+        self.chunks.append(chunk)
+
+    def close(self) -> None:
+        self.closed = True
+
+    def position(self):
+        chunks = self.chunks
+        if not chunks or chunks[-1].cancelled:
+            return None
+        played = self.stream.played_frames()
+        if played < chunks[0].start_frame:
+            return None
+        if self.closed and played >= chunks[-1].end_frame:
+            return None
+        while self._heard_chunks < len(chunks) - 1 and played >= chunks[self._heard_chunks].end_frame:
+            chunk = chunks[self._heard_chunks]
+            self._heard_frames += chunk.end_frame - chunk.start_frame
+            self._heard_chunks += 1
+        heard = self._heard_frames
+        for chunk in chunks[self._heard_chunks:]:
+            heard += min(max(played - chunk.start_frame, 0), chunk.end_frame - chunk.start_frame)
+        return heard / self.stream.sample_rate
+
+    def wait_finished(self, timeout=None) -> bool:
+        """
+        Waits until the last piece added so far has played (or was cancelled).
+        """
+        return not self.chunks or self.chunks[-1].wait_finished(timeout)
+
+
+class AudioOutputStream:
+    """
+    One continuous output fed from a PCMRingBuffer. The sink calls render() for each block it
+    needs; when the buffer runs dry it gets silence and the timeline keeps moving, so a chunk
+    appended after a pause starts at the next block. With crossfade_ms, a chunk appended while
+    the previous one's last crossfade_ms are still unplayed overlaps them with a linear fade.
+    """
+
+    def __init__(self, sink=None, sample_rate: int = OUTPUT_SAMPLE_RATE, channels: int = 1,
+                 crossfade_ms: float = 0.0, buffer_seconds: float = BUFFER_SECONDS) -> None:
+        self.sink = sink if sink is not None else PyAudioSink()
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.crossfade_frames = int(sample_rate * crossfade_ms / 1000.0)
+
+        self._ring = PCMRingBuffer(int(sample_rate * buffer_seconds), channels)
+        self._condition = Condition()
+        self._append_lock = Lock()
+        self._pending = deque()  # Chunks not yet finished, oldest first.
+        self.output_frames = 0  # Timeline position of the next frame handed to the sink.
+        self._last_render = (0, time.perf_counter_ns())  # (frame, time) at the last render() call.
+
+        self.chunks_appended = 0
+        self.silent_frames = 0
+        self.running = False
+
+    # -------------------- Control --------------------
+    def start(self) -> "AudioOutputStream":
+        if not self.running:
+            self.running = True
+            self.sink.start(self.render, self.sample_rate, self.channels)
+        return self
+
+    def close(self) -> None:
+        if self.running:
+            self.running = False
+            self.sink.stop()
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Drops everything not yet played; chunks that had not finished are cancelled.
+        """
+        with self._condition:
+            self._ring.clear()
+            for chunk in self._pending:
+                chunk.cancelled = True
+            self._pending.clear()
+            self._condition.notify_all()
+
+    # -------------------- Input --------------------
+    def append(self, audio, sample_rate: int = None, crossfade: bool = True) -> ScheduledChunk:
+        """
+        Schedules audio (an AudioBuffer, encoded bytes, or float samples at sample_rate) right
+        after everything already queued and returns its ScheduledChunk. Blocks while the ring
+        buffer is full. Pass crossfade=False for audio that continues the previous chunk.
+        """
+        if isinstance(audio, AudioBuffer):
+            audio, sample_rate = audio.as_float32(), audio.sample_rate
+        elif isinstance(audio, (bytes, bytearray, memoryview)):
+            audio, sample_rate = decode_audio(bytes(audio))
+        samples = convert_samples(audio, sample_rate or self.sample_rate, self.sample_rate, self.channels)
+
+        with self._append_lock, self._condition:
+            overlap = 0
+            if crossfade and self.crossfade_frames and self._ring.available >= self.crossfade_frames:
+                overlap = min(self.crossfade_frames, len(samples))
+            start = self.output_frames + self._ring.available - overlap
+            if overlap:
+                self._ring.overwrite(self._ring.write_position - overlap, self._crossfade(samples[:overlap]))
+            chunk = ScheduledChunk(self, start, start + len(samples))
+            self._pending.append(chunk)
+            self.chunks_appended += 1
+
+            written = overlap
+            while written < len(samples):
+                if chunk.cancelled:
+                    break
+                count = self._ring.write(samples[written:])
+                written += count
+                if count == 0:
+                    self._condition.wait(0.1)
+        return chunk
+
+    def _crossfade(self, incoming) -> np.ndarray:
+        fade_in = np.linspace(0.0, 1.0, len(incoming) + 2, dtype=np.float32)[1:-1, None]
+        outgoing = self._ring.peek(self._ring.write_position - len(incoming), len(incoming))
+        return outgoing * (1.0 - fade_in) + incoming * fade_in
+
+    # -------------------- Output --------------------
+    def render(self, frames: int) -> np.ndarray:
+        """
+        Called by the sink for the next frames of output: buffered audio, then silence.
+        """
+        out = np.zeros((frames, self.channels), dtype=np.float32)
+        now = time.perf_counter_ns()
+        with self._condition:
+            count = self._ring.read_into(out)
+            self.silent_frames += frames - count
+            self._last_render = (self.output_frames, now)
+            self.output_frames += frames
+            while self._pending and self._pending[0].end_frame <= self.output_frames:
+                self._pending.popleft()
+            self._condition.notify_all()
+        return out
+
+    # -------------------- Timeline --------------------
+    @property
+    def position(self) -> float:
+        """
+        Seconds of output handed to the sink since the stream started.
+        """
+        return self.output_frames / self.sample_rate
+
+    @property
+    def output_latency(self) -> float:
+        """
+        Seconds from a block being handed to the sink until it is heard, as the device reports it.
+        """
+        return self.sink.latency
+
+    def played_frames(self) -> int:
+        """
+        Timeline position being heard now: the frames handed to the sink, interpolated within
+        the last block, less the device's output latency.
+        """
+        handed = min(self.frame_at_time_ns(time.perf_counter_ns()), self.output_frames)
+        return handed - int(self.output_latency * self.sample_rate)
+
+    @property
+    def buffered_seconds(self) -> float:
+        return self._ring.available / self.sample_rate
+
+    def time_of_frame_ns(self, frame: int) -> int:
+        last_frame, last_time_ns = self._last_render
+        return last_time_ns + (frame - last_frame) * 1_000_000_000 // self.sample_rate
+
+    def frame_at_time_ns(self, time_ns: int) -> int:
+        last_frame, last_time_ns = self._last_render
+        return last_frame + (time_ns - last_time_ns) * self.sample_rate // 1_000_000_000
+
+    def wait_for(self, predicate, timeout=None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(predicate, timeout)
+
+    def summary(self) -> str:
+        return (f"Audio stream: {self.chunks_appended} chunks, {self.position:.1f} s output, "
+                f"{self.silent_frames / self.sample_rate:.1f} s silence")
+
+
+# --- Sinks ---
+
+class NullAudioSink:
+    """
+    A sink without a device, for headless runs and tests. With realtime it pulls blocks on a
+    thread at the rate a sound card would; otherwise nothing plays until pump() is called.
+    Rendered audio is kept in self.blocks when keep_output is set.
+    """
+
+    latency = 0.0
+
+    def __init__(self, realtime: bool = True, block_frames: int = BLOCK_FRAMES, keep_output: bool = False) -> None:
+        self.realtime = realtime
+        self.block_frames = block_frames
+        self.keep_output = keep_output
+        self.blocks = []
+        self._render = None
+        self._sample_rate = OUTPUT_SAMPLE_RATE
+        self._stop = Event()
+        self._thread = None
+
+    def start(self, render, sample_rate: int, channels: int) -> None:
+        self._render = render
+        self._sample_rate = sample_rate
+        self._stop.clear()
+        if self.realtime:
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def pump(self, frames: int) -> np.ndarray:
+        """
+        Renders frames of output immediately, in blocks.
+        """
+        rendered = []
+        while frames > 0:
+            block = self._render(min(frames, self.block_frames))
+            if self.keep_output:
+                self.blocks.append(block)
+            rendered.append(block)
+            frames -= len(block)
+        return np.concatenate(rendered) if rendered else np.zeros((0, 1), dtype=np.float32)
+
+    def output(self) -> np.ndarray:
+        return np.concatenate(self.blocks) if self.blocks else np.zeros((0, 1), dtype=np.float32)
+
+    def _run(self) -> None:
+        block_ns = self.block_frames * 1_000_000_000 // self._sample_rate
+        next_ns = time.perf_counter_ns()
+        while not self._stop.is_set():
+            self.pump(self.block_frames)
+            next_ns += block_ns
+            delay = next_ns - time.perf_counter_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class PyAudioSink:
+    """
+    Plays the stream on the default output device through a PyAudio callback stream.
+    """
+
+    def __init__(self, block_frames: int = BLOCK_FRAMES) -> None:
+        self.block_frames = block_frames
+        self.latency = 0.0
+        self._pyaudio = None
+        self._stream = None
+
+    def start(self, render, sample_rate: int, channels: int) -> None:
+        import pyaudio
+
+        def callback(in_data, frame_count, time_info, status):
+            samples = render(frame_count)
+            pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+            return pcm.tobytes(), pyaudio.paContinue
+
+        self._pyaudio = pyaudio.PyAudio()
+        self._stream = self._pyaudio.open(format=pyaudio.paInt16, channels=channels, rate=sample_rate,
+                                          output=True, frames_per_buffer=self.block_frames,
+                                          stream_callback=callback)
+        self.latency = self._stream.get_output_latency()
+        self._stream.start_stream()
+
+    def stop(self) -> None:
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+
+
+# The device stream is opened the first time gapless playback is used.
+register_resource("audio_stream", lambda: AudioOutputStream().start())
+
+def get_audio_stream() -> AudioOutputStream:
+    return get_resource("audio_stream")
+
+
+def stop_audio_stream() -> None:
+    """
+    Drops whatever the stream still has queued. Does nothing if it was never opened.
+    """
+    if is_loaded("audio_stream"):
+        get_audio_stream().clear()
+
+
+def close_audio_stream() -> None:
+    if is_loaded("audio_stream"):
+        get_audio_stream().close()
+        release_resource("audio_stream")
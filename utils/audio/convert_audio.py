@@ -3,15 +3,15 @@ convert_audio.py
 ----------------
 This module provides functions to convert and validate audio data.
 It handles raw PCM wrapping, file conversion to WAV, and safe conversions
-using pydub. 
+using pydub and the shared resampler.
 """
 
 import io
 import wave
 import numpy as np
-from pydub import AudioSegment
 import soundfile as sf
-from scipy.io.wavfile import write
+
+from utils.audio.audio_buffer import AudioBuffer
 
 # import magic  
 
@@ -54,6 +54,7 @@ def convert_to_wav(audio_path, output_path=None):
     If output_path is provided, the WAV file is written there.
     Otherwise, the input file is overwritten.
     """
+    from scipy.io.wavfile import write
     data, samplerate = sf.read(audio_path)
     # Ensure data is in 16-bit PCM format
     data_int16 = (data * 32767).astype(np.int16)
@@ -79,16 +80,16 @@ def bytes_to_wav(audio_bytes, sample_rate, channels, sample_width):
 
 def safely_convert_audio(audio_bytes, input_format, target_sample_rate=88200):
     """
-    Safely convert audio using pydub, changing its frame rate if needed.
-    Returns WAV bytes on success or None on failure.
+    Safely convert audio: pydub decodes it, and its frame rate is changed if needed with the
+    shared polyphase resampler. Returns WAV bytes on success or None on failure.
     """
     try:
+        from pydub import AudioSegment  # pydub is slow to import and only needed here
         with io.BytesIO(audio_bytes) as input_buffer:
             audio = AudioSegment.from_file(input_buffer, format=input_format)
-            audio = audio.set_frame_rate(target_sample_rate)
             wav_io = io.BytesIO()
             audio.export(wav_io, format="wav")
-            return wav_io.getvalue()
+        return AudioBuffer.from_bytes(wav_io.getvalue()).resample(target_sample_rate).to_wav_bytes()
     except Exception as e:
         print(f"Audio conversion error: {e}")
         return None
@@ -7,45 +7,133 @@ It also supports audio conversion on the fly (e.g. raw PCM to WAV) where needed.
 """
 
 import io
-import time
-import pygame
+import wave
+from threading import Condition
+from utils.audio.audio_buffer import AudioBuffer, to_audio_bytes
 from utils.audio.convert_audio import pcm_to_wav, convert_to_wav
+from utils.resources import register_resource, get_resource, is_loaded
+
+
+def _import_pygame():
+    import pygame
+    return pygame
+
+# pygame is imported the first time audio is played, not when this module is imported.
+register_resource("pygame", _import_pygame)
 
 # --- Helper Functions ---
 
+def get_pygame():
+    return get_resource("pygame")
+
+
 def init_pygame_mixer():
     """
     Initialize the Pygame mixer only once.
     """
+    pygame = get_pygame()
     if not pygame.mixer.get_init():
         pygame.mixer.init()
 
 
-def sync_playback_loop():
+# Incremented by every stop_audio(), so queued work from before an interruption can tell it is stale.
+_stop_count = 0
+_stop_condition = Condition()  # Notified by stop_audio(), to wake wait_for_playback_end().
+
+END_POLL_SECONDS = 0.002  # How often the end of playback is checked for once it is close.
+END_MARGIN_SECONDS = 0.05  # How long before the expected end to start checking.
+
+
+def get_stop_count():
+    return _stop_count
+
+
+def stop_audio():
+    """
+    Stops everything the mixer is playing. Does nothing if audio was never used.
+    """
+    global _stop_count
+    with _stop_condition:
+        _stop_count += 1
+        _stop_condition.notify_all()
+    if is_loaded("audio_stream"):
+        get_resource("audio_stream").clear()
+    if is_loaded("pygame"):
+        pygame = get_pygame()
+        if pygame.mixer.get_init():
+            pygame.mixer.stop()
+
+
+def quit_audio():
+    """
+    Shuts pygame and the gapless audio stream down on exit. Does nothing if audio was never used.
+    """
+    if is_loaded("audio_stream"):
+        from utils.audio.audio_stream import close_audio_stream
+        close_audio_stream()
+    if is_loaded("pygame"):
+        get_pygame().quit()
+
+
+def get_playback_position():
     """
-    A playback loop that synchronizes elapsed time with the music position.
+    Seconds of the current music stream played so far, or None when nothing is playing.
+    Used as the audio clock when pacing animation frames.
     """
-    start_time = time.perf_counter()
-    clock = pygame.time.Clock()
-    while pygame.mixer.music.get_busy():
-        elapsed_time = time.perf_counter() - start_time
-        current_pos = pygame.mixer.music.get_pos() / 1000.0  # convert ms to sec
+    if not is_loaded("pygame"):
+        return None
+    pygame = get_pygame()
+    if not pygame.mixer.get_init():
+        return None
+    position_ms = pygame.mixer.music.get_pos()
+    return position_ms / 1000.0 if position_ms >= 0 else None
 
-        # If behind, sleep briefly; if ahead, let it catch up.
-        if elapsed_time > current_pos:
-            time.sleep(0.01)
-        elif elapsed_time < current_pos:
-            continue
-        clock.tick(10)
+
+def audio_duration(audio_source):
+    """
+    Length in seconds of audio given as bytes, an AudioBuffer, a file-like object or a path,
+    or None if it cannot be read without decoding (e.g. some MP3s).
+    """
+    if isinstance(audio_source, AudioBuffer):
+        if audio_source.decoded:
+            return audio_source.duration
+        audio_source = audio_source.encoded
+    if isinstance(audio_source, (bytes, bytearray)):
+        audio_source = io.BytesIO(audio_source)
+    try:
+        try:
+            with wave.open(audio_source, "rb") as wav_file:
+                return wav_file.getnframes() / wav_file.getframerate()
+        except (wave.Error, EOFError):
+            if hasattr(audio_source, "seek"):
+                audio_source.seek(0)
+            import soundfile as sf
+            return sf.info(audio_source).duration
+    except Exception:
+        return None
+    finally:
+        if hasattr(audio_source, "seek"):
+            audio_source.seek(0)
 
 
-def simple_playback_loop():
+def wait_for_playback_end(duration=None, music=None):
     """
-    A simple playback loop that just ticks the clock until playback finishes.
+    Blocks until the music stream stops, without spinning: sleeps until END_MARGIN_SECONDS before
+    the expected end (when duration is known), then checks every END_POLL_SECONDS, so the end is
+    noticed within a few milliseconds. stop_audio() wakes it immediately.
     """
-    clock = pygame.time.Clock()
-    while pygame.mixer.music.get_busy():
-        clock.tick(10)
+    music = music if music is not None else get_pygame().mixer.music
+    stop_count = _stop_count
+    while music.get_busy():
+        delay = END_POLL_SECONDS
+        if duration is not None:
+            position_ms = music.get_pos()
+            if position_ms >= 0:
+                delay = max(delay, duration - position_ms / 1000.0 - END_MARGIN_SECONDS)
+        with _stop_condition:
+            if _stop_count != stop_count:
+                return
+            _stop_condition.wait(delay)
 
 
 # --- Playback Functions ---
@@ -55,20 +143,19 @@ def play_audio_bytes(audio_bytes, start_event, sync=True):
     Play audio from raw bytes.
     
     Parameters:
-      - audio_bytes: audio data as bytes.
+      - audio_bytes: audio data as bytes or an AudioBuffer.
       - start_event: threading.Event to wait for before starting playback.
-      - sync: if True, uses time-syncing playback loop.
+      - sync: no longer changes anything; kept for existing callers.
     """
+    pygame = get_pygame()
     try:
         init_pygame_mixer()
-        audio_file = io.BytesIO(audio_bytes)
+        duration = audio_duration(audio_bytes)
+        audio_file = io.BytesIO(to_audio_bytes(audio_bytes))
         pygame.mixer.music.load(audio_file)
         start_event.wait()  # Wait for the signal to start
         pygame.mixer.music.play()
-        if sync:
-            sync_playback_loop()
-        else:
-            simple_playback_loop()
+        wait_for_playback_end(duration)
     except pygame.error as e:
         print(f"Error in play_audio_bytes: {e}")
 
@@ -80,36 +167,38 @@ def play_audio_from_memory_openai(audio_data, start_event, sync=True):
     If the audio data does not start with the WAV header ('RIFF'), assume
     it is raw PCM and convert it.
     """
+    pygame = get_pygame()
     try:
         init_pygame_mixer()
-        if not audio_data.startswith(b'RIFF'):
+        if isinstance(audio_data, AudioBuffer):
+            audio_file = io.BytesIO(audio_data.to_bytes())
+        elif not audio_data.startswith(b'RIFF'):
             # Convert raw PCM to WAV using default parameters.
             audio_file = pcm_to_wav(audio_data, sample_rate=22050, channels=1, sample_width=2)
         else:
             audio_file = io.BytesIO(audio_data)
+        duration = audio_duration(audio_file)
         pygame.mixer.music.load(audio_file)
         start_event.wait()
         pygame.mixer.music.play()
-        if sync:
-            sync_playback_loop()
-        else:
-            simple_playback_loop()
+        wait_for_playback_end(duration)
     except pygame.error as e:
         print(f"Error in play_audio_from_memory_openai: {e}")
 
 
 def play_audio_from_memory(audio_data, start_event, sync=False):
     """
-    Play audio from memory (assumes valid WAV bytes).
-    Uses a simple playback loop.
+    Play audio from memory (valid WAV bytes, or an AudioBuffer).
     """
+    pygame = get_pygame()
     try:
         init_pygame_mixer()
-        audio_file = io.BytesIO(audio_data)
+        duration = audio_duration(audio_data)
+        audio_file = io.BytesIO(to_audio_bytes(audio_data))
         pygame.mixer.music.load(audio_file)
         start_event.wait()
         pygame.mixer.music.play()
-        simple_playback_loop()
+        wait_for_playback_end(duration)
     except pygame.error as e:
         if "Unknown WAVE format" in str(e):
             print("Unknown WAVE format encountered. Skipping to the next item in the queue.")
@@ -124,6 +213,7 @@ def play_audio_from_path(audio_path, start_event, sync=True):
     Play audio from a file path. If the format is unsupported,
     automatically convert it to WAV.
     """
+    pygame = get_pygame()
     try:
         init_pygame_mixer()
         try:
@@ -134,10 +224,7 @@ def play_audio_from_path(audio_path, start_event, sync=True):
             pygame.mixer.music.load(audio_path)
         start_event.wait()
         pygame.mixer.music.play()
-        if sync:
-            sync_playback_loop()
-        else:
-            simple_playback_loop()
+        wait_for_playback_end(audio_duration(audio_path))
     except pygame.error as e:
         print(f"Error in play_audio_from_path: {e}")
 
@@ -1,17 +1,33 @@
-import io
 import pyaudio
-import numpy as np
 import keyboard
-import soundfile as sf
+
+from utils.audio.audio_buffer import AudioBuffer
+from utils.audio.resampler import StreamingResampler
 
 # for the best results, record in 88200 | we overide this for the openai realtime api to the correct input.
 
-def record_audio_until_release(sr=88200):
-    """Record audio from the default microphone until the right Ctrl key is released."""
+def _input_rate(p, sr):
+    """sr if the default input device can record at it, otherwise the device's own rate."""
+    try:
+        p.is_format_supported(sr, input_device=p.get_default_input_device_info()["index"],
+                              input_channels=1, input_format=pyaudio.paInt16)
+        return sr
+    except (ValueError, IOError):
+        return int(p.get_default_input_device_info()["defaultSampleRate"])
+
+
+def record_audio_buffer_until_release(sr=88200):
+    """
+    Record audio from the default microphone until the right Ctrl key is released, as an AudioBuffer.
+    Microphones that cannot record at sr are recorded at their own rate and resampled block by block
+    while recording, so the buffer is ready as soon as the key is released.
+    """
     p = pyaudio.PyAudio()
+    device_sr = _input_rate(p, sr)
+    resampler = StreamingResampler(device_sr, sr) if device_sr != sr else None
     stream = p.open(format=pyaudio.paInt16,
                     channels=1,
-                    rate=sr,
+                    rate=device_sr,
                     input=True,
                     frames_per_buffer=1024)
 
@@ -21,7 +37,7 @@ def record_audio_until_release(sr=88200):
 
     while keyboard.is_pressed('right ctrl'):
         data = stream.read(1024)
-        frames.append(data)
+        frames.append(resampler.process_pcm(data) if resampler else data)
 
     print("Finished recording.")
 
@@ -29,11 +45,13 @@ def record_audio_until_release(sr=88200):
     stream.close()
     p.terminate()
 
-    audio_bytes = b''.join(frames)
- 
-    audio_file = io.BytesIO()
-    with sf.SoundFile(audio_file, mode='w', samplerate=sr, channels=1, format='WAV', subtype='PCM_16') as f:
-        f.write(np.frombuffer(audio_bytes, dtype=np.int16))
-    
-    audio_file.seek(0)  
-    return audio_file.read()
+    if resampler:
+        frames.append(resampler.flush_pcm())
+
+    # The samples are viewed in place; WAV bytes are only made if a stage needs them.
+    return AudioBuffer.from_pcm(b''.join(frames), sr)
+
+
+def record_audio_until_release(sr=88200):
+    """Record audio from the default microphone until the right Ctrl key is released, as WAV bytes."""
+    return record_audio_buffer_until_release(sr).to_wav_bytes()
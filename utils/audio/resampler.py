@@ -0,0 +1,207 @@
+"""
+resampler.py
+-----------------
+Polyphase resampling shared by everything that changes an audio rate: recording, TTS output
+for NeuroSync and playback, realtime PCM and saving to generated/.
+
+The anti-aliasing filter for a (source, target) rate pair is designed once and cached, so a
+conversion pays only for the filtering. resample() converts a whole clip and matches
+scipy.signal.resample_poly; StreamingResampler converts audio chunk by chunk, carrying the
+filter history across chunks, so the concatenated output equals resampling the whole stream
+at once, with no clicks at chunk boundaries.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+KAISER_BETA = 5.0  # The window scipy.signal.resample_poly designs with.
+FILTER_HALF_LENGTH = 10  # Filter half length, in multiples of max(up, down).
+
+
+class PolyphaseFilter:
+    """
+    The low-pass filter for one rate pair. Input is upsampled by up, filtered and decimated by
+    down; output sample m sits at upsampled position m * down + half_len, which centres the
+    filter on it.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int) -> None:
+        g = math.gcd(source_rate, target_rate)
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.up = target_rate // g
+        self.down = source_rate // g
+
+        max_rate = max(self.up, self.down)
+        self.half_len = FILTER_HALF_LENGTH * max_rate
+        n = np.arange(2 * self.half_len + 1) - self.half_len
+        window = np.kaiser(2 * self.half_len + 1, KAISER_BETA)
+        h = np.sinc(n / max_rate) * window
+        self.prototype = h / h.sum()  # Unit gain at DC, as scipy.signal.firwin scales it.
+
+        self.taps = np.asarray(self.prototype * self.up, dtype=np.float32)
+        self.taps_per_phase = -(-len(h) // self.up)
+
+    @property
+    def identity(self) -> bool:
+        return self.up == self.down
+
+    def output_frames(self, input_frames: int) -> int:
+        return -(-input_frames * self.up // self.down)
+
+
+@lru_cache(maxsize=None)
+def get_filter(source_rate: int, target_rate: int) -> PolyphaseFilter:
+    """
+    The cached filter for converting source_rate to target_rate.
+    """
+    return PolyphaseFilter(int(source_rate), int(target_rate))
+
+
+def _as_float_frames(samples) -> np.ndarray:
+    samples = np.asarray(samples)
+    if samples.dtype == np.int16:
+        samples = samples.astype(np.float32) / 32768.0
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    return np.asarray(samples, dtype=np.float32)
+
+
+def resample(samples, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resamples (frames, channels) or 1-D samples (float, or int16 scaled to [-1, 1]) and returns
+    float32 samples of the same shape at target_rate.
+    """
+    flat = np.ndim(samples) == 1
+    frames = _as_float_frames(samples)
+    f = get_filter(source_rate, target_rate)
+    if f.identity:
+        out = frames
+    else:
+        import scipy.signal  # For the polyphase filtering; imported on first use
+        out = scipy.signal.resample_poly(frames, f.up, f.down, axis=0, window=f.prototype).astype(np.float32)
+    return out[:, 0] if flat else out
+
+
+class StreamingResampler:
+    """
+    Resamples one continuous stream delivered in chunks. process() returns every output frame
+    the input so far determines; flush() pads the end with silence, returns the rest and makes
+    the resampler ready for a new stream. Output lags input by the filter's half length (about
+    0.5 ms at 22.05 kHz) until flush().
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, channels: int = 1) -> None:
+        self.filter = get_filter(source_rate, target_rate)
+        self.channels = channels
+        self.frames_in = 0
+        self.frames_out = 0
+        self.reset()
+
+    @property
+    def source_rate(self) -> int:
+        return self.filter.source_rate
+
+    @property
+    def target_rate(self) -> int:
+        return self.filter.target_rate
+
+    def reset(self) -> None:
+        """
+        Drops the carried-over history, for a new stream.
+        """
+        history = self.filter.taps_per_phase - 1
+        self._buffer = np.zeros((history, self.channels), dtype=np.float32)
+        self._buffer_start = -history  # Input index of _buffer[0]; earlier inputs are silence.
+        self._stream_in = 0
+        self._stream_out = 0
+
+    def process(self, samples) -> np.ndarray:
+        """
+        Takes the next chunk ((frames, channels) or 1-D, float or int16) and returns the
+        float32 (frames, channels) output it completes.
+        """
+        frames = _as_float_frames(samples)
+        if self.filter.identity:
+            self.frames_in += len(frames)
+            self.frames_out += len(frames)
+            return frames
+        self._buffer = np.concatenate((self._buffer, frames))
+        self._stream_in += len(frames)
+        self.frames_in += len(frames)
+        f = self.filter
+        # Output m needs inputs up to (m * down + half_len) // up.
+        ready = (self._stream_in * f.up - 1 - f.half_len) // f.down + 1
+        return self._emit(max(ready, self._stream_out))
+
+    def process_pcm(self, pcm) -> bytes:
+        """
+        process() for 16-bit little-endian PCM bytes in and out.
+        """
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // (2 * self.channels) * self.channels)
+        return to_pcm16(self.process(samples.reshape(-1, self.channels)))
+
+    def flush(self) -> np.ndarray:
+        """
+        Returns the output still held back and resets for a new stream.
+        """
+        if self.filter.identity:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        f = self.filter
+        total = f.output_frames(self._stream_in)
+        needed = ((total - 1) * f.down + f.half_len) // f.up + 1 if total > 0 else 0
+        padding = needed - (self._buffer_start + len(self._buffer))
+        if padding > 0:
+            self._buffer = np.concatenate((self._buffer, np.zeros((padding, self.channels), dtype=np.float32)))
+        out = self._emit(max(total, self._stream_out))
+        self.reset()
+        return out
+
+    def flush_pcm(self) -> bytes:
+        return to_pcm16(self.flush())
+
+    def _emit(self, stop: int) -> np.ndarray:
+        import scipy.signal  # For the polyphase filtering; imported on first use
+        f = self.filter
+        count = stop - self._stream_out
+        if count <= 0:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        # upfirdn keeps upsampled positions that are multiples of down, counted from the start of
+        # the buffer; delaying the filter by shift zeros makes the first wanted position one.
+        first = self._stream_out * f.down + f.half_len - self._buffer_start * f.up
+        shift = -first % f.down
+        taps = np.concatenate((np.zeros(shift, dtype=np.float32), f.taps))
+        offset = (first + shift) // f.down
+        out = scipy.signal.upfirdn(taps, self._buffer, f.up, f.down, axis=0)[offset:offset + count]
+        out = out.astype(np.float32, copy=False)
+        self._stream_out = stop
+        self.frames_out += len(out)
+
+        # Keep only the inputs the next output still reaches back to.
+        next_first = (stop * f.down + f.half_len) // f.up - (f.taps_per_phase - 1)
+        drop = min(next_first - self._buffer_start, len(self._buffer))
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+        return out
+
+
+def to_pcm16(samples) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def resample_pcm_chunks(chunks, source_rate: int, target_rate: int, channels: int = 1):
+    """
+    Yields the chunks of 16-bit PCM in chunks, a stream at source_rate, converted to
+    target_rate as each arrives, then the held-back tail.
+    """
+    resampler = StreamingResampler(source_rate, target_rate, channels)
+    for chunk in chunks:
+        out = resampler.process_pcm(chunk)
+        if out:
+            yield out
+    tail = resampler.flush_pcm()
+    if tail:
+        yield tail
@@ -5,18 +5,23 @@
 
 import os
 import time
-from threading import Thread, Event, Lock
+from threading import Thread, Event
 from queue import Queue
 
-from utils.generated_runners import run_audio_animation_from_bytes, run_audio_animation
-from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.generated_runners import run_audio_animation, prepare_clip, play_prepared_clip, GaplessClipPlayer, run_streaming_animation
 from utils.llm.realtime_queue_utils import playback_loop, accumulate_data
+from utils.llm.realtime_api_utils import RESPONSE_END
 from utils.files.file_utils import save_generated_data_from_wav
 from utils.neurosync.neurosync_api_connect import send_audio_to_neurosync
-from utils.audio.play_audio import read_audio_file_as_bytes
+from utils.audio.play_audio import read_audio_file_as_bytes, get_stop_count
 from utils.audio.convert_audio import bytes_to_wav
+from utils.audio.audio_buffer import AudioBuffer
+from utils.audio.resampler import StreamingResampler
+from utils.neurosync.neurosync_stream import STREAM_SAMPLE_RATE
+from livelink.animations.animation_emotion import EmotionOverlayTrack
+from livelink.animations.animation_loader import get_emotion_animations
 
-queue_lock = Lock()
+STREAM_PIECE_SECONDS = 0.1  # Audio per upload when streaming a TTS chunk to NeuroSync.
 
 def audio_face_queue_worker_realtime(audio_face_queue, py_face, socket_connection, default_animation_thread):
     """
@@ -25,7 +30,8 @@ def audio_face_queue_worker_realtime(audio_face_queue, py_face, socket_connectio
     """
     accumulated_audio = bytearray()
     accumulated_facial_data = []
-    encoded_facial_data = []
+    composed_frames = []
+    emotion_track = EmotionOverlayTrack(get_emotion_animations())
     stop_worker = Event()
     start_event = Event()
 
@@ -39,7 +45,7 @@ def audio_face_queue_worker_realtime(audio_face_queue, py_face, socket_connectio
             stop_worker,
             start_event,
             accumulated_audio,
-            encoded_facial_data,
+            composed_frames,
             audio_face_queue,
             py_face,
             socket_connection,
@@ -64,10 +70,10 @@ def audio_face_queue_worker_realtime(audio_face_queue, py_face, socket_connectio
 
         # Changed: Determine if this is the only entry by checking if the queue is empty.
         single_entry = audio_face_queue.empty()
-        accumulate_data(audio_bytes, facial_data, accumulated_audio, accumulated_facial_data, encoded_facial_data, py_face, single_entry)
+        accumulate_data(audio_bytes, facial_data, accumulated_audio, accumulated_facial_data, composed_frames, py_face, single_entry, emotion_track)
 
         playback_start_time = time.time()
-        log_queue.put(f"Time from queue reception to addition to encoded queue: {playback_start_time - received_time:.3f} seconds.")
+        log_queue.put(f"Time from queue reception to addition to composed queue: {playback_start_time - received_time:.3f} seconds.")
     
     time.sleep(0.1)
     audio_face_queue.join()
@@ -78,26 +84,133 @@ def audio_face_queue_worker_realtime(audio_face_queue, py_face, socket_connectio
     log_queue.put(None)  # Signal log thread to exit
     log_thread.join()
 
-    time.sleep(0.01)
-    with queue_lock:
-        stop_default_animation.clear()
-        new_default_thread = Thread(target=default_animation_loop, args=(py_face,))
-        new_default_thread.start()
-
-def audio_face_queue_worker(audio_face_queue, py_face, socket_connection, default_animation_thread):
+def audio_face_queue_worker(audio_face_queue, py_face, socket_connection, default_animation_thread, double_buffer=True, gapless=True,
+                            stream_blendshapes=False):
     """
     Processes audio items from audio_queue sequentially.
     Each item is a tuple (audio_bytes, facial_data) that is played back,
-    ensuring that the animations remain in sync.
+    ensuring that the animations remain in sync. With double_buffer the next item
+    is prepared (emotion overlay, composed, encoded) while the current one plays.
+    With gapless the audio goes to one continuous output stream, each chunk starting on
+    the sample the previous one ends; otherwise each chunk is played through pygame.
+    With stream_blendshapes the items carry no facial data (see tts_worker) and each one's
+    audio is streamed to NeuroSync while it plays instead (see run_stream_queue).
+    """
+    if stream_blendshapes:
+        run_stream_queue(audio_face_queue, socket_connection)
+        return
+    if gapless:
+        player = GaplessClipPlayer(socket_connection)
+        run_clip_queue(audio_face_queue, player.play, double_buffer=double_buffer)
+        player.finish()
+        gaps = player.gaps
+    else:
+        gaps = run_clip_queue(audio_face_queue, lambda clip: play_prepared_clip(clip, socket_connection), double_buffer=double_buffer)
+    if gaps:
+        print(f"Gaps between chunks: {summarize_gaps(gaps)}")
+
+
+def pcm_pieces(audio, seconds: float = STREAM_PIECE_SECONDS):
+    """
+    Yields an AudioBuffer's audio as 16-bit mono PCM in pieces of about seconds each.
+    """
+    pcm = audio.mono().as_int16().tobytes()
+    step = max(2, int(audio.sample_rate * seconds) * 2)
+    for start in range(0, len(pcm), step):
+        yield pcm[start:start + step]
+
+
+def run_stream_queue(audio_face_queue, socket_connection):
+    """
+    Plays (audio, None) items from audio_face_queue until a None item. Each item's audio is
+    uploaded to the NeuroSync streaming endpoint in pieces and played as it goes (see
+    run_streaming_animation), so the face moves one window into the audio rather than after
+    inference on the whole chunk.
     """
     while True:
         item = audio_face_queue.get()
         if item is None:
+            audio_face_queue.task_done()
             break
-        audio_bytes, facial_data = item
-        run_audio_animation_from_bytes(audio_bytes, facial_data, py_face, socket_connection, default_animation_thread)
+        try:
+            audio = AudioBuffer.from_bytes(item[0])
+            run_streaming_animation(pcm_pieces(audio), socket_connection, source_rate=audio.sample_rate)
+        except Exception as e:
+            print(f"Error streaming audio chunk: {e}")
         audio_face_queue.task_done()
 
+
+def run_clip_queue(audio_face_queue, play, prepare=prepare_clip, double_buffer=True):
+    """
+    Plays (audio_bytes, facial_data) items from audio_face_queue with play(clip) until a None
+    item, and returns the gap in seconds before each clip that followed another: the time
+    from the previous clip ending (or the item arriving, if later) until this one started.
+    """
+    prepared_queue = Queue(maxsize=1)
+    if double_buffer:
+        Thread(target=clip_prepare_worker, args=(audio_face_queue, prepared_queue, prepare), daemon=True).start()
+
+    gaps = []
+    previous_end = None
+    while True:
+        if double_buffer:
+            entry = prepared_queue.get()
+            prepared_queue.task_done()  # Lets the prepare worker start on the next item.
+        else:
+            entry = _prepare_item(audio_face_queue.get(), prepare)
+        if entry is None:
+            break
+        stop_count, clip = entry
+        if clip is None or stop_count != get_stop_count():
+            # Failed to prepare, or playback was stopped (and the queue flushed) since it was queued.
+            audio_face_queue.task_done()
+            continue
+
+        start = time.perf_counter()
+        if previous_end is not None:
+            gaps.append(start - max(previous_end, clip.received_time or previous_end))
+        play(clip)
+        previous_end = time.perf_counter()
+        audio_face_queue.task_done()
+    return gaps
+
+
+def clip_prepare_worker(audio_face_queue, prepared_queue, prepare=prepare_clip):
+    """
+    Prepares the item after the one playing. Each clip is handed over through prepared_queue
+    (maxsize 1) and the next item is only taken once playback has picked it up, so anything
+    further back stays in audio_face_queue where flushing can still drop it.
+    """
+    while True:
+        entry = _prepare_item(audio_face_queue.get(), prepare)
+        prepared_queue.put(entry)
+        if entry is None:
+            break
+        prepared_queue.join()
+
+
+def _prepare_item(item, prepare):
+    """
+    Returns (stop count when dequeued, PreparedClip or None on failure), or None for the end marker.
+    """
+    received_time = time.perf_counter()
+    stop_count = get_stop_count()
+    if item is None:
+        return None
+    audio_bytes, facial_data = item
+    try:
+        return stop_count, prepare(audio_bytes, facial_data, received_time=received_time)
+    except Exception as e:
+        print(f"Error preparing audio chunk: {e}")
+        return stop_count, None
+
+
+def summarize_gaps(gaps) -> str:
+    gaps_ms = [gap * 1000 for gap in gaps]
+    return (f"{len(gaps_ms)} gaps, mean {sum(gaps_ms) / len(gaps_ms):.1f} ms, "
+            f"max {max(gaps_ms):.1f} ms")
+
+
 def process_wav_file(wav_file, py_face, socket_connection, default_animation_thread):
     """
     Processes the wav file by sending it to the API and running the animation.
@@ -146,14 +259,32 @@ def process_wav_file(wav_file, py_face, socket_connection, default_animation_thr
     print("Processing completed successfully.")  # << Added print
 
 
-def conversion_worker(conversion_queue, audio_queue, sample_rate, channels, sample_width):
+def conversion_worker(conversion_queue, audio_queue, sample_rate, channels, sample_width, target_sample_rate=STREAM_SAMPLE_RATE):
+    """
+    Sends each chunk of realtime PCM to NeuroSync at target_sample_rate. The chunks of one
+    response are pieces of one continuous stream, so one StreamingResampler carries its filter
+    state from chunk to chunk until the RESPONSE_END that follows them; the audio queued for
+    playback stays at sample_rate.
+    """
+    resampler = StreamingResampler(sample_rate, target_sample_rate, channels) if sample_width == 2 else None
     while True:
         audio_chunk = conversion_queue.get()
-        if audio_chunk is None:  
+        if audio_chunk is None or audio_chunk == RESPONSE_END:
+            if resampler is not None:
+                # The next response starts from silence. The output still held back (the
+                # filter's half length, well under a millisecond) is dropped rather than sent
+                # to NeuroSync on its own.
+                resampler.reset()
             conversion_queue.task_done()
-            break
-
-        wav_audio = bytes_to_wav(audio_chunk, sample_rate, channels, sample_width)
+            if audio_chunk is None:
+                break
+            continue
+
+        if resampler is not None:
+            pcm = resampler.process_pcm(audio_chunk)
+            wav_audio = bytes_to_wav(pcm, target_sample_rate, channels, sample_width)
+        else:
+            wav_audio = bytes_to_wav(audio_chunk, sample_rate, channels, sample_width)
         facial_data = send_audio_to_neurosync(wav_audio.getvalue())
 
         audio_queue.put((audio_chunk, facial_data))
@@ -2,132 +2,98 @@
 # For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
 # Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
 
+# save_csv.py
+# Blendshape CSV export in the LiveLink Face layout Unreal imports: an HH:MM:SS:FF.mmm timecode,
+# the blendshape count, then one fixed-precision column per blendshape (and emotion, if present).
+# One exporter serves files and in-memory buffers. Timecodes come from integer array math on the
+# frame index, and the numbers are formatted straight from a float matrix a block of rows at a
+# time, so long sessions never become a table of per-cell Python strings.
 
 import numpy as np
-import pandas as pd
 import io
 
-def save_generated_data_as_csv(generated, output_path):
-    # Base columns (Blendshape data)
-    base_columns = [
-        'Timecode', 'BlendshapeCount', 'EyeBlinkLeft', 'EyeLookDownLeft', 'EyeLookInLeft', 'EyeLookOutLeft', 'EyeLookUpLeft', 
-        'EyeSquintLeft', 'EyeWideLeft', 'EyeBlinkRight', 'EyeLookDownRight', 'EyeLookInRight', 'EyeLookOutRight', 'EyeLookUpRight', 
-        'EyeSquintRight', 'EyeWideRight', 'JawForward', 'JawRight', 'JawLeft', 'JawOpen', 'MouthClose', 'MouthFunnel', 'MouthPucker', 
-        'MouthRight', 'MouthLeft', 'MouthSmileLeft', 'MouthSmileRight', 'MouthFrownLeft', 'MouthFrownRight', 'MouthDimpleLeft', 
-        'MouthDimpleRight', 'MouthStretchLeft', 'MouthStretchRight', 'MouthRollLower', 'MouthRollUpper', 'MouthShrugLower', 
-        'MouthShrugUpper', 'MouthPressLeft', 'MouthPressRight', 'MouthLowerDownLeft', 'MouthLowerDownRight', 'MouthUpperUpLeft', 
-        'MouthUpperUpRight', 'BrowDownLeft', 'BrowDownRight', 'BrowInnerUp', 'BrowOuterUpLeft', 'BrowOuterUpRight', 'CheekPuff', 
-        'CheekSquintLeft', 'CheekSquintRight', 'NoseSneerLeft', 'NoseSneerRight', 'TongueOut', 'HeadYaw', 'HeadPitch', 'HeadRoll', 
-        'LeftEyeYaw', 'LeftEyePitch', 'LeftEyeRoll', 'RightEyeYaw', 'RightEyePitch', 'RightEyeRoll'
-    ]
-    
-    # Emotion columns
-    emotion_columns = ['Angry', 'Disgusted', 'Fearful', 'Happy', 'Neutral', 'Sad', 'Surprised']
-
-    # Convert the generated list to a NumPy array
-    generated = np.array(generated)
-
-    # Determine the number of dimensions
-    num_dimensions = generated.shape[1]  # Number of columns in the generated data
+BLENDSHAPE_COLUMNS = [
+    'EyeBlinkLeft', 'EyeLookDownLeft', 'EyeLookInLeft', 'EyeLookOutLeft', 'EyeLookUpLeft',
+    'EyeSquintLeft', 'EyeWideLeft', 'EyeBlinkRight', 'EyeLookDownRight', 'EyeLookInRight', 'EyeLookOutRight', 'EyeLookUpRight',
+    'EyeSquintRight', 'EyeWideRight', 'JawForward', 'JawRight', 'JawLeft', 'JawOpen', 'MouthClose', 'MouthFunnel', 'MouthPucker',
+    'MouthRight', 'MouthLeft', 'MouthSmileLeft', 'MouthSmileRight', 'MouthFrownLeft', 'MouthFrownRight', 'MouthDimpleLeft',
+    'MouthDimpleRight', 'MouthStretchLeft', 'MouthStretchRight', 'MouthRollLower', 'MouthRollUpper', 'MouthShrugLower',
+    'MouthShrugUpper', 'MouthPressLeft', 'MouthPressRight', 'MouthLowerDownLeft', 'MouthLowerDownRight', 'MouthUpperUpLeft',
+    'MouthUpperUpRight', 'BrowDownLeft', 'BrowDownRight', 'BrowInnerUp', 'BrowOuterUpLeft', 'BrowOuterUpRight', 'CheekPuff',
+    'CheekSquintLeft', 'CheekSquintRight', 'NoseSneerLeft', 'NoseSneerRight', 'TongueOut', 'HeadYaw', 'HeadPitch', 'HeadRoll',
+    'LeftEyeYaw', 'LeftEyePitch', 'LeftEyeRoll', 'RightEyeYaw', 'RightEyePitch', 'RightEyeRoll'
+]
+EMOTION_COLUMNS = ['Angry', 'Disgusted', 'Fearful', 'Happy', 'Neutral', 'Sad', 'Surprised']
+
+FRAME_RATE = 60
+FLOAT_PRECISION = 10  # Decimal places, as LiveLink Face writes them.
+ROWS_PER_BLOCK = 1024
+
+
+def csv_columns(num_dimensions):
+    """
+    Header for generated data with num_dimensions columns: 61 blendshapes, or 68 with emotions.
+    """
     if num_dimensions == 68:
-        selected_columns = base_columns + emotion_columns  # Include emotions
-        selected_data = generated  # Keep all 68 columns
-    elif num_dimensions == 61:
-        selected_columns = base_columns  # Only blendshape columns
-        selected_data = generated[:, :61]  # Keep only the first 61 columns
+        return ['Timecode', 'BlendshapeCount'] + BLENDSHAPE_COLUMNS + EMOTION_COLUMNS
+    if num_dimensions == 61:
+        return ['Timecode', 'BlendshapeCount'] + BLENDSHAPE_COLUMNS
+    raise ValueError(f"Unexpected number of columns: {num_dimensions}. Expected 61 or 68.")
+
+
+def timecode_fields(frame_count, frame_rate=FRAME_RATE, start_frame=0):
+    """
+    (frames, 5) integer hours, minutes, seconds, frame and milliseconds of each frame index.
+    """
+    frames = np.arange(start_frame, start_frame + frame_count, dtype=np.int64)
+    seconds = frames // frame_rate
+    frame_in_second = frames % frame_rate
+    return np.stack((seconds // 3600, seconds // 60 % 60, seconds % 60,
+                     frame_in_second, frame_in_second * 1000 // frame_rate), axis=1)
+
+
+def write_blendshape_csv(generated, destination, frame_rate=FRAME_RATE, precision=FLOAT_PRECISION):
+    """
+    Writes generated ((frames, 61 or 68) blendshapes) as CSV to destination: a path, a text
+    stream, or a binary stream such as BytesIO. Rows are formatted and written a block at a time.
+    """
+    generated = np.asarray(generated, dtype=np.float64)
+    if generated.ndim != 2:
+        raise ValueError(f"Expected a (frames, dimensions) array, got shape {generated.shape}.")
+    num_dimensions = generated.shape[1]
+    header = ','.join(csv_columns(num_dimensions)) + '\n'
+    row_format = f"%02d:%02d:%02d:%02d.%03d,{num_dimensions}," + ','.join([f"%.{precision}f"] * num_dimensions) + '\n'
+
+    if isinstance(destination, (str, bytes)) or hasattr(destination, '__fspath__'):
+        with open(destination, 'w', newline='') as f:
+            _write_rows(generated, f.write, header, row_format, frame_rate)
+    elif isinstance(destination, io.TextIOBase):
+        _write_rows(generated, destination.write, header, row_format, frame_rate)
     else:
-        raise ValueError(f"Unexpected number of columns: {num_dimensions}. Expected 61 or 68.")
-
-
-    # Generate timecodes
-    frame_count = generated.shape[0]
-    frame_rate = 60  # 60 FPS
-    frame_duration = 1 / frame_rate  # Duration of each frame in seconds
-
-    # Create timecodes in the HH:mm:ss:ff.mmm format
-    timecodes = []
-    for i in range(frame_count):
-        total_seconds = i * frame_duration
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        milliseconds = (seconds - int(seconds)) * 1000
-        frame_number = int(milliseconds / (1000 / frame_rate))
-        timecode = f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}:{frame_number:02}.{int(milliseconds):03}"
-        timecodes.append(timecode)
-
-    # Add timecodes and blendshape counts
-    timecodes = np.array(timecodes).reshape(-1, 1)
-    blendshape_counts = np.full((frame_count, 1), selected_data.shape[1])
-
-    # Stack the data together
-    data = np.hstack((timecodes, blendshape_counts, selected_data))
-
-    # Create a DataFrame and save to CSV
-    df = pd.DataFrame(data, columns=selected_columns)
-    df.to_csv(output_path, index=False)
-    print(f"Generated data saved to {output_path}")
+        _write_rows(generated, lambda text: destination.write(text.encode('ascii')), header, row_format, frame_rate)
 
 
+def _write_rows(generated, write, header, row_format, frame_rate):
+    write(header)
+    block = np.empty((min(ROWS_PER_BLOCK, len(generated)), 5 + generated.shape[1]), dtype=np.float64)
+    for start in range(0, len(generated), ROWS_PER_BLOCK):
+        rows = generated[start:start + ROWS_PER_BLOCK]
+        values = block[:len(rows)]
+        values[:, :5] = timecode_fields(len(rows), frame_rate, start)
+        values[:, 5:] = rows
+        write((row_format * len(rows)) % tuple(values.ravel().tolist()))
+
+
+def save_generated_data_as_csv(generated, output_path):
+    write_blendshape_csv(generated, output_path)
+    print(f"Generated data saved to {output_path}")
+
 
 def generate_csv_in_memory(generated):
     """Generates CSV content and returns it as a BytesIO object."""
-    # Base columns (Blendshape data)
-    base_columns = [
-        'Timecode', 'BlendshapeCount', 'EyeBlinkLeft', 'EyeLookDownLeft', 'EyeLookInLeft', 'EyeLookOutLeft', 'EyeLookUpLeft',
-        'EyeSquintLeft', 'EyeWideLeft', 'EyeBlinkRight', 'EyeLookDownRight', 'EyeLookInRight', 'EyeLookOutRight', 'EyeLookUpRight',
-        'EyeSquintRight', 'EyeWideRight', 'JawForward', 'JawRight', 'JawLeft', 'JawOpen', 'MouthClose', 'MouthFunnel', 'MouthPucker',
-        'MouthRight', 'MouthLeft', 'MouthSmileLeft', 'MouthSmileRight', 'MouthFrownLeft', 'MouthFrownRight', 'MouthDimpleLeft',
-        'MouthDimpleRight', 'MouthStretchLeft', 'MouthStretchRight', 'MouthRollLower', 'MouthRollUpper', 'MouthShrugLower',
-        'MouthShrugUpper', 'MouthPressLeft', 'MouthPressRight', 'MouthLowerDownLeft', 'MouthLowerDownRight', 'MouthUpperUpLeft',
-        'MouthUpperUpRight', 'BrowDownLeft', 'BrowDownRight', 'BrowInnerUp', 'BrowOuterUpLeft', 'BrowOuterUpRight', 'CheekPuff',
-        'CheekSquintLeft', 'CheekSquintRight', 'NoseSneerLeft', 'NoseSneerRight', 'TongueOut', 'HeadYaw', 'HeadPitch', 'HeadRoll',
-        'LeftEyeYaw', 'LeftEyePitch', 'LeftEyeRoll', 'RightEyeYaw', 'RightEyePitch', 'RightEyeRoll'
-    ]
-
-    # Emotion columns
-    emotion_columns = ['Angry', 'Disgusted', 'Fearful', 'Happy', 'Neutral', 'Sad', 'Surprised']
-
-    # Convert the generated list to a NumPy array
-    generated = np.array(generated)
-
-    # Determine the number of dimensions
-    num_dimensions = generated.shape[1]
-    if num_dimensions == 68:
-        selected_columns = base_columns + emotion_columns
-        selected_data = generated
-    elif num_dimensions == 61:
-        selected_columns = base_columns
-        selected_data = generated[:, :61]
-    else:
-        raise ValueError(f"Unexpected number of columns: {num_dimensions}. Expected 61 or 68.")
-
-    # Generate timecodes
-    frame_count = generated.shape[0]
-    frame_rate = 60
-    frame_duration = 1 / frame_rate
-
-    timecodes = []
-    for i in range(frame_count):
-        total_seconds = i * frame_duration
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        milliseconds = (seconds - int(seconds)) * 1000
-        frame_number = int(milliseconds / (1000 / frame_rate))
-        timecode = f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}:{frame_number:02}.{int(milliseconds):03}"
-        timecodes.append(timecode)
-
-    timecodes = np.array(timecodes).reshape(-1, 1)
-    blendshape_counts = np.full((frame_count, 1), selected_data.shape[1])
-
-    data = np.hstack((timecodes, blendshape_counts, selected_data))
-
-    # Convert to DataFrame
-    df = pd.DataFrame(data, columns=selected_columns)
-
-    # Save CSV content in memory
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    csv_bytes = io.BytesIO(csv_buffer.getvalue().encode('utf-8'))
+    csv_bytes = io.BytesIO()
+    write_blendshape_csv(generated, csv_bytes)
+    csv_bytes.seek(0)
     return csv_bytes
 
 
@@ -0,0 +1,133 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# clip_format.py
+# Binary clip format for the generated/ library: a 64-byte header followed by the
+# (frames, dimensions) blendshape matrix, little-endian float32 or float16, row-major. A float32
+# clip is memory-mapped straight into the array replay uses; CSV is only written on export.
+#
+#   offset  size  field
+#   0       4     magic b"NSCL"
+#   4       2     format version (uint16 LE)
+#   6       1     sample type: 1 float32, 2 float16
+#   7       1     flags: bit 0 set if the last 7 columns are emotions
+#   8       2     frames per second (uint16 LE)
+#   10      2     column set: 1 = the 61 LiveLink blendshapes, in save_csv order
+#   12      4     frame count (uint32 LE)
+#   16      4     dimensions per frame (uint32 LE)
+#   20      4     reserved, 0
+#   24      32    SHA-256 of the source audio's samples (zeros if unknown)
+#   56      8     reserved, 0
+#   64      ...   frames * dimensions samples
+
+import hashlib
+import os
+import struct
+
+import numpy as np
+
+CLIP_EXTENSION = ".nsc"
+MAGIC = b"NSCL"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHBBHHIII32s8x")
+
+SAMPLE_TYPES = {1: np.dtype("<f4"), 2: np.dtype("<f2")}
+FLAG_EMOTIONS = 1
+COLUMN_SET_LIVELINK = 1
+BLENDSHAPE_DIMENSIONS = 61
+EMOTION_DIMENSIONS = 7
+
+
+class ClipHeader:
+    def __init__(self, frames: int, dimensions: int, fps: int = 60, dtype="<f4",
+                 column_set: int = COLUMN_SET_LIVELINK, audio_hash: bytes = b"") -> None:
+        self.frames = frames
+        self.dimensions = dimensions
+        self.fps = fps
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        self.column_set = column_set
+        self.audio_hash = audio_hash
+
+    @property
+    def has_emotions(self) -> bool:
+        return self.dimensions == BLENDSHAPE_DIMENSIONS + EMOTION_DIMENSIONS
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.fps
+
+    def pack(self) -> bytes:
+        sample_type = next(code for code, dtype in SAMPLE_TYPES.items() if dtype == self.dtype)
+        flags = FLAG_EMOTIONS if self.has_emotions else 0
+        return HEADER.pack(MAGIC, FORMAT_VERSION, sample_type, flags, self.fps, self.column_set,
+                           self.frames, self.dimensions, 0, self.audio_hash.ljust(32, b"\0"))
+
+    @classmethod
+    def unpack(cls, data) -> "ClipHeader":
+        """
+        Parses and validates a header. Raises ValueError if it is not a clip this version reads.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError(f"Clip header too short: {len(data)} bytes.")
+        magic, version, sample_type, _, fps, column_set, frames, dimensions, _, audio_hash = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"Not a clip file (magic {magic!r}).")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported clip format version {version}.")
+        if sample_type not in SAMPLE_TYPES:
+            raise ValueError(f"Unknown clip sample type {sample_type}.")
+        return cls(frames, dimensions, fps, SAMPLE_TYPES[sample_type], column_set, audio_hash)
+
+
+def audio_content_hash(audio_bytes) -> bytes:
+    """
+    SHA-256 of the audio's samples (see blendshape_cache.normalize_audio), so a re-encoded WAV
+    of the same audio hashes the same.
+    """
+    from utils.neurosync.blendshape_cache import normalize_audio
+    tag, samples = normalize_audio(audio_bytes)
+    digest = hashlib.sha256(tag.encode("utf-8") + b"|")
+    digest.update(samples)
+    return digest.digest()
+
+
+def write_clip(path: str, blendshapes, fps: int = 60, dtype="<f4", audio_hash: bytes = b"") -> str:
+    """
+    Writes a (frames, 61 or 68) blendshape matrix as a clip file (through a temporary file, so
+    readers never see half a clip). dtype is float32, or float16 for half the size.
+    """
+    matrix = np.ascontiguousarray(blendshapes, dtype=np.dtype(dtype).newbyteorder("<"))
+    if matrix.ndim != 2 or matrix.shape[1] not in (BLENDSHAPE_DIMENSIONS, BLENDSHAPE_DIMENSIONS + EMOTION_DIMENSIONS):
+        raise ValueError(f"Expected (frames, 61) or (frames, 68) blendshapes, got shape {matrix.shape}.")
+    header = ClipHeader(matrix.shape[0], matrix.shape[1], fps, matrix.dtype, audio_hash=audio_hash)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header.pack())
+        if matrix.size:
+            f.write(memoryview(matrix).cast("B"))
+    os.replace(temp_path, path)
+    return path
+
+
+def read_clip_header(path: str) -> ClipHeader:
+    with open(path, "rb") as f:
+        return ClipHeader.unpack(f.read(HEADER.size))
+
+
+def load_clip(path: str):
+    """
+    Returns (frames, header). A float32 clip is memory-mapped copy-on-write: pages are read
+    when touched and writes stay in memory. A float16 clip is widened to a float32 copy.
+    """
+    header = read_clip_header(path)
+    expected = HEADER.size + header.frames * header.dimensions * header.dtype.itemsize
+    size = os.path.getsize(path)
+    if size != expected:
+        raise ValueError(f"Clip {path} is {size} bytes, expected {expected} for {header.frames}x{header.dimensions}.")
+    if header.frames == 0:
+        return np.empty((0, header.dimensions), dtype=np.float32), header
+    frames = np.memmap(path, dtype=header.dtype, mode="c", offset=HEADER.size, shape=(header.frames, header.dimensions))
+    if header.dtype != np.float32:
+        frames = frames.astype(np.float32)
+    return frames, header
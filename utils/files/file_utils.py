@@ -1,18 +1,18 @@
 import os
 import shutil
-import pandas as pd
-import wave
 import uuid
-import numpy as np
-import soundfile as sf
 
 
 from utils.csv.save_csv import save_generated_data_as_csv
 from utils.audio.save_audio import save_audio_file
+from utils.files.clip_format import CLIP_EXTENSION, write_clip, load_clip, audio_content_hash
+from utils.files.persistence_queue import get_persistence_queue
 
-from utils.neurosync.neurosync_api_connect import send_audio_to_neurosync
+from utils.neurosync.neurosync_api_connect import send_audio_to_neurosync, link_generated_blendshapes
 
 GENERATED_DIR = 'generated'
+SHAPES_CLIP = 'shapes' + CLIP_EXTENSION
+SHAPES_CSV = 'shapes.csv'
 
 def reprocess_generated_files():
     """
@@ -24,7 +24,7 @@ def reprocess_generated_files():
     for directory in directories:
         dir_path = os.path.join(GENERATED_DIR, directory)
         audio_path = os.path.join(dir_path, 'audio.wav')
-        shapes_path = os.path.join(dir_path, 'shapes.csv')
+        shapes_path = os.path.join(dir_path, SHAPES_CLIP)
         
         if os.path.exists(audio_path):
             print(f"Processing: {audio_path}")
@@ -33,25 +33,29 @@ def reprocess_generated_files():
             with open(audio_path, 'rb') as f:
                 audio_bytes = f.read()
             
-            # Send audio to the API to generate facial blendshapes
-            generated_facial_data = send_audio_to_neurosync(audio_bytes)
+            # Send audio to the API to generate facial blendshapes (never reuse the cached result)
+            generated_facial_data = send_audio_to_neurosync(audio_bytes, refresh_cache=True)
             
             if generated_facial_data is None:
                 print(f"Failed to generate facial data for {audio_path}")
                 continue
 
-            # Move old shapes.csv to an 'old' folder and rename it with a unique identifier
+            # Move the old shapes (clip and/or CSV) to an 'old' folder and rename them with a unique identifier
             old_dir = os.path.join(dir_path, 'old')
             os.makedirs(old_dir, exist_ok=True)
 
-            if os.path.exists(shapes_path):
-                unique_old_name = f"shapes_{uuid.uuid4()}.csv"
-                shutil.move(shapes_path, os.path.join(old_dir, unique_old_name))
+            unique_old_id = uuid.uuid4()
+            for old_name in (SHAPES_CLIP, SHAPES_CSV):
+                old_path = os.path.join(dir_path, old_name)
+                if os.path.exists(old_path):
+                    stem, extension = os.path.splitext(old_name)
+                    shutil.move(old_path, os.path.join(old_dir, f"{stem}_{unique_old_id}{extension}"))
             
-            # Save the new blendshapes as a CSV
-            save_generated_data_as_csv(generated_facial_data, shapes_path)
+            # Save the new blendshapes as a binary clip
+            write_generated_clip(generated_facial_data, shapes_path, audio_bytes)
+            link_generated_blendshapes(audio_bytes, shapes_path)
             
-            print(f"New shapes.csv generated and old shapes.csv moved to {old_dir}")
+            print(f"New {SHAPES_CLIP} generated and old shapes moved to {old_dir}")
 
 
 def initialize_directories():
@@ -78,48 +82,105 @@ def list_wav_files(folder_path):
     return files
 
 
+def generated_shapes_path(directory):
+    """
+    The shapes file of a generated/ entry: its binary clip, or shapes.csv if it has not been
+    converted. None if it has neither.
+    """
+    for name in (SHAPES_CLIP, SHAPES_CSV):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
 def list_generated_files():
-    """List all the generated audio and face blend shape CSV files in the generated directory."""
+    """List all the generated audio and face blend shape files in the generated directory."""
     directories = [d for d in os.listdir(GENERATED_DIR) if os.path.isdir(os.path.join(GENERATED_DIR, d))]
     generated_files = []
     for directory in directories:
         audio_path = os.path.join(GENERATED_DIR, directory, 'audio.wav')
-        shapes_path = os.path.join(GENERATED_DIR, directory, 'shapes.csv')
-        if os.path.exists(audio_path) and os.path.exists(shapes_path):
+        shapes_path = generated_shapes_path(os.path.join(GENERATED_DIR, directory))
+        if os.path.exists(audio_path) and shapes_path is not None:
             generated_files.append((audio_path, shapes_path))
     return generated_files
 
 def load_facial_data_from_csv(csv_path):
-    """Load facial data from a CSV file, excluding 'Timecode' and 'BlendshapeCount' columns."""
+    """
+    Load facial data from a shapes file. A binary clip, or a CSV with an up-to-date clip next to
+    it, is memory-mapped; otherwise the CSV is parsed, excluding 'Timecode' and 'BlendshapeCount'.
+    """
+    clip_path = os.path.splitext(csv_path)[0] + CLIP_EXTENSION
+    if os.path.exists(clip_path) and (clip_path == csv_path or not os.path.exists(csv_path)
+                                      or os.path.getmtime(clip_path) >= os.path.getmtime(csv_path)):
+        return load_clip(clip_path)[0]
+    import pandas as pd
     data = pd.read_csv(csv_path)
     data = data.drop(columns=['Timecode', 'BlendshapeCount'], errors='ignore')
     return data.values
 
 
-def save_generated_data(audio_bytes, generated_facial_data):
+def write_generated_clip(generated_facial_data, shapes_path, audio_bytes=None, dtype="<f4"):
+    """
+    Writes blendshapes as a binary clip, recording the hash of the audio they were made from.
+    """
+    audio_hash = audio_content_hash(audio_bytes) if audio_bytes is not None else b""
+    write_clip(shapes_path, generated_facial_data, dtype=dtype, audio_hash=audio_hash)
+    print(f"Generated data saved to {shapes_path}")
+    return shapes_path
+
+
+def export_generated_csv(shapes_path, csv_path=None):
+    """
+    Writes a CSV copy of a generated clip, for Unreal import or other tools, next to it unless
+    csv_path is given. Returns the CSV path.
+    """
+    if csv_path is None:
+        csv_path = os.path.splitext(shapes_path)[0] + '.csv'
+    save_generated_data_as_csv(load_clip(shapes_path)[0], csv_path)
+    return csv_path
+
+
+def _new_generated_paths():
     unique_id = str(uuid.uuid4())
     output_dir = os.path.join(GENERATED_DIR, unique_id)
-    os.makedirs(output_dir, exist_ok=True)
+    return unique_id, os.path.join(output_dir, 'audio.wav'), os.path.join(output_dir, SHAPES_CLIP)
 
-    audio_path = os.path.join(output_dir, 'audio.wav')
-    shapes_path = os.path.join(output_dir, 'shapes.csv')
 
-    # Attempt to save the audio using the existing method
+def write_generated_data(audio_bytes, generated_facial_data, audio_path, shapes_path):
+    """
+    Writes one clip's audio and blendshapes and links the blendshape cache to them. Returns the
+    paths written.
+    """
+    os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+
+    # audio_bytes may be bytes or an AudioBuffer; save_audio_file always writes a valid WAV
+    # (headerless bytes are taken as 16-bit PCM at 88.2 kHz), so it is not re-read here.
     save_audio_file(audio_bytes, audio_path)
 
-    # Validate if the saved file is a valid WAV file
-    try:
-        with wave.open(audio_path, 'rb') as wav_file:
-            wav_file.readframes(1)  # Try to read the first frame
-    except (wave.Error, EOFError):
-        # If the file is not valid, rewrite it using soundfile
-        print(f"The file {audio_path} was not a valid WAV file. Rewriting it using soundfile.")
-        with sf.SoundFile(audio_path, mode='w', samplerate=88200, channels=1, format='WAV', subtype='PCM_16') as f:
-            f.write(np.frombuffer(audio_bytes, dtype=np.int16))
+    # Save the generated facial data as a binary clip; CSV is exported on demand
+    write_generated_clip(generated_facial_data, shapes_path, audio_bytes)
+    link_generated_blendshapes(audio_bytes, shapes_path)
+    return audio_path, shapes_path
 
-    # Save the generated facial data as a CSV file
-    save_generated_data_as_csv(generated_facial_data, shapes_path)
 
+def save_generated_data(audio_bytes, generated_facial_data):
+    unique_id, audio_path, shapes_path = _new_generated_paths()
+    write_generated_data(audio_bytes, generated_facial_data, audio_path, shapes_path)
+    return unique_id, audio_path, shapes_path
+
+
+def save_generated_data_async(audio_bytes, generated_facial_data, block=True):
+    """
+    save_generated_data on the background persistence queue: returns the clip's id and paths at
+    once, and the files appear when the writer gets to them. Stream sessions pass block=False,
+    so a full queue drops the clip instead of stalling playback. Call close_persistence_queue()
+    on shutdown to write what is still pending.
+    """
+    unique_id, audio_path, shapes_path = _new_generated_paths()
+    get_persistence_queue().submit(
+        lambda: write_generated_data(audio_bytes, generated_facial_data, audio_path, shapes_path),
+        name=unique_id, block=block)
     return unique_id, audio_path, shapes_path
 
 def save_generated_data_from_wav(wav_file_path, generated_facial_data):
@@ -130,13 +191,16 @@ def save_generated_data_from_wav(wav_file_path, generated_facial_data):
 
     # Define paths for the audio and facial data
     audio_path = os.path.join(output_dir, 'audio.wav')
-    shapes_path = os.path.join(output_dir, 'shapes.csv')
+    shapes_path = os.path.join(output_dir, SHAPES_CLIP)
 
     try:
         shutil.copy(wav_file_path, audio_path)
     except shutil.SameFileError:
         print(f"Audio file '{wav_file_path}' is already in the correct location.")
 
-    save_generated_data_as_csv(generated_facial_data, shapes_path)
+    with open(audio_path, 'rb') as f:
+        audio_bytes = f.read()
+    write_generated_clip(generated_facial_data, shapes_path, audio_bytes)
+    link_generated_blendshapes(audio_bytes, shapes_path)
 
     return unique_id, audio_path, shapes_path
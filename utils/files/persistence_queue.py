@@ -0,0 +1,170 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# persistence_queue.py
+# Background writer for generated clips. Saving a clip resamples audio, writes a WAV and a CSV
+# and links the blendshape cache; done on the interactive thread, the next prompt waited for the
+# disk. Jobs go on a bounded queue instead and one writer thread runs them, fsyncing the files a
+# batch wrote once per batch rather than once per file. Pending jobs are written on close().
+
+import os
+import time
+from queue import Queue, Full, Empty
+from threading import Lock, Thread
+
+from utils.resources import register_resource, get_resource, is_loaded, release_resource
+
+MAX_PENDING = 32  # Clips waiting to be written before submit() blocks (or drops, if not blocking).
+MAX_BATCH = 8  # Jobs written between fsyncs.
+
+
+class PersistenceQueue:
+    """
+    Runs write jobs on one background thread. A job is a callable that writes its files and
+    returns their paths; after each batch those files and their directories are fsynced.
+    Failures are printed, counted and kept in self.failures as (name, exception) pairs.
+    """
+
+    def __init__(self, max_pending=MAX_PENDING, max_batch=MAX_BATCH, fsync=True, on_error=None) -> None:
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.on_error = on_error
+        self.failures = []
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_seconds = 0.0
+
+        self._queue = Queue(max_pending)
+        self._lock = Lock()
+        self._closed = False
+        self._thread = Thread(target=self._run, name="persistence-writer", daemon=True)
+        self._thread.start()
+
+    # -------------------- Submitting --------------------
+    def submit(self, job, name: str = "", block: bool = True, timeout=None) -> bool:
+        """
+        Queues job. With block, waits while the queue is full; without, a full queue drops the
+        job (reported and counted) so callers that must keep real time never wait on the disk.
+        Returns False if the job was not queued.
+        """
+        if self._closed:
+            self._report(name, RuntimeError("persistence queue is closed"))
+            return False
+        try:
+            self._queue.put((job, name), block, timeout)
+            return True
+        except Full:
+            with self._lock:
+                self.dropped += 1
+            print(f"Persistence queue full; not saving {name or 'clip'}.")
+            return False
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def flush(self) -> None:
+        """
+        Waits until every job queued so far has been written and synced.
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Writes what is still pending, then stops the writer thread.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        print(self.summary())
+
+    # -------------------- Writer --------------------
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            stop = batch[-1] is None
+            jobs = batch[:-1] if stop else batch
+            start = time.perf_counter()
+            paths = []
+            for job, name in jobs:
+                try:
+                    paths.extend(job() or ())
+                    with self._lock:
+                        self.written += 1
+                except Exception as e:
+                    self._report(name, e)
+            if self.fsync and paths:
+                self._sync(paths)
+            with self._lock:
+                self.batches += 1 if jobs else 0
+                self.write_seconds += time.perf_counter() - start
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _sync(self, paths) -> None:
+        for path in paths:
+            try:
+                _fsync_path(path, os.O_RDWR)
+            except OSError as e:
+                self._report(path, e)
+        for directory in {os.path.dirname(os.path.abspath(path)) for path in paths}:
+            try:
+                _fsync_path(directory, os.O_RDONLY)
+            except OSError:
+                pass  # Directories cannot be opened on Windows; their entries are synced with the files.
+
+    def _report(self, name: str, error: Exception) -> None:
+        with self._lock:
+            self.failures.append((name, error))
+        print(f"❌ Failed to save {name or 'clip'}: {error}")
+        if self.on_error is not None:
+            self.on_error(name, error)
+
+    # -------------------- Stats --------------------
+    def as_dict(self) -> dict:
+        return {
+            "written": self.written,
+            "failed": len(self.failures),
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_seconds": self.write_seconds,
+        }
+
+    def summary(self) -> str:
+        return (f"Persistence queue: {self.written} clips written in {self.batches} batches "
+                f"({self.write_seconds:.2f} s), {len(self.failures)} failed, {self.dropped} dropped")
+
+
+def _fsync_path(path: str, flags: int) -> None:
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# The writer thread is started the first time something is saved in the background.
+register_resource("persistence_queue", PersistenceQueue)
+
+def get_persistence_queue() -> PersistenceQueue:
+    return get_resource("persistence_queue")
+
+
+def close_persistence_queue() -> None:
+    """
+    Writes every pending clip and stops the writer. Does nothing if nothing was ever queued.
+    """
+    if is_loaded("persistence_queue"):
+        get_persistence_queue().close()
+        release_resource("persistence_queue")
@@ -2,33 +2,43 @@
 # For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
 # Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
 
-from threading import Thread, Event, Lock
+from queue import Queue
+from threading import Thread, Event
+import time
 import numpy as np
-import random
 from utils.audio.play_audio import (
     play_audio_from_path, 
     play_audio_from_memory, 
     play_audio_bytes, 
-    play_audio_from_memory_openai
+    play_audio_from_memory_openai,
+    get_playback_position,
+    get_stop_count
 )
-from livelink.send_to_unreal import pre_encode_facial_data, send_pre_encoded_data_to_unreal
-from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.audio.audio_stream import ChunkSequence
+from utils.audio.resampler import StreamingResampler
+from livelink.send_to_unreal import compose_clip, send_pre_encoded_data_to_unreal, send_streamed_frames_to_unreal, StreamingClipComposer
+from livelink.jitter_buffer import FrameJitterBuffer
+from livelink.connect.packet_encoder import encode_facial_frames
+from livelink.animations.compositor import get_compositor
 from livelink.connect.livelink_init import initialize_py_face 
 
-from livelink.animations.animation_emotion import (
-    determine_highest_emotion, 
-    merge_emotion_data_into_facial_data_wrapper
-)
+from livelink.animations.animation_emotion import EmotionOverlayTrack
+
+from livelink.animations.animation_loader import get_emotion_animations
+
+from utils.neurosync.neurosync_stream import LOCAL_STREAM_URL, STREAM_SAMPLE_RATE, WINDOW_FRAMES, stream_audio_chunks
 
-from livelink.animations.animation_loader import emotion_animations
+# "audio": frames follow the audio device's playback position; "clock": they free-run on the
+# wall clock from when audio starts. Applies to clips mixed by the compositor as well as to clips
+# sent from their own thread. Output latency compensation is OUTPUT_LATENCY_MS in frame_pacer.
+FRAME_SYNC = "audio"
 
-queue_lock = Lock()
 
 def run_encoded_audio_animation(audio_bytes, encoded_facial_data, socket_connection):
     start_event = Event()
 
     audio_thread = Thread(target=play_audio_bytes, args=(audio_bytes, start_event))
-    data_thread = Thread(target=send_pre_encoded_data_to_unreal, args=(encoded_facial_data, start_event, 60, socket_connection))
+    data_thread = Thread(target=send_pre_encoded_data_to_unreal, args=(encoded_facial_data, start_event, 60, socket_connection), kwargs={"audio_clock": get_playback_position, "sync": FRAME_SYNC})
 
     audio_thread.start()
     data_thread.start()
@@ -38,111 +48,329 @@ def run_encoded_audio_animation(audio_bytes, encoded_facial_data, socket_connect
     data_thread.join()
 
 
-def play_audio_and_animation_openai_realtime(playback_audio, playback_facial_data, start_event, socket_connection):
+def play_audio_with_animation(play_audio, audio_source, clip_frames, socket_connection, start_event=None, encoded_facial_data=None):
     """
-    Plays audio and sends animation data using separate threads.
+    Plays audio while the composed clip_frames animate the face.
+    When the compositor is running the clip is mixed into its output, so the idle loop never
+    has to be stopped; otherwise the clip is sent from its own thread, using
+    encoded_facial_data if it was already encoded. Either way its frames follow pygame's
+    playback position under FRAME_SYNC.
     """
-    audio_thread = Thread(target=play_audio_from_memory_openai, args=(playback_audio, start_event))
-    data_thread = Thread(target=send_pre_encoded_data_to_unreal, args=(playback_facial_data, start_event, 60, socket_connection))
-
+    start_event = start_event or Event()
+    audio_thread = Thread(target=play_audio, args=(audio_source, start_event))
     audio_thread.start()
+
+    timing = {"audio_clock": get_playback_position, "sync": FRAME_SYNC}
+    compositor = get_compositor()
+    if compositor.is_running():
+        clip = compositor.play_clip(clip_frames, start_event, **timing)
+        start_event.set()
+        audio_thread.join()
+        clip.done.wait()
+        return
+
+    if encoded_facial_data is None:
+        encoded_facial_data = encode_facial_frames(clip_frames, compositor.py_face)
+    data_thread = Thread(target=send_pre_encoded_data_to_unreal, args=(encoded_facial_data, start_event, 60, socket_connection), kwargs=timing)
     data_thread.start()
     start_event.set()
-
     audio_thread.join()
     data_thread.join()
 
-def run_audio_animation_from_bytes(audio_bytes, generated_facial_data, py_face, socket_connection, default_animation_thread):
-    # Check that generated_facial_data is not None, has at least one frame,
-    # and that the first frame has more than 61 columns.
-    if (generated_facial_data is not None and 
-        len(generated_facial_data) > 0 and 
-        len(generated_facial_data[0]) > 61):
-        
-        # Convert to mutable list-of-lists if necessary.
-        if isinstance(generated_facial_data, np.ndarray):
-            generated_facial_data = generated_facial_data.tolist()
-        
-        facial_data_array = np.array(generated_facial_data)
-        dominant_emotion = determine_highest_emotion(facial_data_array)
-        print(f"Dominant emotion: {dominant_emotion}")
-        if dominant_emotion in emotion_animations and len(emotion_animations[dominant_emotion]) > 0:
-            selected_animation = random.choice(emotion_animations[dominant_emotion])
-            generated_facial_data = merge_emotion_data_into_facial_data_wrapper(
-                generated_facial_data, selected_animation, alpha=0.7)
-    
+
+def play_audio_and_animation_openai_realtime(playback_audio, playback_facial_data, start_event, socket_connection):
+    """
+    Plays audio and the accumulated, composed animation frames together.
+    """
+    play_audio_with_animation(play_audio_from_memory_openai, playback_audio, np.asarray(playback_facial_data), socket_connection, start_event)
+
+
+def merge_emotion_overlay(generated_facial_data, emotion_track=None):
+    """
+    Blends emotion animations into the facial data, switching animation wherever the
+    detected emotion changes. Pass a long-lived emotion_track to continue across chunks;
+    without one the data is taken as a whole clip.
+    """
+    if generated_facial_data is None or len(generated_facial_data) == 0:
+        return generated_facial_data
+
+    whole_clip = emotion_track is None
+    if whole_clip:
+        emotion_track = EmotionOverlayTrack(get_emotion_animations())
+    detected = len(emotion_track.changes)
+    generated_facial_data = emotion_track.apply(generated_facial_data, final=whole_clip)
+    for frame_index, emotion in emotion_track.changes[detected:]:
+        print(f"Emotion from frame {frame_index}: {emotion}")
+    return generated_facial_data
+
+
+class PreparedClip:
+    """
+    A chunk that is ready to play: its audio, its composed frames and, unless the compositor
+    is running (it encodes as it mixes), the encoded LiveLink packets.
+    """
+
+    def __init__(self, audio_bytes, clip_frames, encoded_facial_data=None, received_time=None, prepare_seconds: float = 0.0) -> None:
+        self.audio_bytes = audio_bytes
+        self.clip_frames = clip_frames
+        self.encoded_facial_data = encoded_facial_data
+        self.received_time = received_time
+        self.prepare_seconds = prepare_seconds
+
+    @property
+    def duration(self) -> float:
+        return len(self.clip_frames) / 60.0
+
+
+def prepare_clip(audio_bytes, generated_facial_data, emotion_track=None, received_time=None) -> PreparedClip:
+    """
+    Does all the work that used to run between dequeuing a chunk and playing it: the emotion
+    overlay, composing the clip and encoding it. Run it for the next chunk while the current
+    one plays and starting playback is just play_prepared_clip().
+    """
+    start = time.perf_counter()
+    generated_facial_data = merge_emotion_overlay(generated_facial_data, emotion_track)
+
     # Create a separate instance for encoding (to include blend in/out data).
     encoding_face = initialize_py_face()
-    encoded_facial_data = pre_encode_facial_data(generated_facial_data, encoding_face)
+    clip_frames = compose_clip(generated_facial_data, encoding_face)
 
-    with queue_lock:
-        stop_default_animation.set()
-        if default_animation_thread and default_animation_thread.is_alive():
-            default_animation_thread.join()
+    compositor = get_compositor()
+    encoded_facial_data = None if compositor.is_running() else encode_facial_frames(clip_frames, compositor.py_face)
+    return PreparedClip(audio_bytes, clip_frames, encoded_facial_data, received_time, time.perf_counter() - start)
 
-    start_event = Event()
 
-    audio_thread = Thread(target=play_audio_from_memory, args=(audio_bytes, start_event))
-    data_thread = Thread(target=send_pre_encoded_data_to_unreal, args=(encoded_facial_data, start_event, 60, socket_connection))
+def play_prepared_clip(clip: PreparedClip, socket_connection, start_event=None):
+    play_audio_with_animation(play_audio_from_memory, clip.audio_bytes, clip.clip_frames, socket_connection, start_event, clip.encoded_facial_data)
 
-    audio_thread.start()
-    data_thread.start()
-    
-    start_event.set()
-    
-    audio_thread.join()
-    data_thread.join()
 
-    with queue_lock:
-        stop_default_animation.clear()
-        default_animation_thread = Thread(target=default_animation_loop, args=(py_face,))
-        default_animation_thread.start()
+class GaplessClipPlayer:
+    """
+    Plays PreparedClips back to back on the continuous audio stream. A clip's audio is
+    appended as soon as play() gets it, so it starts on the sample the previous clip's audio
+    ends on; its animation starts when the stream reaches that sample, with frame 0 timed to
+    it, once the previous clip's animation is done. play() returns when the clip has started,
+    so the next clip can be appended while this one plays; finish() waits for the last one.
+    gaps holds the silence in seconds before each chunk's audio that was not spent waiting for it.
+    """
+
+    def __init__(self, socket_connection, stream=None) -> None:
+        self.socket_connection = socket_connection
+        self.stream = stream
+        self.gaps = []
+        self._animation = None
+        self._chunk = None
+
+    def play(self, clip: PreparedClip) -> None:
+        if self.stream is None:
+            from utils.audio.audio_stream import get_audio_stream
+            self.stream = get_audio_stream()
+        try:
+            chunk = self.stream.append(clip.audio_bytes)
+        except Exception as e:
+            print(f"Error queuing audio chunk: {e}")
+            return
+        if self._chunk is not None and not self._chunk.cancelled:
+            # Silence the player caused: not counting any wait for the item to arrive.
+            ready_frame = self._chunk.end_frame
+            if clip.received_time is not None:
+                ready_frame = max(ready_frame, self.stream.frame_at_time_ns(int(clip.received_time * 1e9)))
+            self.gaps.append(max(0, chunk.start_frame - ready_frame) / self.stream.sample_rate)
+
+        self._finish_animation()
+        self._chunk = chunk
+        if not chunk.wait_started():
+            return  # Cleared by stop_audio() before it was reached.
+        start_event = Event()
+        timing = {"audio_clock": chunk.position, "origin_clock": chunk.start_time_ns, "sync": FRAME_SYNC}
+        compositor = get_compositor()
+        if compositor.is_running():
+            self._animation = compositor.play_clip(clip.clip_frames, start_event, **timing)
+            start_event.set()
+            return
+
+        encoded_facial_data = clip.encoded_facial_data
+        if encoded_facial_data is None:
+            encoded_facial_data = encode_facial_frames(clip.clip_frames, compositor.py_face)
+        self._animation = Thread(target=send_pre_encoded_data_to_unreal, args=(encoded_facial_data, start_event, 60, self.socket_connection),
+                                 kwargs=timing)
+        self._animation.start()
+        start_event.set()
+
+    def finish(self) -> None:
+        """
+        Waits for the current clip's audio and animation to end.
+        """
+        self._finish_animation()
+        if self._chunk is not None:
+            self._chunk.wait_finished()
+
+    def _finish_animation(self) -> None:
+        animation, self._animation = self._animation, None
+        if animation is None:
+            return
+        if isinstance(animation, Thread):
+            animation.join()
+        else:
+            animation.done.wait()
+
+
+def run_audio_animation_from_bytes(audio_bytes, generated_facial_data, py_face, socket_connection, default_animation_thread):
+    play_prepared_clip(prepare_clip(audio_bytes, generated_facial_data), socket_connection)
 
 
 def run_audio_animation(audio_path, generated_facial_data, py_face, socket_connection, default_animation_thread):
-    # Check that generated_facial_data is not None, has at least one frame,
-    # and that the first frame has more than 61 columns.
-    if (generated_facial_data is not None and 
-        len(generated_facial_data) > 0 and 
-        len(generated_facial_data[0]) > 61):
-        
-        if isinstance(generated_facial_data, np.ndarray):
-            generated_facial_data = generated_facial_data.tolist()
-        
-        facial_data_array = np.array(generated_facial_data)
-        dominant_emotion = determine_highest_emotion(facial_data_array)
-        print(f"Dominant emotion: {dominant_emotion}")
-        if dominant_emotion in emotion_animations and len(emotion_animations[dominant_emotion]) > 0:
-            selected_animation = random.choice(emotion_animations[dominant_emotion])
-            generated_facial_data = merge_emotion_data_into_facial_data_wrapper(generated_facial_data, selected_animation, alpha=0.7)
-    
+    generated_facial_data = merge_emotion_overlay(generated_facial_data)
+
     # Create a temporary encoding instance for blending.
     encoding_face = initialize_py_face()
-    encoded_facial_data = pre_encode_facial_data(generated_facial_data, encoding_face)
+    clip_frames = compose_clip(generated_facial_data, encoding_face)
 
-    with queue_lock:
-        stop_default_animation.set()
-        if default_animation_thread and default_animation_thread.is_alive():
-            default_animation_thread.join()
+    play_audio_with_animation(play_audio_from_path, audio_path, clip_frames, socket_connection)
 
-    start_event = Event()
 
-    audio_thread = Thread(target=play_audio_from_path, args=(audio_path, start_event))
-    data_thread = Thread(target=send_pre_encoded_data_to_unreal, args=(encoded_facial_data, start_event, 60, socket_connection))
+class StreamedAudioPlayback:
+    """
+    Plays 16-bit mono PCM on the continuous audio stream while it is still arriving. tee()
+    passes the chunks through (to the NeuroSync upload) and queues them; once ready() returns
+    (the animation is prefilled) a feeder thread resamples them to the stream's rate as one
+    signal, so chunk boundaries leave no seams, and appends them back to back. sequence is the
+    ChunkSequence they play as, whose position() is the clock the animation follows; started is
+    set once the first audio is queued. Audio not yet queued when stop_audio() is called is dropped.
+    """
 
-    audio_thread.start()
-    data_thread.start()
-    
-    start_event.set()
-    
-    audio_thread.join()
-    data_thread.join()
+    def __init__(self, sample_rate: int, ready=None, stream=None) -> None:
+        if stream is None:
+            from utils.audio.audio_stream import get_audio_stream
+            stream = get_audio_stream()
+        self.stream = stream
+        self.sequence = ChunkSequence(stream)
+        self.started = Event()
+        self._resampler = StreamingResampler(sample_rate, stream.sample_rate)
+        self._ready = ready
+        self._queue = Queue()
+        self._stop_count = get_stop_count()
+        self._thread = Thread(target=self._feed, daemon=True)
+        self._thread.start()
+
+    def tee(self, audio_chunks):
+        try:
+            for chunk in audio_chunks:
+                self._queue.put(chunk)
+                yield chunk
+        finally:
+            self.end()
+
+    def end(self) -> None:
+        """
+        Marks the end of the audio. Safe to call more than once.
+        """
+        self._queue.put(None)
+
+    def finish(self) -> None:
+        """
+        Waits until all the audio has been queued and played (or dropped).
+        """
+        self._thread.join()
+        self.sequence.wait_finished()
+
+    def _feed(self) -> None:
+        try:
+            if self._ready is not None:
+                self._ready()
+            carry = b""
+            while True:
+                chunk = self._queue.get()
+                if chunk is None:
+                    samples = self._resampler.flush()
+                else:
+                    data = carry + bytes(chunk)
+                    usable = len(data) - len(data) % 2
+                    carry = data[usable:]
+                    samples = self._resampler.process(np.frombuffer(data, dtype="<i2", count=usable // 2))
+                if len(samples) and get_stop_count() == self._stop_count:
+                    self.sequence.add(self.stream.append(samples, self.stream.sample_rate, crossfade=not self.sequence.chunks))
+                    self.started.set()
+                if chunk is None:
+                    break
+        except Exception as e:
+            print(f"Error playing streamed audio: {e}")
+        finally:
+            self.sequence.close()
+            self.started.set()
+
+
+def run_streaming_animation(audio_chunks, socket_connection, start_event=None, url=LOCAL_STREAM_URL, prefill_frames: int = WINDOW_FRAMES,
+                            emotion_track=None, audio_clock=None, play_audio: bool = True, **stream_options):
+    """
+    Streams audio_chunks (16-bit mono PCM, e.g. straight from TTS; pass source_rate in
+    stream_options if it is not the stream's rate) to the NeuroSync streaming endpoint and
+    animates the face with each window of frames as it comes back, while later audio is still
+    being generated and uploaded. Windows are composed, get the emotion overlay, and go
+    through a FrameJitterBuffer drained by the compositor when it is running, otherwise by a
+    paced sender thread. Playback starts once start_event is set and prefill_frames are
+    buffered: one window covers the gap between windows when TTS runs at realtime; lower it if
+    TTS runs well ahead of realtime.
+    With play_audio the chunks are also played on the continuous audio stream (see
+    StreamedAudioPlayback), starting with the animation, and the compositor picks each frame
+    from that audio's position under FRAME_SYNC. Otherwise the caller plays the audio and may
+    pass its audio_clock. Blocks until the clip and its audio have played out; returns the
+    NeuroSyncStream.
+    """
+    if start_event is None:
+        start_event = Event()
+        start_event.set()
+    if emotion_track is None:
+        emotion_track = EmotionOverlayTrack(get_emotion_animations())
+
+    composer = StreamingClipComposer(initialize_py_face())
+    jitter_buffer = FrameJitterBuffer(prefill_frames)
+
+    def on_window(window):
+        jitter_buffer.put(composer.push(emotion_track.apply(window)))
+
+    def on_close(error):
+        # Blend out whatever arrived, even if the stream broke off early.
+        jitter_buffer.put(composer.finish())
+        jitter_buffer.close(error)
 
-    with queue_lock:
-        stop_default_animation.clear()
-        default_animation_thread = Thread(target=default_animation_loop, args=(py_face,))
-        default_animation_thread.start()
+    playback = None
+    timing = {"audio_clock": audio_clock, "sync": FRAME_SYNC}
+    if play_audio:
+        def ready(caller_start=start_event):
+            caller_start.wait()
+            jitter_buffer.wait_ready()
 
+        sample_rate = stream_options.get("source_rate") or stream_options.get("sample_rate", STREAM_SAMPLE_RATE)
+        playback = StreamedAudioPlayback(sample_rate, ready)
+        audio_chunks = playback.tee(audio_chunks)
+        # The frames start with the audio; a pause while later audio is late is not a stall.
+        start_event = playback.started
+        timing = {"audio_clock": playback.sequence.position, "sync": FRAME_SYNC, "stall_seconds": None}
 
+    def upload():
+        stream = stream_audio_chunks(audio_chunks, on_window, on_close, url, **stream_options)
+        if playback is not None:
+            for _ in audio_chunks:  # Audio the upload did not take (it failed) is still played.
+                pass
+        return stream
 
+    compositor = get_compositor()
+    try:
+        if compositor.is_running():
+            clip = compositor.play_stream(jitter_buffer, start_event, **timing)
+            stream = upload()
+            clip.done.wait()
+        else:
+            data_thread = Thread(target=send_streamed_frames_to_unreal, args=(jitter_buffer, start_event, 60, socket_connection, compositor.py_face),
+                                 kwargs={"audio_clock": timing["audio_clock"]})
+            data_thread.start()
+            stream = upload()
+            data_thread.join()
+    finally:
+        if playback is not None:
+            playback.end()
+            playback.finish()
 
+    print(f"{stream.summary()} | {jitter_buffer.summary()}")
+    return stream
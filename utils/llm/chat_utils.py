@@ -5,9 +5,6 @@ import json
 CHAT_LOGS_DIR = "chat_logs"
 MAX_CONTEXT_LENGTH = 5000
 
-# Ensure the directory exists
-os.makedirs(CHAT_LOGS_DIR, exist_ok=True)
-
 def load_chat_history():
     """Loads chat history from the log file."""
     log_file = os.path.join(CHAT_LOGS_DIR, "chat_history.json")
@@ -23,5 +20,6 @@ def save_chat_log(chat_history):
     while total_length > MAX_CONTEXT_LENGTH and chat_history:
         chat_history.pop(0)
         total_length = sum(len(json.dumps(entry)) for entry in chat_history)
+    os.makedirs(CHAT_LOGS_DIR, exist_ok=True)
     with open(log_file, "w", encoding="utf-8") as f:
         json.dump(chat_history, f, indent=4)
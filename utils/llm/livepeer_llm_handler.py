@@ -2,7 +2,6 @@ import os, re
 import requests
 import json
 import time
-from livepeer_ai import Livepeer
 from queue import Queue
 
 LIVEPEER_BEARER_TOKEN = os.getenv("LIVEPEER_BEARER_TOKEN", "eliza-app-llm")
@@ -34,7 +33,8 @@ def get_livepeer_response(messages, chunk_queue=None, max_tokens=256, temperatur
 
     full_response = ""
     
-    # Connect using the Python SDK
+    # Connect using the Python SDK (imported on first use to keep startup light)
+    from livepeer_ai import Livepeer
     with Livepeer(http_bearer=LIVEPEER_BEARER_TOKEN) as livepeer:
         if USE_STREAMING and chunk_queue:
             # Use direct requests for streaming to have more control
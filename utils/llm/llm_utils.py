@@ -1,5 +1,4 @@
 import requests
-import openai
 from threading import Thread
 from queue import Queue
 import re
@@ -255,6 +254,7 @@ def stream_llm_chunks(user_input, chat_history, chunk_queue, config):
     else:
         # Using OpenAI's API
         try:
+            import openai  # Imported on first use; most setups never reach this branch.
             openai.api_key = config["OPENAI_API_KEY"]
             if USE_STREAMING:
                 response = openai.ChatCompletion.create(
@@ -6,7 +6,7 @@
 import asyncio
 import base64
 
-from openai import AsyncOpenAI
+RESPONSE_END = b""  # Put on the conversion queue after the last audio chunk of each response.
 
 # -------------------------------
 # Helper Functions and Utilities
@@ -116,6 +116,7 @@ async def process_events(connection, conversion_queue, min_buffer_size):
                 current_audio = bytes(audio_buffer)
                 audio_buffer.clear()
                 conversion_queue.put(current_audio)
+            conversion_queue.put(RESPONSE_END)
             break
 
         # Process text delta events
@@ -153,6 +154,7 @@ async def persistent_realtime_handler(audio_input_queue, conversion_queue, realt
     Main handler that establishes a persistent realtime connection and processes conversation items.
     It reconnects automatically upon errors.
     """
+    from openai import AsyncOpenAI  # Imported on first use to keep startup light.
     client = AsyncOpenAI(api_key=api_key)
     while True:
         try:
@@ -4,43 +4,29 @@
 
 
 import time
-from threading import Thread, Lock
+from threading import Lock
 
-from livelink.animations.default_animation import default_animation_loop, stop_default_animation
-from livelink.send_to_unreal import pre_encode_facial_data_blend_in, pre_encode_facial_data_blend_out, pre_encode_facial_data
-from utils.generated_runners import play_audio_and_animation_openai_realtime
+from livelink.send_to_unreal import compose_clip
+from utils.generated_runners import play_audio_and_animation_openai_realtime, merge_emotion_overlay
 
 queue_lock = Lock()
 
 
-def check_and_restart_default_animation(accumulated_audio, encoded_facial_data, audio_face_queue, py_face):
+def playback_loop(stop_worker, start_event, accumulated_audio, composed_frames, audio_face_queue, py_face, socket_connection, default_animation_thread, log_queue):
     """
-    Restarts default animation if no data is available.
-    """
-    with queue_lock:
-        if not accumulated_audio and not encoded_facial_data and audio_face_queue.empty():
-            stop_default_animation.clear()
-            new_default_thread = Thread(target=default_animation_loop, args=(py_face,))
-            new_default_thread.start()
-
-def playback_loop(stop_worker, start_event, accumulated_audio, encoded_facial_data, audio_face_queue, py_face, socket_connection, default_animation_thread, log_queue):
-    """
-    Continuously plays accumulated audio and encoded facial data.
+    Continuously plays accumulated audio and composed facial frames.
+    The compositor falls back to the idle loop by itself between chunks.
     """
     while not stop_worker.is_set():
         with queue_lock:
-            if not accumulated_audio or not encoded_facial_data:
+            if not accumulated_audio or not composed_frames:
                 time.sleep(0.01)
                 continue
 
             playback_audio = accumulated_audio[:]
-            playback_facial_data = encoded_facial_data[:]
+            playback_facial_data = composed_frames[:]
             accumulated_audio.clear()
-            encoded_facial_data.clear()
-
-        stop_default_animation.set()
-        if default_animation_thread and default_animation_thread.is_alive():
-            default_animation_thread.join()
+            composed_frames.clear()
 
         playback_start_time = time.time()
 
@@ -51,25 +37,26 @@ def playback_loop(stop_worker, start_event, accumulated_audio, encoded_facial_da
 
         time.sleep(0.01)
 
-        check_and_restart_default_animation(accumulated_audio, encoded_facial_data, audio_face_queue, py_face)
-
 
-def accumulate_data(audio_bytes, facial_data, accumulated_audio, accumulated_facial_data, encoded_facial_data, py_face, single_entry=False):
+def accumulate_data(audio_bytes, facial_data, accumulated_audio, accumulated_facial_data, composed_frames, py_face, single_entry=False, emotion_track=None):
     """
-    Accumulates incoming audio and facial data while pre-encoding facial animation.
+    Accumulates incoming audio and facial data while composing the facial animation frames.
     
     If single_entry is True (i.e. only one entry is present),
-    then we call pre_encode_facial_data (which blends in and out).
-    Otherwise, the first entry uses pre_encode_facial_data_blend_in and subsequent entries use pre_encode_facial_data_blend_out.
+    then the clip is composed with both blend in and blend out.
+    Otherwise, the first entry is blended in and subsequent entries are blended out.
+    With an emotion_track, the chunk gets the emotion overlay detected so far in the stream.
     """
+    if emotion_track is not None:
+        facial_data = merge_emotion_overlay(facial_data, emotion_track)
     with queue_lock:
         accumulated_audio.extend(audio_bytes)
         if len(accumulated_facial_data) == 0:
             if single_entry:
-                # Changed: For a single entry, pre-encode with both blend in and out.
-                encoded_facial_data.extend(pre_encode_facial_data(facial_data, py_face))
+                # Changed: For a single entry, compose with both blend in and out.
+                composed_frames.extend(compose_clip(facial_data, py_face))
             else:
-                encoded_facial_data.extend(pre_encode_facial_data_blend_in(facial_data, py_face))
+                composed_frames.extend(compose_clip(facial_data, py_face, blend_out=False))
         else:
-            encoded_facial_data.extend(pre_encode_facial_data_blend_out(facial_data, py_face))
+            composed_frames.extend(compose_clip(facial_data, py_face, blend_in=False))
         accumulated_facial_data.extend(facial_data)
@@ -0,0 +1,279 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# blendshape_cache.py
+# Content-addressed cache of NeuroSync results. The key hashes the audio samples (not the file
+# bytes, so a re-saved WAV with a different header still hits) together with the model version
+# and the endpoint that produced the result, since a local and a remote server can run different models.
+# Entries live in a small in-memory LRU and in a size-capped directory of float32 .npy files;
+# audio that is already in the generated/ library is stored as a .link to its shapes file
+# instead of a second copy.
+
+import hashlib
+import os
+import wave
+from collections import OrderedDict
+from io import BytesIO
+from threading import Lock
+
+import numpy as np
+
+from utils.audio.audio_buffer import AudioBuffer
+from utils.resources import register_resource, get_resource
+
+CACHE_DIR = os.path.join("cache", "blendshapes")
+MEMORY_ENTRIES = 64
+MAX_DISK_BYTES = 512 * 1024 * 1024
+
+
+def normalize_audio(audio_bytes):
+    """
+    Returns (format_tag, samples) for hashing: the PCM frames and their format for a PCM WAV
+    file, or the bytes as they are (raw PCM or a compressed format) otherwise. An AudioBuffer
+    gets the key its WAV encoding would, hashed from its samples in place.
+    """
+    if isinstance(audio_bytes, AudioBuffer):
+        buffer = audio_bytes
+        if buffer.encoded is None or buffer.encoded[:4] == b"RIFF" and buffer.is_pcm16:
+            pcm = np.ascontiguousarray(buffer.as_int16())
+            return f"pcm:{buffer.sample_rate}:{buffer.channels}:2", memoryview(pcm).cast("B")
+        audio_bytes = buffer.encoded
+    if audio_bytes[:4] == b"RIFF":
+        try:
+            with wave.open(BytesIO(audio_bytes), "rb") as wav_file:
+                tag = f"pcm:{wav_file.getframerate()}:{wav_file.getnchannels()}:{wav_file.getsampwidth()}"
+                return tag, wav_file.readframes(wav_file.getnframes())
+        except (wave.Error, EOFError):
+            pass
+    return "raw", bytes(audio_bytes)
+
+
+def audio_cache_key(audio_bytes, model_version: str, endpoint: str = "") -> str:
+    tag, samples = normalize_audio(audio_bytes)
+    digest = hashlib.sha256(f"{model_version}|{endpoint}|{tag}|".encode("utf-8"))
+    digest.update(samples)
+    return digest.hexdigest()
+
+
+def model_tag(model_version: str, endpoint: str = "") -> str:
+    """
+    Short hash of the model version and endpoint, for naming blendshapes stored outside this
+    cache (next to cached TTS audio) so results from another model are not picked up.
+    """
+    return hashlib.sha256(f"{model_version}|{endpoint}".encode("utf-8")).hexdigest()[:16]
+
+
+class BlendshapeCache:
+    """
+    Thread-safe two-level cache of (frames, dimensions) float32 blendshape arrays. Arrays
+    returned by get() are read-only and may be shared between callers. The disk store is
+    trimmed to max_disk_bytes, least recently used first.
+    """
+
+    def __init__(self, directory=CACHE_DIR, memory_entries=MEMORY_ENTRIES, max_disk_bytes=MAX_DISK_BYTES) -> None:
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = Lock()
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()  # key -> size in bytes, least recently used first
+        self._disk_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.link_hits = 0
+        self.misses = 0
+        self._scan()
+
+    # -------------------- Lookup --------------------
+    def get(self, key: str):
+        """
+        Returns the cached array for key, or None.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        blendshapes = self._load_npy(key)
+        if blendshapes is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            blendshapes = self._load_link(key)
+            with self._lock:
+                if blendshapes is None:
+                    self.misses += 1
+                    return None
+                self.link_hits += 1
+        self._remember(key, blendshapes)
+        return blendshapes
+
+    def _load_npy(self, key: str):
+        path = self._npy_path(key)
+        try:
+            blendshapes = np.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+        return blendshapes
+
+    def _load_link(self, key: str):
+        path = self._link_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                shapes_path = f.read().strip()
+        except OSError:
+            return None
+        try:
+            from utils.files.file_utils import load_facial_data_from_csv
+            return np.asarray(load_facial_data_from_csv(shapes_path), dtype=np.float32)
+        except Exception as e:
+            print(f"Dropping blendshape cache link to {shapes_path}: {e}")
+            self._remove(path)
+            return None
+
+    # -------------------- Storage --------------------
+    def put(self, key: str, blendshapes) -> np.ndarray:
+        """
+        Stores blendshapes in memory and on disk. Returns the cached (read-only) array, which is
+        a copy unless blendshapes already was a read-only float32 array.
+        """
+        blendshapes = np.asarray(blendshapes, dtype=np.float32)
+        if blendshapes.flags.writeable:
+            blendshapes = blendshapes.copy()
+        blendshapes = self._remember(key, blendshapes)
+        path = self._npy_path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                np.save(f, blendshapes)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not write blendshape cache entry {key}: {e}")
+            return blendshapes
+        self._remove(self._link_path(key))
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self._disk_bytes += size - self._disk.pop(key, 0)
+            self._disk[key] = size
+            evicted = self._evict()
+        for old_key in evicted:
+            self._remove(self._npy_path(old_key))
+        return blendshapes
+
+    def link(self, key: str, shapes_path: str) -> None:
+        """
+        Records that the blendshapes for key are stored at shapes_path (a generated/ shapes file),
+        replacing a cached copy of them on disk.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._link_path(key), "w", encoding="utf-8") as f:
+                f.write(os.path.abspath(shapes_path))
+        except OSError as e:
+            print(f"Could not link blendshape cache entry {key}: {e}")
+            return
+        if self._remove(self._npy_path(key)):
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+
+    def remember(self, key: str, blendshapes) -> np.ndarray:
+        """
+        Keeps blendshapes in the memory LRU only, for results that are already stored elsewhere.
+        """
+        blendshapes = np.asarray(blendshapes, dtype=np.float32)
+        if blendshapes.flags.writeable:
+            blendshapes = blendshapes.copy()
+        return self._remember(key, blendshapes)
+
+    def _remember(self, key: str, blendshapes) -> np.ndarray:
+        blendshapes.setflags(write=False)
+        with self._lock:
+            self._memory[key] = blendshapes
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return blendshapes
+
+    def _evict(self):
+        evicted = []
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            evicted.append(key)
+        return evicted
+
+    def _scan(self) -> None:
+        """
+        Loads the sizes of the existing disk entries, ordered by last use (file mtime).
+        """
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".npy")]
+        except OSError:
+            return
+        entries = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        for key in self._evict():
+            self._remove(self._npy_path(key))
+
+    def _npy_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def _link_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.link")
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    # -------------------- Stats --------------------
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits + self.link_hits
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "link_hits": self.link_hits,
+            "misses": self.misses,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def summary(self) -> str:
+        return (f"Blendshape cache: {self.hits} hits (memory {self.memory_hits}, disk {self.disk_hits}, "
+                f"generated {self.link_hits}), {self.misses} misses, "
+                f"{len(self._disk)} entries / {self._disk_bytes / (1024 * 1024):.1f} MB on disk")
+
+
+register_resource("blendshape_cache", BlendshapeCache)
+
+def get_blendshape_cache() -> BlendshapeCache:
+    return get_resource("blendshape_cache")
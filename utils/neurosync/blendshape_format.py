@@ -0,0 +1,122 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# blendshape_format.py
+# Compact binary blendshape payload: a 16-byte header followed by a little-endian float32
+# (frames, dimensions) matrix, decoded with np.frombuffer straight into the clip array.
+#
+#   offset  size  field
+#   0       4     magic b"NSBS"
+#   4       2     format version (uint16 LE)
+#   6       2     reserved, 0
+#   8       4     frame count (uint32 LE)
+#   12      4     dimensions per frame (uint32 LE)
+#   16      ...   frames * dimensions float32 LE, row-major
+#
+# The streaming endpoint answers with a chunked body of back-to-back payloads, one per window
+# of frames, under STREAM_CONTENT_TYPE.
+
+import json
+import struct
+
+import numpy as np
+
+BINARY_CONTENT_TYPE = "application/x-neurosync-blendshapes"
+JSON_CONTENT_TYPE = "application/json"
+# Sent by the client: binary preferred, JSON accepted from servers that do not support it.
+ACCEPT_HEADER = f"{BINARY_CONTENT_TYPE}, {JSON_CONTENT_TYPE};q=0.9"
+STREAM_CONTENT_TYPE = "application/x-neurosync-blendshape-stream"
+
+MAGIC = b"NSBS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+
+
+def encode_blendshapes_binary(blendshapes) -> bytes:
+    """
+    Encodes a (frames, dimensions) array as a binary payload.
+    """
+    matrix = np.ascontiguousarray(blendshapes, dtype="<f4")
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(matrix), -1) if matrix.size else np.empty((0, 0), dtype="<f4")
+    frames, dimensions = matrix.shape
+    return HEADER.pack(MAGIC, FORMAT_VERSION, 0, frames, dimensions) + matrix.tobytes()
+
+
+def _unpack_header(payload):
+    """
+    Validates a payload header and returns (frames, dimensions). Raises ValueError if malformed.
+    """
+    if len(payload) < HEADER.size:
+        raise ValueError(f"Blendshape payload too short: {len(payload)} bytes.")
+    magic, version, _, frames, dimensions = HEADER.unpack_from(payload)
+    if magic != MAGIC:
+        raise ValueError(f"Not a blendshape payload (magic {magic!r}).")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported blendshape payload version {version}.")
+    return frames, dimensions
+
+
+def decode_blendshapes_binary(payload) -> np.ndarray:
+    """
+    Decodes a binary payload into a read-only (frames, dimensions) float32 array that shares
+    memory with payload. Raises ValueError if the payload is malformed.
+    """
+    frames, dimensions = _unpack_header(payload)
+    expected = HEADER.size + frames * dimensions * 4
+    if len(payload) != expected:
+        raise ValueError(f"Blendshape payload is {len(payload)} bytes, expected {expected} for {frames}x{dimensions}.")
+    values = np.frombuffer(payload, dtype="<f4", count=frames * dimensions, offset=HEADER.size)
+    return values.reshape(frames, dimensions)
+
+
+def _read_exactly(read, size: int) -> bytes:
+    data = read(size)
+    if len(data) == size or not data:
+        return data
+    parts = [data]
+    received = len(data)
+    while received < size:
+        data = read(size - received)
+        if not data:
+            break
+        parts.append(data)
+        received += len(data)
+    return b"".join(parts)
+
+
+def read_blendshape_window(read):
+    """
+    Reads the next payload from a stream of back-to-back payloads, where read(n) returns up to
+    n bytes (b"" at the end). Returns a read-only (frames, dimensions) float32 array, or None at
+    a clean end of stream. Raises ValueError on a malformed or truncated payload.
+    """
+    header = _read_exactly(read, HEADER.size)
+    if not header:
+        return None
+    frames, dimensions = _unpack_header(header)
+    size = frames * dimensions * 4
+    body = _read_exactly(read, size)
+    if len(body) != size:
+        raise ValueError(f"Blendshape stream ended {size - len(body)} bytes into a {frames}x{dimensions} window.")
+    return np.frombuffer(body, dtype="<f4").reshape(frames, dimensions)
+
+
+def parse_blendshapes_from_json(json_response) -> np.ndarray:
+    """
+    Converts the JSON "blendshapes" list of frames into a (frames, dimensions) float32 array.
+    """
+    blendshapes = np.asarray(json_response.get("blendshapes", []), dtype=np.float32)
+    if blendshapes.ndim != 2:
+        return blendshapes.reshape(len(blendshapes), -1) if blendshapes.size else np.empty((0, 0), dtype=np.float32)
+    return blendshapes
+
+
+def decode_blendshape_response(content_type, body: bytes) -> np.ndarray:
+    """
+    Decodes a NeuroSync response body according to its Content-Type (binary or JSON).
+    """
+    if content_type and content_type.split(";")[0].strip() == BINARY_CONTENT_TYPE:
+        return decode_blendshapes_binary(body)
+    return parse_blendshapes_from_json(json.loads(body))
@@ -2,47 +2,239 @@
 # For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
 # Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
 
-import requests
 import json
+import random
+import time
+from collections import deque
+from threading import Lock
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+
+from utils.audio.audio_buffer import to_audio_bytes
+from utils.resources import register_resource, get_resource
+from utils.neurosync.blendshape_format import ACCEPT_HEADER, JSON_CONTENT_TYPE, decode_blendshape_response
+from utils.neurosync.blendshape_cache import audio_cache_key, model_tag, get_blendshape_cache
 
 API_KEY = "YOUR-NEUROSYNC-API-KEY"  # Your API key
 REMOTE_URL = "https://api.neurosync.info/audio_to_blendshapes"  # External API URL
 LOCAL_URL = "http://127.0.0.1:5000/audio_to_blendshapes"  # Local URL
 
-def send_audio_to_neurosync(audio_bytes, use_local=True):
-    try:
-        # Use the local or remote URL depending on the flag
-        url = LOCAL_URL if use_local else REMOTE_URL
-        headers = {}
+CONNECT_TIMEOUT = 3.05  # Seconds to establish a connection.
+READ_TIMEOUT = 60.0  # Seconds to wait for blendshapes; long clips take a while on the server.
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.25  # Base delay in seconds, doubled per attempt and jittered.
+RETRY_DEADLINE = 20.0  # No retry starts later than this many seconds after the first attempt.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MODEL_VERSION = "1"  # Part of every cache key: bump it when the model behind the API changes.
+
+
+class NeuroSyncClient:
+    """
+    Keep-alive HTTP client for the NeuroSync API. One pooled session is reused for every
+    request, so consecutive chunks skip the TCP/TLS handshake. Failed connections (including
+    connect timeouts) and retryable status codes are retried up to max_retries times with jittered
+    exponential backoff, as long as the retry would start within retry_deadline seconds of the
+    first attempt. A read timeout is not retried: the server may still be working on the audio.
+    The latency of each call (including retries) is recorded for latency_summary().
+    With accept_binary the client asks for the compact binary blendshape format and falls back
+    to JSON when the server answers with JSON.
+    With use_cache, results are kept in the shared BlendshapeCache under a hash of the audio,
+    model_version and the endpoint, and audio that was already processed never reaches the network.
+    """
+
+    def __init__(self, local_url=LOCAL_URL, remote_url=REMOTE_URL, api_key=API_KEY,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, retry_backoff=RETRY_BACKOFF, pool_size=8, accept_binary=True,
+                 model_version=MODEL_VERSION, use_cache=True, retry_deadline=RETRY_DEADLINE) -> None:
+        self.local_url = local_url
+        self.remote_url = remote_url
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_deadline = retry_deadline
+        self.accept = ACCEPT_HEADER if accept_binary else JSON_CONTENT_TYPE
+        self.model_version = model_version
+        self.use_cache = use_cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._stats_lock = Lock()
+        self.latencies = deque(maxlen=1000)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+
+    def close(self) -> None:
+        self.session.close()
+
+    def endpoint(self, use_local=True) -> str:
+        return self.local_url if use_local else self.remote_url
+
+    def cache_key(self, audio_bytes, use_local=True) -> str:
+        """
+        The blendshape cache key for audio_bytes as processed by the local or remote endpoint.
+        """
+        return audio_cache_key(audio_bytes, self.model_version, self.endpoint(use_local))
+
+    def model_tag(self, use_local=True) -> str:
+        return model_tag(self.model_version, self.endpoint(use_local))
+
+    def send_audio(self, audio_bytes, use_local=True, refresh_cache=False):
+        """
+        Sends audio to the local or remote API and returns the blendshapes as a (frames, dimensions)
+        float32 array, or None on error. Cached results are returned without a request unless
+        refresh_cache is set, in which case the fresh result replaces the cached one.
+        """
+        key = None
+        if self.use_cache:
+            key = self.cache_key(audio_bytes, use_local)
+            if not refresh_cache:
+                cached = get_blendshape_cache().get(key)
+                if cached is not None:
+                    return cached
+
+        blendshapes = self._request_blendshapes(audio_bytes, use_local)
+        if key is not None and blendshapes is not None and len(blendshapes) > 0:
+            blendshapes = get_blendshape_cache().put(key, blendshapes)
+        return blendshapes
+
+    def _request_blendshapes(self, audio_bytes, use_local):
+        url = self.endpoint(use_local)
+        headers = {"Accept": self.accept}
         if not use_local:
-            headers["API-Key"] = API_KEY
+            headers["API-Key"] = self.api_key
+        try:
+            response = self.post_audio(audio_bytes, url, headers)
+            response.raise_for_status()
+            return decode_blendshape_response(response.headers.get("Content-Type"), response.content)
+        except requests.exceptions.RequestException as e:
+            print(f"Request error: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"JSON parsing error: {e}")
+            return None
+        except ValueError as e:
+            print(f"Blendshape payload error: {e}")
+            return None
 
-        response = post_audio_bytes(audio_bytes, url, headers)
-        response.raise_for_status()  
-        json_response = response.json()
-        return parse_blendshapes_from_json(json_response)
+    def post_audio(self, audio_bytes, url, headers=None) -> requests.Response:
+        """
+        POSTs audio_bytes (or an AudioBuffer's encoded bytes) to url, retrying failed connections
+        and retryable statuses. Returns the last response (which may still carry an error status)
+        or raises the last error. headers is copied, never modified.
+        """
+        headers = dict(headers or {})
+        headers["Content-Type"] = "application/octet-stream"
+        audio_bytes = to_audio_bytes(audio_bytes)
+        start = time.perf_counter()
+        ok = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                delay = self.retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                try:
+                    response = self.session.post(url, headers=headers, data=audio_bytes, timeout=self.timeout)
+                except requests.exceptions.RequestException as e:
+                    if not _connect_failed(e) or not self._may_retry(attempt, start, delay):
+                        raise
+                    print(f"NeuroSync request failed ({e.__class__.__name__}), retrying...")
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or not self._may_retry(attempt, start, delay):
+                        ok = response.ok
+                        return response
+                    print(f"NeuroSync returned {response.status_code}, retrying...")
+                self._record_retry()
+                time.sleep(delay)
+        finally:
+            self._record_call(time.perf_counter() - start, ok)
 
-    except requests.exceptions.RequestException as e:
-        print(f"Request error: {e}")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"JSON parsing error: {e}")
-        return None
+    def _may_retry(self, attempt, start, delay) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        return time.perf_counter() + delay - start <= self.retry_deadline
 
-def validate_audio_bytes(audio_bytes):
-    return audio_bytes is not None and len(audio_bytes) > 0
+    def _record_retry(self) -> None:
+        with self._stats_lock:
+            self.retries += 1
+
+    def _record_call(self, seconds, ok) -> None:
+        with self._stats_lock:
+            self.calls += 1
+            self.failures += 0 if ok else 1
+            self.latencies.append(seconds)
+
+    def latency_percentile_ms(self, percentile: float) -> float:
+        with self._stats_lock:
+            latencies = list(self.latencies)
+        if not latencies:
+            return 0.0
+        return float(np.percentile(latencies, percentile)) * 1000.0
+
+    @property
+    def last_latency_ms(self):
+        with self._stats_lock:
+            return self.latencies[-1] * 1000.0 if self.latencies else None
+
+    def latency_summary(self) -> str:
+        return (f"NeuroSync calls: {self.calls}, failures: {self.failures}, retries: {self.retries}, "
+                f"latency p50: {self.latency_percentile_ms(50):.1f} ms, p95: {self.latency_percentile_ms(95):.1f} ms")
+
+
+def _connect_failed(error) -> bool:
+    """
+    True if the request failed to connect (refused, reset, or a connect timeout). A read timeout
+    is not, whether requests raises it as ReadTimeout or, while reading the body, as ConnectionError.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    reason = error.args[0] if error.args else None
+    return not isinstance(reason, ReadTimeoutError)
 
-def post_audio_bytes(audio_bytes, url, headers):
-    headers["Content-Type"] = "application/octet-stream"
-    response = requests.post(url, headers=headers, data=audio_bytes)
-    return response
 
-def parse_blendshapes_from_json(json_response):
-    blendshapes = json_response.get("blendshapes", [])
-    facial_data = []
+# One client per process, so every caller shares the same connection pool.
+register_resource("neurosync_client", NeuroSyncClient)
 
-    for frame in blendshapes:
-        frame_data = [float(value) for value in frame]
-        facial_data.append(frame_data)
+def get_neurosync_client() -> NeuroSyncClient:
+    return get_resource("neurosync_client")
 
-    return facial_data
+def send_audio_to_neurosync(audio_bytes, use_local=True, refresh_cache=False):
+    return get_neurosync_client().send_audio(audio_bytes, use_local, refresh_cache)
+
+def link_generated_blendshapes(audio_bytes, shapes_path, use_local=True):
+    """
+    Points the blendshape cache entry for audio_bytes at a shapes file in the generated/
+    library, so the cache shares that copy instead of keeping its own.
+    """
+    client = get_neurosync_client()
+    if client.use_cache:
+        get_blendshape_cache().link(client.cache_key(audio_bytes, use_local), shapes_path)
+
+def prime_cached_blendshapes(audio_bytes, blendshapes, use_local=True):
+    """
+    Makes blendshapes computed ahead of time (e.g. stored with cached TTS audio) the in-memory
+    result for audio_bytes from the local or remote endpoint, so sending that audio there does
+    not reach the API.
+    """
+    client = get_neurosync_client()
+    if client.use_cache:
+        get_blendshape_cache().remember(client.cache_key(audio_bytes, use_local), blendshapes)
+
+def blendshape_model_tag(use_local=True):
+    """
+    Tag of the model version and endpoint the shared client sends audio to; see model_tag.
+    """
+    return get_neurosync_client().model_tag(use_local)
+
+def validate_audio_bytes(audio_bytes):
+    return audio_bytes is not None and len(to_audio_bytes(audio_bytes)) > 0
+
+def post_audio_bytes(audio_bytes, url, headers):
+    return get_neurosync_client().post_audio(audio_bytes, url, headers)
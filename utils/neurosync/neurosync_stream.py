@@ -0,0 +1,220 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# neurosync_stream.py
+# Streaming NeuroSync inference over one full-duplex chunked HTTP request: audio is uploaded
+# chunk by chunk as TTS produces it, while a reader thread decodes the windows of blendshape
+# frames the server sends back as soon as it has audio for them. The first frames arrive one
+# window after the first audio, not after the whole utterance has been generated and uploaded.
+
+import socket
+import time
+from http.client import HTTPConnection, HTTPSConnection, HTTPResponse, HTTPException
+from threading import Event, Lock, Thread
+from urllib.parse import urlsplit
+
+from utils.neurosync.blendshape_format import STREAM_CONTENT_TYPE, read_blendshape_window
+
+LOCAL_STREAM_URL = "http://127.0.0.1:5000/audio_to_blendshapes_stream"  # Local streaming URL
+
+STREAM_SAMPLE_RATE = 88200  # 16-bit mono PCM, as sent to the batch endpoint.
+WINDOW_FRAMES = 30  # Frames per window the server is asked for (0.5 s at 60 fps).
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 60.0  # Longest silence tolerated between windows (or between uploads).
+
+
+class NeuroSyncStream:
+    """
+    One streaming inference request. Call start(), then send() each chunk of 16-bit mono PCM as
+    it arrives and finish() after the last one. on_window(frames) is called from the reader
+    thread with each (frames, dimensions) float32 window in order, and on_close(error) once the
+    response has ended (error is None on success).
+    """
+
+    def __init__(self, url=LOCAL_STREAM_URL, on_window=None, on_close=None, sample_rate=STREAM_SAMPLE_RATE,
+                 window_frames=WINDOW_FRAMES, api_key=None, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT) -> None:
+        self.url = url
+        self.on_window = on_window
+        self.on_close = on_close
+        self.sample_rate = sample_rate
+        self.window_frames = window_frames
+        self.api_key = api_key
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self.error = None
+        self.bytes_sent = 0
+        self.windows_received = 0
+        self.frames_received = 0
+        self.first_send_time = None
+        self.first_window_time = None
+        self.finish_time = None
+        self.done = Event()
+
+        self._sock = None
+        self._send_lock = Lock()
+        self._reader = None
+
+    # -------------------- Upload --------------------
+    def start(self) -> bool:
+        """
+        Opens the connection, sends the request headers and starts the reader thread.
+        Returns False (after calling on_close with the error) if the server cannot be reached.
+        """
+        parts = urlsplit(self.url)
+        connection_class = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+        connection = connection_class(parts.hostname, parts.port, timeout=self.connect_timeout)
+        try:
+            connection.putrequest("POST", parts.path + (f"?{parts.query}" if parts.query else ""))
+            connection.putheader("Content-Type", "application/octet-stream")
+            connection.putheader("Transfer-Encoding", "chunked")
+            connection.putheader("Accept", STREAM_CONTENT_TYPE)
+            connection.putheader("X-Audio-Sample-Rate", str(self.sample_rate))
+            connection.putheader("X-Window-Frames", str(self.window_frames))
+            if self.api_key:
+                connection.putheader("API-Key", self.api_key)
+            connection.endheaders()
+        except (OSError, HTTPException) as e:
+            connection.close()
+            self._close(e)
+            return False
+
+        # From here on the socket is used directly: http.client cannot read a response
+        # while the request body is still being written.
+        self._sock = connection.sock
+        self._sock.settimeout(self.read_timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = Thread(target=self._read_windows, daemon=True)
+        self._reader.start()
+        return True
+
+    def send(self, pcm_bytes) -> bool:
+        """
+        Uploads one chunk of audio. Returns False once the stream has failed or ended.
+        """
+        if self._sock is None or self.done.is_set():
+            return False
+        data = pcm_bytes if isinstance(pcm_bytes, bytes) else bytes(pcm_bytes)
+        if not data:
+            return True
+        with self._send_lock:
+            if self.first_send_time is None:
+                self.first_send_time = time.perf_counter()
+            try:
+                self._sock.sendall(b"%X\r\n%s\r\n" % (len(data), data))
+            except OSError as e:
+                self._fail(e)
+                return False
+            self.bytes_sent += len(data)
+        return True
+
+    def finish(self) -> bool:
+        """
+        Ends the upload; the server then sends the remaining frames and closes the response.
+        """
+        if self._sock is None or self.done.is_set():
+            return False
+        with self._send_lock:
+            try:
+                self._sock.sendall(b"0\r\n\r\n")
+            except OSError as e:
+                self._fail(e)
+                return False
+        return True
+
+    def wait(self, timeout=None) -> bool:
+        """
+        Waits for the response to end. Returns False on timeout.
+        """
+        return self.done.wait(timeout)
+
+    def close(self) -> None:
+        """
+        Aborts the stream if it is still running.
+        """
+        if not self.done.is_set():
+            self._fail(ConnectionAbortedError("NeuroSync stream closed by the client."))
+
+    # -------------------- Download --------------------
+    def _read_windows(self) -> None:
+        error = None
+        try:
+            response = HTTPResponse(self._sock, method="POST")
+            response.begin()
+            if response.status != 200:
+                raise HTTPException(f"NeuroSync stream returned {response.status} {response.reason}")
+            content_type = (response.getheader("Content-Type") or "").split(";")[0].strip()
+            if content_type != STREAM_CONTENT_TYPE:
+                raise ValueError(f"Unexpected NeuroSync stream Content-Type '{content_type}'.")
+
+            while True:
+                window = read_blendshape_window(response.read)
+                if window is None:
+                    break
+                if self.first_window_time is None:
+                    self.first_window_time = time.perf_counter()
+                self.windows_received += 1
+                self.frames_received += len(window)
+                if self.on_window is not None and len(window) > 0:
+                    self.on_window(window)
+        except Exception as e:  # Network, protocol or on_window errors all end the stream.
+            error = e
+        self._close(error)
+
+    def _fail(self, error) -> None:
+        # Unblocks the reader thread, which then reports the error through _close.
+        if self.error is None:
+            self.error = error
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _close(self, error) -> None:
+        if self.done.is_set():
+            return
+        self.error = self.error or error
+        self.finish_time = time.perf_counter()
+        if self.error is not None:
+            print(f"NeuroSync stream error: {self.error}")
+        if self._sock is not None:
+            self._sock.close()
+        self.done.set()
+        if self.on_close is not None:
+            self.on_close(self.error)
+
+    # -------------------- Stats --------------------
+    @property
+    def first_frame_latency_ms(self):
+        """
+        Time from the first audio upload to the first window of frames, or None.
+        """
+        if self.first_send_time is None or self.first_window_time is None:
+            return None
+        return (self.first_window_time - self.first_send_time) * 1000.0
+
+    def summary(self) -> str:
+        latency = self.first_frame_latency_ms
+        return (f"NeuroSync stream: {self.bytes_sent} audio bytes, {self.windows_received} windows, "
+                f"{self.frames_received} frames, first frame after "
+                f"{'n/a' if latency is None else f'{latency:.1f} ms'}")
+
+
+def stream_audio_chunks(audio_chunks, on_window, on_close=None, url=LOCAL_STREAM_URL, source_rate=None, **stream_options) -> NeuroSyncStream:
+    """
+    Uploads every chunk of audio_chunks (an iterable that may block while TTS generates more)
+    and returns the stream once the upload has finished; frames keep arriving through on_window
+    until stream.done is set. Chunks at a source_rate other than the stream's (24 kHz from
+    Kokoro, say) are resampled as they arrive.
+    """
+    stream = NeuroSyncStream(url, on_window, on_close, **stream_options)
+    if source_rate is not None and source_rate != stream.sample_rate:
+        from utils.audio.resampler import resample_pcm_chunks
+        audio_chunks = resample_pcm_chunks(audio_chunks, source_rate, stream.sample_rate)
+    if stream.start():
+        for chunk in audio_chunks:
+            if not stream.send(chunk):
+                break
+        stream.finish()
+    return stream
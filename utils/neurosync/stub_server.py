@@ -0,0 +1,172 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# stub_server.py
+# Local stand-in for the NeuroSync API, for testing the client without a model. It answers
+# POST /audio_to_blendshapes with deterministic blendshapes, 60 frames per second of audio,
+# as binary when the request accepts it and as JSON otherwise (or always, with --json-only).
+# POST /audio_to_blendshapes_stream takes a chunked upload of 16-bit mono PCM and answers with
+# a chunked stream of binary windows, each sent as soon as enough audio for it has arrived.
+# Run from the repository root: python -m utils.neurosync.stub_server --port 5000
+
+import argparse
+import json
+import time
+import wave
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from io import BytesIO
+from threading import Thread
+
+import numpy as np
+
+from utils.neurosync.blendshape_format import BINARY_CONTENT_TYPE, JSON_CONTENT_TYPE, STREAM_CONTENT_TYPE, encode_blendshapes_binary
+
+FPS = 60
+DIMENSIONS = 68
+PATH = "/audio_to_blendshapes"
+STREAM_PATH = "/audio_to_blendshapes_stream"
+STREAM_SAMPLE_RATE = 88200
+STREAM_WINDOW_FRAMES = 30
+
+
+def audio_seconds(audio_bytes: bytes) -> float:
+    """
+    Duration of WAV audio, or of 16-bit mono 88.2 kHz PCM if the bytes are not a WAV file.
+    """
+    try:
+        with wave.open(BytesIO(audio_bytes), "rb") as wav_file:
+            return wav_file.getnframes() / wav_file.getframerate()
+    except (wave.Error, EOFError):
+        return len(audio_bytes) / (2 * 88200)
+
+
+def stub_blendshapes(frame_count: int, dimensions: int = DIMENSIONS, start_frame: int = 0) -> np.ndarray:
+    """
+    Smooth, deterministic values in [0, 1] so responses are reproducible across runs.
+    start_frame continues the pattern, so streamed windows join up into the batch response.
+    """
+    t = np.arange(start_frame, start_frame + frame_count, dtype=np.float64)[:, None] / FPS
+    phase = np.arange(dimensions, dtype=np.float64)[None, :]
+    return (0.5 + 0.5 * np.sin(2.0 * np.pi * 0.5 * t + phase)).astype(np.float32)
+
+
+class StubNeuroSyncHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API.
+    disable_nagle_algorithm = True  # Headers and body are written separately.
+    json_only = False
+    window_latency = 0.0  # Seconds of simulated inference per streamed window.
+
+    def do_POST(self):
+        if self.path == STREAM_PATH:
+            self._stream()
+            return
+        if self.path != PATH:
+            self._reply(404, JSON_CONTENT_TYPE, b'{"error": "not found"}')
+            return
+        audio_bytes = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        blendshapes = stub_blendshapes(int(round(audio_seconds(audio_bytes) * FPS)))
+
+        if not self.json_only and BINARY_CONTENT_TYPE in self.headers.get("Accept", ""):
+            self._reply(200, BINARY_CONTENT_TYPE, encode_blendshapes_binary(blendshapes))
+        else:
+            body = json.dumps({"blendshapes": blendshapes.tolist()}).encode("utf-8")
+            self._reply(200, JSON_CONTENT_TYPE, body)
+
+    def _stream(self) -> None:
+        """
+        Emits a window of frames each time the upload has covered another window of audio,
+        then the remainder once the upload ends.
+        """
+        sample_rate = int(self.headers.get("X-Audio-Sample-Rate", STREAM_SAMPLE_RATE))
+        window_frames = max(1, int(self.headers.get("X-Window-Frames", STREAM_WINDOW_FRAMES)))
+        bytes_per_frame = 2 * sample_rate / FPS
+
+        self.send_response(200)
+        self.send_header("Content-Type", STREAM_CONTENT_TYPE)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        received, frames_sent = 0, 0
+        for chunk in self._request_chunks():
+            received += len(chunk)
+            while int(received / bytes_per_frame) - frames_sent >= window_frames:
+                self._send_window(frames_sent, window_frames)
+                frames_sent += window_frames
+
+        total_frames = int(round(received / bytes_per_frame))
+        if total_frames > frames_sent:
+            self._send_window(frames_sent, total_frames - frames_sent)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_window(self, start_frame: int, frame_count: int) -> None:
+        if self.window_latency:
+            time.sleep(self.window_latency)
+        payload = encode_blendshapes_binary(stub_blendshapes(frame_count, start_frame=start_frame))
+        self.wfile.write(b"%X\r\n%s\r\n" % (len(payload), payload))
+
+    def _request_chunks(self):
+        """
+        Yields the request body as it arrives: chunk by chunk for a chunked upload, whole otherwise.
+        """
+        if "chunked" not in self.headers.get("Transfer-Encoding", "").lower():
+            yield self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            return
+        while True:
+            size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip any trailers up to the blank line that ends the body.
+                while self.rfile.readline().strip():
+                    pass
+                return
+            chunk = self.rfile.read(size)
+            self.rfile.readline()
+            yield chunk
+
+    def _reply(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_stub_server(port: int = 0, json_only: bool = False, window_latency: float = 0.0) -> ThreadingHTTPServer:
+    handler = type("StubHandler", (StubNeuroSyncHandler,), {"json_only": json_only, "window_latency": window_latency})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def stub_url(server: ThreadingHTTPServer, path: str = PATH) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def start_stub_server(port: int = 0, json_only: bool = False, window_latency: float = 0.0):
+    """
+    Starts the stub server on a background thread. Returns (server, url); call
+    server.shutdown() to stop it. port=0 picks a free port. The streaming endpoint is
+    at stub_url(server, STREAM_PATH).
+    """
+    server = create_stub_server(port, json_only, window_latency)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server, stub_url(server)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the NeuroSync API.")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--json-only", action="store_true", help="Behave like a server without binary support.")
+    parser.add_argument("--window-latency-ms", type=float, default=0.0, help="Simulated inference time per streamed window.")
+    args = parser.parse_args()
+
+    server = create_stub_server(args.port, args.json_only, args.window_latency_ms / 1000.0)
+    print(f"Stub NeuroSync API listening on {stub_url(server)} ({'JSON only' if args.json_only else 'binary + JSON'}), "
+          f"streaming on {stub_url(server, STREAM_PATH)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
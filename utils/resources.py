@@ -0,0 +1,52 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# resources.py
+# Registry for heavy, process-wide resources (animation libraries, pygame, model pipelines).
+# Modules register a factory at import time, which is free; the resource is only built the
+# first time something asks for it, so entry points start without paying for what they never use.
+
+from threading import RLock
+
+_factories = {}
+_resources = {}
+_lock = RLock()
+
+
+def register_resource(name: str, factory) -> None:
+    """
+    Registers factory() as the builder for name. Re-registering replaces the factory but
+    keeps an already built resource until release_resource(name) is called.
+    """
+    with _lock:
+        _factories[name] = factory
+
+
+def get_resource(name: str):
+    """
+    Returns the resource registered as name, building it on first use. Thread-safe: concurrent
+    first calls build it once.
+    """
+    try:
+        return _resources[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _resources:
+            if name not in _factories:
+                raise KeyError(f"No resource registered as '{name}'.")
+            _resources[name] = _factories[name]()
+        return _resources[name]
+
+
+def is_loaded(name: str) -> bool:
+    return name in _resources
+
+
+def release_resource(name: str) -> None:
+    """
+    Drops a built resource so the next get_resource(name) builds it again.
+    """
+    with _lock:
+        _resources.pop(name, None)
@@ -41,7 +41,7 @@ def twitch_input_worker(twitch_queue, chat_history, chunk_queue, llm_lock, confi
     from utils.llm.chat_utils import save_chat_log
     # Import the Livepeer handler
     from utils.llm.livepeer_llm_handler import get_livepeer_response
-    import pygame
+    from utils.audio.play_audio import stop_audio
 
     def flush_queue(q):
         try:
@@ -58,8 +58,7 @@ def twitch_input_worker(twitch_queue, chat_history, chunk_queue, llm_lock, confi
                 print(twitch_message)
                 with llm_lock:
                     flush_queue(chunk_queue)
-                    if pygame.mixer.get_init():
-                        pygame.mixer.stop()
+                    stop_audio()
                     
                     # Check if Livepeer should be used
                     if config.get("USE_LIVEPEER", False):
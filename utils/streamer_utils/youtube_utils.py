@@ -77,7 +77,7 @@ def youtube_input_worker(youtube_queue, chat_history, chunk_queue, llm_lock, con
     from utils.llm.llm_utils import stream_llm_chunks
     from utils.llm.chat_utils import save_chat_log
     from queue import Empty
-    import pygame
+    from utils.audio.play_audio import stop_audio
 
     while True:
         try:
@@ -100,8 +100,7 @@ def youtube_input_worker(youtube_queue, chat_history, chunk_queue, llm_lock, con
 
             with llm_lock:
                 # Instead of flushing the chunk_queue, we let new messages add to it.
-                if pygame.mixer.get_init():
-                    pygame.mixer.stop()
+                stop_audio()
                 # Process the combined message through the AI.
                 # Updated call: passing the 'config' parameter.
                 full_response = stream_llm_chunks(combined_message, chat_history, chunk_queue, config=config)
@@ -2,11 +2,13 @@ import requests
 import base64
 import os
 
+from utils.audio.audio_buffer import to_audio_bytes
+
 TRANSCRIPTION_SERVER_URL = 'http://127.0.0.1:6969/transcribe'
 
 def transcribe_audio(audio_bytes, return_timestamps=False):
     """Transcribe audio with optional timestamps."""
-    audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+    audio_base64 = base64.b64encode(to_audio_bytes(audio_bytes)).decode('utf-8')
     try:
         response = requests.post(
             TRANSCRIPTION_SERVER_URL,
@@ -2,6 +2,9 @@ import io
 import json
 import requests
 
+from utils.audio.audio_buffer import to_audio_bytes
+from utils.tts.tts_cache import get_tts_cache, tts_cache_key
+
 voices = {
     "Sarah": "EXAVITQu4vr4xnSDxMaL",
     "Laura": "FGY2WhTYpPnrIDTdsKH5",
@@ -23,14 +26,32 @@ voices = {
 }
 
 XI_API_KEY = "YOUR-ELEVENLABS-API-KEY"  # Replace with your actual ElevenLabs API key
+TTS_MODEL_ID = "eleven_monolingual_v1"
+TTS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.75,
+    "style": 0.5,
+    "use_speaker_boost": True
+}
 
 def get_voice_id_by_name(name):
     return voices.get(name)
 
-def get_elevenlabs_audio(text, name):
+def elevenlabs_cache_key(text, name):
     VOICE_ID = get_voice_id_by_name(name)
     if VOICE_ID is None:
         raise ValueError(f"Voice for {name} not found.")
+    return tts_cache_key(text, VOICE_ID, TTS_MODEL_ID, TTS_VOICE_SETTINGS)
+
+def get_elevenlabs_audio(text, name):
+    """
+    Synthesizes text with the named voice. Phrases that were synthesized before are served
+    from the TTS cache.
+    """
+    return get_tts_cache().get_or_synthesize(elevenlabs_cache_key(text, name), lambda: _request_elevenlabs_audio(text, name))
+
+def _request_elevenlabs_audio(text, name):
+    VOICE_ID = get_voice_id_by_name(name)
     
     API_URL = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}/stream"
     
@@ -41,13 +62,8 @@ def get_elevenlabs_audio(text, name):
 
     payload = {
         "text": text,
-        "model_id": "eleven_monolingual_v1",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.75,
-            "style": 0.5,
-            "use_speaker_boost": True
-        }
+        "model_id": TTS_MODEL_ID,
+        "voice_settings": TTS_VOICE_SETTINGS
     }
 
     response = requests.post(API_URL, headers=headers, json=payload)
@@ -79,7 +95,7 @@ def get_speech_to_speech_audio(audio_bytes, name):
     }
 
     files = {
-        "audio": ("audio.wav", io.BytesIO(audio_bytes), "audio/wav")
+        "audio": ("audio.wav", io.BytesIO(to_audio_bytes(audio_bytes)), "audio/wav")
     }
 
     response = requests.post(STS_API_URL, headers=headers, data=data, files=files)
@@ -1,7 +1,6 @@
 from io import BytesIO
 import numpy as np
 import soundfile as sf
-from kokoro import KPipeline
 from flask import Flask, request, jsonify
 from threading import Thread, Lock
 
@@ -11,11 +10,22 @@ app_kokoro = Flask("kokoro_app")
 
 # https://huggingface.co/hexgrad/Kokoro-82M APACHE LICENCE http://www.apache.org/licenses/LICENSE-2.0 
 
-# Initialize the Kokoro pipeline with American English ('a').
-# Adjust lang_code and voice as needed.
-kokoro_pipeline = KPipeline(lang_code='a')
+kokoro_pipeline = None
 kokoro_lock = Lock()  # Lock to serialize access to the Kokoro pipeline
 
+def get_kokoro_pipeline():
+    """
+    Builds the Kokoro pipeline on first use (it loads torch and the model weights).
+    Call with kokoro_lock held.
+    """
+    global kokoro_pipeline
+    if kokoro_pipeline is None:
+        from kokoro import KPipeline
+        # Initialize the Kokoro pipeline with American English ('a').
+        # Adjust lang_code and voice as needed.
+        kokoro_pipeline = KPipeline(lang_code='a')
+    return kokoro_pipeline
+
 def trim_and_fade(audio, sample_rate, threshold=0.01, fade_duration=0.05):
     """
     Trims leading and trailing silence from an audio signal and applies a fade-in and fade-out.
@@ -60,7 +70,7 @@ def generate_speech_segment_kokoro(text):
             return None
 
         with kokoro_lock:
-            generator = kokoro_pipeline(
+            generator = get_kokoro_pipeline()(
                 text, 
                 voice='af_bella',  # Change voice here if needed
                 speed=0.8, 
@@ -109,6 +119,10 @@ def generate_speech_kokoro_endpoint():
         return result, 200, {'Content-Type': 'audio/wav'}
 
 if __name__ == '__main__':
+    # Load the model before serving so the first request is not slow.
+    with kokoro_lock:
+        get_kokoro_pipeline()
+
     def run_kokoro_app():
         print("Starting Kokoro App on port 8000...")
         app_kokoro.run(host='0.0.0.0', port=8000, debug=False)
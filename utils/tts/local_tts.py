@@ -3,6 +3,8 @@ import requests
 import os
 import json
 
+from utils.tts.tts_cache import get_tts_cache, tts_cache_key
+
 # Constants for the local TTS endpoint (kept for backward compatibility)
 LOCAL_TTS_URL = "http://127.0.0.1:8000/generate_speech"
 
@@ -10,22 +12,36 @@ LOCAL_TTS_URL = "http://127.0.0.1:8000/generate_speech"
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY", "sk_fd0fd11e16525e19aa5c5952b9be54be53c0d879718447ee")  # Set your API key in environment variables
 ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel voice (default), change to your preferred voice
 ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1/text-to-speech"
+ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.75
+}
 
 # Flag to control whether to attempt local TTS first or just use fallback
 USE_LOCAL_TTS_FIRST = False  # Set to False to use ElevenLabs directly
 
+def local_tts_cache_key(text):
+    """
+    The TTS cache key call_local_tts uses for text (when the service it tries first succeeds).
+    """
+    if USE_LOCAL_TTS_FIRST:
+        return tts_cache_key(text, "local", LOCAL_TTS_URL)
+    return elevenlabs_tts_cache_key(text)
+
+def elevenlabs_tts_cache_key(text):
+    return tts_cache_key(text, ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL_ID, ELEVENLABS_VOICE_SETTINGS)
+
 def call_local_tts(text):
     """
     Calls the local TTS Flask endpoint to generate speech, or uses ElevenLabs.
     Returns the audio bytes if successful, otherwise returns None.
+    Phrases that were synthesized before are served from the TTS cache.
     """
     if USE_LOCAL_TTS_FIRST:
         # Try local TTS first
-        payload = {"text": text}
         try:
-            response = requests.post(LOCAL_TTS_URL, json=payload)
-            response.raise_for_status()
-            return response.content
+            return get_tts_cache().get_or_synthesize(tts_cache_key(text, "local", LOCAL_TTS_URL), lambda: _request_local_tts(text))
         except Exception as e:
             print(f"Error calling local TTS: {e}")
             print("Falling back to ElevenLabs...")
@@ -34,11 +50,21 @@ def call_local_tts(text):
     # Use ElevenLabs for TTS
     return call_elevenlabs_tts(text)
 
+def _request_local_tts(text):
+    payload = {"text": text}
+    response = requests.post(LOCAL_TTS_URL, json=payload)
+    response.raise_for_status()
+    return response.content
+
 def call_elevenlabs_tts(text):
     """
     Uses ElevenLabs API to generate speech from text.
     Returns audio bytes or None if there was an error.
+    Phrases that were synthesized before are served from the TTS cache.
     """
+    return get_tts_cache().get_or_synthesize(elevenlabs_tts_cache_key(text), lambda: _request_elevenlabs_tts(text))
+
+def _request_elevenlabs_tts(text):
     if not ELEVENLABS_API_KEY:
         print("Error: ElevenLabs API key is not set. Please set the ELEVENLABS_API_KEY environment variable.")
         return None
@@ -56,11 +82,8 @@ def call_elevenlabs_tts(text):
     # Request payload
     payload = {
         "text": text,
-        "model_id": "eleven_monolingual_v1",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.75
-        }
+        "model_id": ELEVENLABS_MODEL_ID,
+        "voice_settings": ELEVENLABS_VOICE_SETTINGS
     }
     
     try:
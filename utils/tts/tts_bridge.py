@@ -1,35 +1,138 @@
+from utils.audio.audio_buffer import AudioBuffer
+from utils.audio.play_audio import get_stop_count
 from utils.neurosync.neurosync_api_connect import send_audio_to_neurosync
-from utils.tts.local_tts import call_local_tts 
-from utils.tts.eleven_labs import get_elevenlabs_audio
+from utils.tts.local_tts import call_local_tts, local_tts_cache_key
+from utils.tts.eleven_labs import get_elevenlabs_audio, elevenlabs_cache_key
+from utils.tts.tts_cache import get_tts_cache, load_phrases, PHRASES_PATH
 import string
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
 
-def tts_worker(chunk_queue, audio_queue, USE_LOCAL_AUDIO, VOICE_NAME):
+# Chunks synthesized concurrently per backend. The local TTS server usually runs one model on
+# one GPU, so extra requests mostly queue there; ElevenLabs allows several concurrent requests
+# (keep this within your plan's concurrency limit).
+LOCAL_TTS_WORKERS = 2
+ELEVENLABS_WORKERS = 4
+
+def warm_tts_cache(USE_LOCAL_AUDIO, VOICE_NAME, phrases_path=PHRASES_PATH, with_blendshapes=True):
     """
-    Processes text chunks from chunk_queue by generating audio (using local TTS or ElevenLabs)
-    and retrieving corresponding facial data, then enqueues the results into audio_queue.
+    Synthesizes the phrases listed in phrases_path that are not cached yet (greetings, fillers,
+    catch-phrases), with their blendshapes, so the first time they are said costs nothing.
+    Does nothing if the file does not exist. Meant to run on a background thread at startup.
+    """
+    phrases = load_phrases(phrases_path)
+    if not phrases:
+        return
+    if USE_LOCAL_AUDIO:
+        synthesize, key_for = call_local_tts, local_tts_cache_key
+    else:
+        synthesize = lambda text: get_elevenlabs_audio(text, VOICE_NAME)
+        key_for = lambda text: elevenlabs_cache_key(text, VOICE_NAME)
+    tts_cache = get_tts_cache()
+    synthesized = tts_cache.warm(phrases, synthesize, key_for, send_audio_to_neurosync if with_blendshapes else None)
+    print(f"TTS cache warmed: {synthesized} of {len(phrases)} phrases synthesized. {tts_cache.summary()}")
+
+class ReorderBuffer:
+    """
+    Collects results that complete out of order and hands them to deliver() strictly in
+    sequence order, each as soon as every earlier result has been delivered.
+    """
+
+    def __init__(self, deliver) -> None:
+        self.deliver = deliver
+        self.next_sequence = 0
+        self.max_waiting = 0
+        self._waiting = {}
+        self._lock = Lock()
+
+    def put(self, sequence: int, result) -> None:
+        with self._lock:
+            self._waiting[sequence] = result
+            self.max_waiting = max(self.max_waiting, len(self._waiting))
+            while self.next_sequence in self._waiting:
+                self.deliver(self._waiting.pop(self.next_sequence))
+                self.next_sequence += 1
+
+
+def synthesize_chunk(chunk, USE_LOCAL_AUDIO, VOICE_NAME, with_blendshapes=True):
+    """
+    Generates audio for a text chunk (local TTS or ElevenLabs) and its facial data.
+    Returns (AudioBuffer, facial_data), or None if either step failed. Without
+    with_blendshapes facial_data is None, for a player that streams the audio to NeuroSync.
+    """
+    if USE_LOCAL_AUDIO:
+        audio_bytes = call_local_tts(chunk)
+    else:
+        audio_bytes = get_elevenlabs_audio(chunk, VOICE_NAME)
+
+    if not audio_bytes:
+        print("TTS generation failed for chunk:", chunk)
+        return None
+    audio_bytes = AudioBuffer.from_bytes(audio_bytes)
+    if not with_blendshapes:
+        return audio_bytes, None
+    facial_data = send_audio_to_neurosync(audio_bytes)
+    if facial_data is None or len(facial_data) == 0:
+        print("Failed to get facial data for chunk:", chunk)
+        return None
+    return audio_bytes, facial_data
+
+
+def run_ordered_pool(chunk_queue, audio_queue, synthesize, max_workers: int) -> ReorderBuffer:
     """
-    while True:
-        chunk = chunk_queue.get()
-        if chunk is None:
-            break
-
-        # Optional extra safety check: skip if chunk is empty or only punctuation/whitespace.
-        if not chunk.strip() or all(c in string.punctuation or c.isspace() for c in chunk):
-            chunk_queue.task_done()
-            continue
-
-        if USE_LOCAL_AUDIO:
-            audio_bytes = call_local_tts(chunk)
-        else:
-            audio_bytes = get_elevenlabs_audio(chunk, VOICE_NAME)
-
-        if audio_bytes:
-            facial_data = send_audio_to_neurosync(audio_bytes)
-            if facial_data:
-                audio_queue.put((audio_bytes, facial_data))
-            else:
-                print("Failed to get facial data for chunk:", chunk)
-        else:
-            print("TTS generation failed for chunk:", chunk)
+    Takes chunks from chunk_queue until None and runs synthesize(chunk) for up to max_workers of
+    them at once. Results go to audio_queue in the order the chunks were queued, and
+    chunk_queue.task_done() is called as each chunk is delivered (or skipped). At most
+    max_workers chunks are taken off chunk_queue ahead of delivery, so a flush of chunk_queue
+    still catches the rest. A result whose chunk was taken before the latest stop_audio() is
+    dropped instead of delivered. Returns once every taken chunk has been delivered.
+    """
+    window = BoundedSemaphore(max_workers)
+
+    def deliver(entry):
+        stop_count, result = entry
+        if result is not None and stop_count == get_stop_count():
+            audio_queue.put(result)
         chunk_queue.task_done()
+        window.release()
+
+    reorder = ReorderBuffer(deliver)
+
+    def run(sequence, chunk, stop_count):
+        result = None
+        try:
+            result = synthesize(chunk)
+        except Exception as e:
+            print(f"Error generating audio for chunk '{chunk}': {e}")
+        reorder.put(sequence, (stop_count, result))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts") as executor:
+        sequence = 0
+        while True:
+            chunk = chunk_queue.get()
+            if chunk is None:
+                break
 
+            # Optional extra safety check: skip if chunk is empty or only punctuation/whitespace.
+            if not chunk.strip() or all(c in string.punctuation or c.isspace() for c in chunk):
+                chunk_queue.task_done()
+                continue
+
+            window.acquire()
+            executor.submit(run, sequence, chunk, get_stop_count())
+            sequence += 1
+    return reorder
+
+
+def tts_worker(chunk_queue, audio_queue, USE_LOCAL_AUDIO, VOICE_NAME, max_workers=None, stream_blendshapes=False):
+    """
+    Processes text chunks from chunk_queue by generating audio (using local TTS or ElevenLabs)
+    and retrieving corresponding facial data, then enqueues the results into audio_queue.
+    Several chunks are processed at once (max_workers, by default per backend), but results
+    reach audio_queue in the order the chunks arrived. With stream_blendshapes only the audio
+    is generated here; audio_face_queue_worker (with the same flag) streams it to NeuroSync.
+    """
+    if max_workers is None:
+        max_workers = LOCAL_TTS_WORKERS if USE_LOCAL_AUDIO else ELEVENLABS_WORKERS
+    synthesize = lambda chunk: synthesize_chunk(chunk, USE_LOCAL_AUDIO, VOICE_NAME, with_blendshapes=not stream_blendshapes)
+    run_ordered_pool(chunk_queue, audio_queue, synthesize, max_workers)
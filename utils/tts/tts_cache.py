@@ -0,0 +1,295 @@
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+# tts_cache.py
+# Phrase-level cache of synthesized speech. The key covers the normalized text, voice, model and
+# voice settings, so a greeting said a hundred times is paid for (and waited for) once. Entries
+# are kept on disk as the audio exactly as the TTS service returned it, optionally with the
+# blendshapes for that audio next to it (named for the NeuroSync model version and endpoint that
+# produced them), and trimmed least recently used first to a byte cap.
+
+import glob
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from threading import Lock
+
+import numpy as np
+
+from utils.resources import register_resource, get_resource
+
+CACHE_DIR = os.path.join("cache", "tts")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+PHRASES_PATH = "tts_phrases.txt"  # One phrase per line; '#' starts a comment.
+
+
+def normalize_text(text: str) -> str:
+    """
+    Unicode-normalizes the text and collapses whitespace. Case and punctuation are kept,
+    since both change how the phrase is spoken.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def tts_cache_key(text: str, voice_id: str, model_id: str, voice_settings=None) -> str:
+    description = json.dumps({
+        "text": normalize_text(text),
+        "voice": voice_id,
+        "model": model_id,
+        "settings": voice_settings or {},
+    }, sort_keys=True)
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def load_phrases(path: str = PHRASES_PATH):
+    """
+    Reads a phrase list for warm(). Returns [] if the file does not exist.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.split("#", 1)[0].strip() for line in f]
+    except OSError:
+        return []
+    return [line for line in lines if line]
+
+
+class TTSCache:
+    """
+    Thread-safe, disk-backed LRU of synthesized audio. get_or_synthesize() is the usual entry
+    point. Blendshapes stored with put_blendshapes() are handed to the NeuroSync blendshape
+    cache whenever their audio is served, so that audio never reaches NeuroSync either. They are
+    stored per model version and endpoint, and only primed for the one that produced them.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self._lock = Lock()
+        self._entries = {}  # key -> bytes on disk (audio + blendshapes)
+        self._last_used = {}  # key -> last use, for eviction order
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.synthesis_seconds = 0.0
+        self._scan()
+
+    # -------------------- Lookup --------------------
+    def get(self, key: str):
+        """
+        Returns the cached audio bytes for key, or None.
+        """
+        path = self._audio_path(key)
+        try:
+            with open(path, "rb") as f:
+                audio_bytes = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                self._last_used[key] = time.time()
+
+        for use_local in (True, False):
+            blendshapes = self.get_blendshapes(key, use_local)
+            if blendshapes is not None:
+                from utils.neurosync.neurosync_api_connect import prime_cached_blendshapes
+                prime_cached_blendshapes(audio_bytes, blendshapes, use_local)
+        return audio_bytes
+
+    def get_blendshapes(self, key: str, use_local=True):
+        """
+        Returns the blendshapes stored for key by the current model at the local or remote
+        endpoint, or None.
+        """
+        try:
+            return np.load(self._blendshapes_path(key, use_local))
+        except (OSError, ValueError):
+            return None
+
+    def get_or_synthesize(self, key: str, synthesize):
+        """
+        Returns the cached audio for key, or calls synthesize() and caches its result.
+        A None or empty result is returned without being cached; exceptions propagate.
+        """
+        audio_bytes = self.get(key)
+        if audio_bytes is not None:
+            return audio_bytes
+        start = time.perf_counter()
+        audio_bytes = synthesize()
+        with self._lock:
+            self.synthesis_seconds += time.perf_counter() - start
+        if audio_bytes:
+            self.put(key, audio_bytes)
+        return audio_bytes
+
+    # -------------------- Storage --------------------
+    def put(self, key: str, audio_bytes: bytes) -> None:
+        if not self._write(self._audio_path(key), lambda f: f.write(audio_bytes)):
+            return
+        self._account(key)
+
+    def put_blendshapes(self, key: str, blendshapes, use_local=True) -> None:
+        """
+        Stores blendshapes from the local or remote endpoint next to the cached audio for key
+        (which must already be cached).
+        """
+        if not os.path.exists(self._audio_path(key)):
+            return
+        blendshapes = np.asarray(blendshapes, dtype=np.float32)
+        if self._write(self._blendshapes_path(key, use_local), lambda f: np.save(f, blendshapes)):
+            self._account(key)
+
+    def warm(self, phrases, synthesize, key_for, blendshapes_for=None) -> int:
+        """
+        Makes sure every phrase is cached: synthesize(text) must be a function that caches its
+        result under key_for(text). With blendshapes_for(audio_bytes), blendshapes are computed
+        and stored for phrases that have none yet from the local endpoint, which is where
+        blendshapes_for must send the audio. Returns the number of phrases synthesized.
+        """
+        synthesized = 0
+        for phrase in phrases:
+            key = key_for(phrase)
+            audio_bytes = None
+            if not os.path.exists(self._audio_path(key)):
+                try:
+                    audio_bytes = synthesize(phrase)
+                except Exception as e:
+                    print(f"Could not warm TTS cache for '{phrase}': {e}")
+                    continue
+                if not audio_bytes:
+                    continue
+                synthesized += 1
+            if blendshapes_for is None or os.path.exists(self._blendshapes_path(key)):
+                continue
+            if audio_bytes is None:
+                try:
+                    with open(self._audio_path(key), "rb") as f:
+                        audio_bytes = f.read()
+                except OSError:
+                    continue
+            blendshapes = blendshapes_for(audio_bytes)
+            if blendshapes is not None and len(blendshapes) > 0:
+                self.put_blendshapes(key, blendshapes)
+        return synthesized
+
+    def _write(self, path: str, write) -> bool:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                write(f)
+            os.replace(temp_path, path)
+            return True
+        except OSError as e:
+            print(f"Could not write TTS cache entry {os.path.basename(path)}: {e}")
+            return False
+
+    def _account(self, key: str) -> None:
+        size = self._entry_size(key)
+        with self._lock:
+            self._bytes += size - self._entries.get(key, 0)
+            self._entries[key] = size
+            self._last_used[key] = time.time()
+            evicted = self._evict()
+        for old_key in evicted:
+            self._remove(old_key)
+
+    def _evict(self):
+        evicted = []
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key = min(self._last_used, key=self._last_used.get)
+            self._bytes -= self._entries.pop(key)
+            del self._last_used[key]
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _scan(self) -> None:
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".audio")]
+        except OSError:
+            return
+        for name in names:
+            key = name[:-len(".audio")]
+            try:
+                last_used = os.stat(self._audio_path(key)).st_mtime
+            except OSError:
+                continue
+            self._entries[key] = self._entry_size(key)
+            self._last_used[key] = last_used
+            self._bytes += self._entries[key]
+        for key in self._evict():
+            self._remove(key)
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for path in self._entry_paths(key):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _remove(self, key: str) -> None:
+        for path in self._entry_paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _audio_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _blendshapes_path(self, key: str, use_local=True) -> str:
+        from utils.neurosync.neurosync_api_connect import blendshape_model_tag
+        return os.path.join(self.directory, f"{key}.{blendshape_model_tag(use_local)}.npy")
+
+    def _entry_paths(self, key: str):
+        """
+        The audio and every blendshapes file stored for key, whichever model produced them.
+        """
+        return [self._audio_path(key)] + glob.glob(os.path.join(glob.escape(self.directory), f"{key}*.npy"))
+
+    # -------------------- Stats --------------------
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def seconds_saved(self) -> float:
+        """
+        Estimated synthesis time saved: hits times the average synthesis time of the misses.
+        """
+        return self.hits * self.synthesis_seconds / self.misses if self.misses else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "seconds_saved": self.seconds_saved,
+        }
+
+    def summary(self) -> str:
+        return (f"TTS cache: {self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+                f"{len(self._entries)} phrases / {self._bytes / (1024 * 1024):.1f} MB, "
+                f"{self.evictions} evicted, ~{self.seconds_saved:.1f} s of synthesis saved")
+
+
+register_resource("tts_cache", TTSCache)
+
+def get_tts_cache() -> TTSCache:
+    return get_resource("tts_cache")
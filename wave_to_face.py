@@ -4,7 +4,6 @@
 
 
 import os
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -14,6 +13,7 @@ from threading import Thread
 
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
+from utils.audio.play_audio import quit_audio
 from utils.audio_face_workers import process_wav_file
 from utils.files.file_utils import  initialize_directories, ensure_wav_input_folder_exists, list_wav_files
 
@@ -68,5 +68,5 @@ if __name__ == "__main__":
         stop_default_animation.set()
         if default_animation_thread:
             default_animation_thread.join()
-        pygame.quit()
+        quit_audio()
         socket_connection.close()
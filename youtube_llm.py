@@ -4,7 +4,6 @@ import os
 import time
 from threading import Thread, Lock
 from queue import Queue, Empty
-import pygame
 import warnings
 warnings.filterwarnings(
     "ignore", 
@@ -16,7 +15,8 @@ import time
 
 from livelink.connect.livelink_init import create_socket_connection, initialize_py_face
 from livelink.animations.default_animation import default_animation_loop, stop_default_animation
-from utils.tts.tts_bridge import tts_worker
+from utils.audio.play_audio import quit_audio, stop_audio
+from utils.tts.tts_bridge import tts_worker, warm_tts_cache
 from utils.files.file_utils import initialize_directories
 from utils.llm.chat_utils import load_chat_history, save_chat_log
 from utils.llm.llm_utils import stream_llm_chunks 
@@ -34,6 +34,7 @@ LLM_STREAM_URL = "http://127.0.0.1:5050/generate_stream"
 VOICE_NAME = 'Lily'
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  
 USE_LOCAL_AUDIO = True 
+STREAM_BLENDSHAPES = False  # Stream each TTS chunk to the local NeuroSync streaming endpoint as it plays.
 
 llm_config = {
     "USE_LOCAL_LLM": USE_LOCAL_LLM,
@@ -68,9 +69,10 @@ def main():
     
     chunk_queue = Queue()
     audio_queue = Queue()
-    tts_worker_thread = Thread(target=tts_worker, args=(chunk_queue, audio_queue, USE_LOCAL_AUDIO, VOICE_NAME))
+    tts_worker_thread = Thread(target=tts_worker, args=(chunk_queue, audio_queue, USE_LOCAL_AUDIO, VOICE_NAME), kwargs={"stream_blendshapes": STREAM_BLENDSHAPES})
     tts_worker_thread.start()
-    audio_worker_thread = Thread(target=audio_face_queue_worker, args=(audio_queue, py_face, socket_connection, default_animation_thread))
+    Thread(target=warm_tts_cache, args=(USE_LOCAL_AUDIO, VOICE_NAME), daemon=True).start()
+    audio_worker_thread = Thread(target=audio_face_queue_worker, args=(audio_queue, py_face, socket_connection, default_animation_thread), kwargs={"stream_blendshapes": STREAM_BLENDSHAPES})
     audio_worker_thread.start()
     
     global YOUTUBE_LIVE_CHAT_ID
@@ -130,8 +132,7 @@ def main():
             with llm_lock:
                 flush_queue(chunk_queue)
                 flush_queue(audio_queue)
-                if pygame.mixer.get_init():
-                    pygame.mixer.stop()
+                stop_audio()
                 full_response = stream_llm_chunks(user_input, chat_history, chunk_queue, config=llm_config)
                 chat_history.append({"input": user_input, "response": full_response})
                 save_chat_log(chat_history)
@@ -145,7 +146,7 @@ def main():
         audio_worker_thread.join()
         stop_default_animation.set()
         default_animation_thread.join()
-        pygame.quit()
+        quit_audio()
         socket_connection.close()
 
 if __name__ == "__main__":